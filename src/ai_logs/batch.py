@@ -0,0 +1,265 @@
+import sys
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .lazy import lazy_import
+
+# Imported on first use: the pandas engine is the only stage that needs them
+try:
+  np = lazy_import("numpy")
+  pd = lazy_import("pandas")
+  PANDAS_AVAILABLE = True
+except ImportError:
+  PANDAS_AVAILABLE = False
+
+try:
+  pa = lazy_import("pyarrow")
+  pc = lazy_import("pyarrow.compute")
+  PYARROW_AVAILABLE = True
+except ImportError:
+  PYARROW_AVAILABLE = False
+
+from .metrics import PipelineMetrics, stage
+from .normalize import ClusterAccumulator, ClusterTable, NUM_PATTERN, QUOTED_STRING_PATTERN, message_key, message_template
+from .parse import IVERILOG_PTRN, YOSYS_STEP_PTRN, YOSYS_LEVELED_PTRN, _match_lines, split_byte_ranges
+from .schema import LogRecord
+
+ENGINES = ("stream", "pandas")
+# Bytes of log text loaded into one DataFrame at a time; bounds memory while amortizing per-batch overhead
+DEFAULT_BATCH_BYTES = 32 << 20
+
+# Arrow's RE2 only agrees with Python's re on ASCII text without the control characters Python alone treats
+# as whitespace; any other line is parsed by the regular per-line matcher
+_RE2_UNSAFE = r"[^\x00-\x7f]|[\x0b\x1c-\x1f]"
+
+_PRIORITY_MULTIPLIER = 0x9E3779B97F4A7C15
+
+def _require_pandas() -> None:
+  if not PANDAS_AVAILABLE:
+    raise RuntimeError("The pandas engine needs pandas and numpy; install them with `pip install pandas numpy`")
+
+def _re2(pattern) -> str:
+  return ("(?i)" if pattern.flags & 2 else "") + pattern.pattern
+
+def _re2_safe(arr) -> "np.ndarray":
+  return ~pc.match_substring_regex(arr, _RE2_UNSAFE).to_numpy(zero_copy_only=False)
+
+def vectorized_message_keys(msgs: Sequence[str]) -> List[str]:
+  """message_key for a batch of messages, substituting quotes and numbers column-wise."""
+  _require_pandas()
+  if not PYARROW_AVAILABLE:
+    return list(
+      pd.Series(msgs, dtype=object)
+      .str.replace(QUOTED_STRING_PATTERN, "'<SIG>'", regex=True)
+      .str.replace(NUM_PATTERN, "<NUM>", regex=True)
+    )
+  arr = pa.array(msgs, pa.string())
+  keys = pc.replace_substring_regex(arr, pattern=QUOTED_STRING_PATTERN.pattern, replacement="'<SIG>'")
+  keys = pc.replace_substring_regex(keys, pattern=NUM_PATTERN.pattern, replacement="<NUM>").to_pylist()
+  # RE2 treats \b and \d as ASCII-only, so non-ASCII messages go through the regular implementation
+  for i in np.flatnonzero(~pc.string_is_ascii(arr).to_numpy(zero_copy_only=False)):
+    keys[i] = message_key(msgs[i])
+  return keys
+
+def vectorized_templates(msgs: Sequence[str]) -> Tuple["np.ndarray", List[str], List[str]]:
+  """
+    (codes, keys, templates) for a batch of messages: each message's index into the distinct keys and their
+    templates. Duplicates are factorized away first; keys are computed column-wise, and templates once per
+    distinct key (messages that differ only in numbers or quoted names share a key).
+  """
+  _require_pandas()
+  msg_codes, unique_msgs = pd.factorize(pd.Series(msgs, dtype=object), sort=False)
+  key_codes, unique_keys = pd.factorize(pd.Series(vectorized_message_keys(list(unique_msgs)), dtype=object), sort=False)
+  keys = list(unique_keys)
+  return key_codes[msg_codes], keys, [message_template(k) for k in keys]
+
+def _extract(arr, rows: "np.ndarray", pattern, level: Optional[str]):
+  # Matches of one pattern over the RE2-safe rows: (row indices, levels, step numbers or None, messages)
+  matched = pc.extract_regex(arr, _re2(pattern))
+  hit = matched.is_valid().to_numpy(zero_copy_only=False)
+  if not hit.any():
+    return rows[:0], [], None, []
+  matched = matched.filter(pa.array(hit))
+  msgs = pc.utf8_trim_whitespace(matched.field("msg")).to_pylist()
+  if level is None:
+    levels = pc.ascii_lower(matched.field("level")).to_pylist()
+    steps = None
+  else:
+    levels = [level] * len(msgs)
+    steps = matched.field("step").to_pylist()
+  return rows[hit], levels, steps, msgs
+
+def parse_columns(tool: str, texts: List[str]) -> Tuple["np.ndarray", List[str], List[Optional[str]], List[str]]:
+  """
+    Vectorized parse_records over a batch of lines, as columns: (line indices, levels, codes, messages) for
+    every line that carries a log message, in line order. Same results as the per-line matcher.
+  """
+  _require_pandas()
+  n = len(texts)
+  rows_parts, levels, codes, msgs = [], [], [], []
+  slow = np.arange(n)
+  if PYARROW_AVAILABLE and n:
+    arr = pa.array(texts, pa.string())
+    safe = _re2_safe(arr)
+    slow = np.flatnonzero(~safe)
+    fast_rows = np.flatnonzero(safe)
+    fast = arr.filter(pa.array(safe))
+    if tool == "iverilog":
+      patterns = [(IVERILOG_PTRN, None)]
+    elif tool == "yosys":
+      # A line can match at most one of these: a step starts with a digit, a leveled message with a letter
+      patterns = [(YOSYS_STEP_PTRN, "info"), (YOSYS_LEVELED_PTRN, None)]
+    else:
+      patterns = []
+    for pattern, level in patterns:
+      rows, lv, steps, ms = _extract(fast, fast_rows, pattern, level)
+      rows_parts.append(rows)
+      levels += lv
+      codes += [f"step:{int(s)}" for s in steps] if steps is not None else [None] * len(ms)
+      msgs += ms
+
+  slow_rows = []
+  for row, _, level, code, msg in _match_lines(tool, ((int(i), texts[i]) for i in slow)):
+    slow_rows.append(row)
+    levels.append(level)
+    codes.append(code)
+    msgs.append(msg)
+  rows_parts.append(np.asarray(slow_rows, dtype=np.int64))
+
+  rows_parts = [part for part in rows_parts if len(part)]
+  if len(rows_parts) <= 1:
+    # Already in line order
+    return (rows_parts[0] if rows_parts else np.empty(0, dtype=np.int64)), levels, codes, msgs
+  rows = np.concatenate(rows_parts)
+  order = np.argsort(rows, kind="stable")
+  return (
+    rows[order],
+    [levels[i] for i in order],
+    [codes[i] for i in order],
+    [msgs[i] for i in order],
+  )
+
+def sample_priorities(offsets: "np.ndarray", source: str) -> "np.ndarray":
+  """normalize._sample_priority for a column of byte offsets from one source file, as uint64."""
+  salt = np.uint64(zlib.crc32(source.encode()))
+  # uint64 arithmetic wraps modulo 2**64, exactly like the masked Python ints
+  x = (offsets.astype(np.int64).astype(np.uint64) ^ (salt << np.uint64(32))) * np.uint64(_PRIORITY_MULTIPLIER)
+  return x ^ (x >> np.uint64(29))
+
+def cluster_columns(
+  tool: str,
+  source: str,
+  offsets: "np.ndarray",
+  levels: List[str],
+  codes: List[Optional[str]],
+  msgs: List[str],
+  sample_size: int,
+) -> ClusterTable:
+  """A partial ClusterTable for one batch of parsed items given as columns, built with grouped pandas ops."""
+  n = len(msgs)
+  table = ClusterTable(sample_size=sample_size)
+  if n == 0:
+    return table
+  key_codes, keys, templates = vectorized_templates(msgs)
+  # Template ids in first-seen order: factorize keeps first-appearance order at every step
+  template_of_key, unique_templates = pd.factorize(pd.Series(templates, dtype=object), sort=False)
+  level_codes, unique_levels = pd.factorize(pd.Series(levels, dtype=object), sort=False)
+  frame = pd.DataFrame({
+    "cluster": template_of_key[key_codes],
+    "key": key_codes,
+    "level": level_codes,
+    "position": np.arange(n, dtype=np.int64),
+  })
+
+  # Exact per-cluster stats in one grouped pass; sort=False keeps first-seen order, which fixes cluster ids
+  stats = frame.groupby("cluster", sort=False).agg(
+    key=("key", "first"),
+    count=("position", "size"),
+    first_seen=("position", "min"),
+    last_seen=("position", "max"),
+  )
+  level_counts: List[Dict[str, int]] = [{} for _ in range(len(unique_templates))]
+  by_level = frame.groupby(["cluster", "level"], sort=False).size()
+  for (cluster, level), count in zip(by_level.index.tolist(), by_level.tolist()):
+    level_counts[cluster][unique_levels[level]] = count
+
+  accs: List[ClusterAccumulator] = []
+  rows = zip(stats.index.tolist(), stats["key"].tolist(), stats["count"].tolist(), stats["first_seen"].tolist(), stats["last_seen"].tolist())
+  for cluster, key, count, first_seen, last_seen in rows:
+    acc = ClusterAccumulator(cluster, keys[key], unique_templates[cluster], sample_size)
+    acc.count = count
+    acc.level_counts = level_counts[cluster]
+    acc.tool_counts = {tool: count}
+    acc.sources = {source}
+    acc.first_seen = first_seen
+    acc.last_seen = last_seen
+    table._clusters[acc.template] = acc
+    accs.append(acc)
+
+  # Bottom-k sample per cluster: the sample_size lowest priorities, same as the streaming heap keeps
+  if sample_size > 0:
+    frame["priority"] = sample_priorities(offsets, source)
+    sampled = frame.sort_values(["priority", "position"], kind="stable").groupby("cluster", sort=False).head(sample_size)
+    tool = sys.intern(tool)
+    for cluster, priority, position in zip(sampled["cluster"].tolist(), sampled["priority"].tolist(), sampled["position"].tolist()):
+      code = codes[position]
+      record = LogRecord(
+        tool,
+        sys.intern(levels[position]),
+        sys.intern(code) if code is not None else None,
+        msgs[position],
+        source,
+        int(offsets[position]),
+        None,
+      )
+      accs[cluster]._offer(-priority, position, record)
+
+  table.items_seen = n
+  # Reported like the memo: every repeat of an already-normalized message is a hit
+  distinct = len(set(msgs))
+  table.memo.misses = distinct
+  table.memo.hits = n - distinct
+  return table
+
+def _read_batch(path: str, start: int, end: int) -> Tuple["np.ndarray", List[str]]:
+  # (byte offsets, texts) of the lines starting in [start, end), decoded like read_lines_with_offsets
+  with open(path, "rb") as fh:
+    fh.seek(start)
+    data = fh.read(end - start)
+  raw = data.split(b"\n")
+  if raw and raw[-1] == b"":
+    raw.pop()
+  lengths = np.fromiter(map(len, raw), dtype=np.int64, count=len(raw)) + 1
+  offsets = start + np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+  # Dropping invalid bytes never touches a newline, so the decoded text splits into the same lines
+  texts = data.decode("utf-8", errors="ignore").split("\n")[:len(raw)]
+  return offsets, [t.rstrip("\r") for t in texts]
+
+def batch_ingest_range(
+  table: ClusterTable,
+  tool: str,
+  path: str,
+  start: int = 0,
+  end: Optional[int] = None,
+  batch_bytes: int = DEFAULT_BATCH_BYTES,
+  metrics: Optional[PipelineMetrics] = None,
+) -> ClusterTable:
+  """
+    Vectorized counterpart of table.update(parse_records(...)) for a byte range of a log file: each
+    newline-aligned batch is parsed, normalized and aggregated column-wise, then merged in order, so the
+    result matches a streaming pass over the same lines.
+  """
+  _require_pandas()
+  for s, e in split_byte_ranges(path, batch_bytes, start, end):
+    with stage(metrics, "read") as read_stats:
+      offsets, texts = _read_batch(path, s, e)
+    with stage(metrics, "parse") as parse_stats:
+      rows, levels, codes, msgs = parse_columns(tool, texts)
+    # Key normalization is vectorized into the grouping, so it is timed as part of clustering here
+    with stage(metrics, "cluster") as cluster_stats:
+      table.merge(cluster_columns(tool, sys.intern(path), offsets[rows], levels, codes, msgs, table.sample_size))
+    if metrics is not None:
+      read_stats.items += len(texts)
+      parse_stats.items += len(msgs)
+      cluster_stats.items += len(msgs)
+  return table
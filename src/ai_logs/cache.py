@@ -0,0 +1,114 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from .schema import Summary
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 10_000
+
+def cache_key(fingerprint: str, prompt_version: str, model: str) -> str:
+  # A summary is only reusable for the same template, prompt revision and model
+  return hashlib.sha256(f"{fingerprint}|{prompt_version}|{model}".encode()).hexdigest()
+
+class SummaryCache:
+  """Persistent SQLite summary cache with TTL expiry and size-bounded LRU eviction."""
+
+  def __init__(
+    self,
+    path: Path,
+    model: str,
+    prompt_version: str,
+    ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    clock: Callable[[], float] = time.time,
+  ):
+    self.path = Path(path)
+    self.model = model
+    self.prompt_version = prompt_version
+    self.ttl_seconds = ttl_seconds
+    self.max_entries = max_entries
+    self._clock = clock
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+    self.path.parent.mkdir(parents=True, exist_ok=True)
+    self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+    self._conn.execute(
+      "CREATE TABLE IF NOT EXISTS summaries ("
+      " key TEXT PRIMARY KEY,"
+      " payload TEXT NOT NULL,"
+      " created_at REAL NOT NULL,"
+      " last_access REAL NOT NULL)"
+    )
+    self._conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_last_access ON summaries(last_access)")
+    self._conn.commit()
+    self.purge_expired()
+
+  def _key(self, fingerprint: str) -> str:
+    return cache_key(fingerprint, self.prompt_version, self.model)
+
+  def get(self, fingerprint: str) -> Optional[Summary]:
+    key = self._key(fingerprint)
+    now = self._clock()
+    with self._lock:
+      row = self._conn.execute(
+        "SELECT payload, created_at FROM summaries WHERE key = ?", (key,)
+      ).fetchone()
+      if row is None:
+        self.misses += 1
+        return None
+      payload, created_at = row
+      if now - created_at > self.ttl_seconds:
+        self._conn.execute("DELETE FROM summaries WHERE key = ?", (key,))
+        self._conn.commit()
+        self.misses += 1
+        return None
+      self._conn.execute("UPDATE summaries SET last_access = ? WHERE key = ?", (now, key))
+      self._conn.commit()
+      self.hits += 1
+    return Summary.model_validate_json(payload)
+
+  def put(self, fingerprint: str, summary: Summary) -> None:
+    key = self._key(fingerprint)
+    now = self._clock()
+    with self._lock:
+      self._conn.execute(
+        "INSERT OR REPLACE INTO summaries (key, payload, created_at, last_access) VALUES (?, ?, ?, ?)",
+        (key, summary.model_dump_json(), now, now),
+      )
+      self._evict_over_capacity()
+      self._conn.commit()
+
+  def _evict_over_capacity(self) -> None:
+    (size,) = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()
+    excess = size - self.max_entries
+    if excess > 0:
+      self._conn.execute(
+        "DELETE FROM summaries WHERE key IN (SELECT key FROM summaries ORDER BY last_access ASC LIMIT ?)",
+        (excess,),
+      )
+      self.evictions += excess
+
+  def purge_expired(self) -> int:
+    cutoff = self._clock() - self.ttl_seconds
+    with self._lock:
+      cur = self._conn.execute("DELETE FROM summaries WHERE created_at < ?", (cutoff,))
+      self._conn.commit()
+    return cur.rowcount
+
+  def __len__(self) -> int:
+    with self._lock:
+      (size,) = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()
+    return size
+
+  def stats(self) -> Dict[str, int]:
+    return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": len(self)}
+
+  def close(self) -> None:
+    with self._lock:
+      self._conn.close()
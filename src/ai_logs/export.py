@@ -0,0 +1,223 @@
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+from .lazy import lazy_import
+
+try:
+  pa = lazy_import("pyarrow")
+  pq = lazy_import("pyarrow.parquet")
+  PYARROW_AVAILABLE = True
+except ImportError:
+  PYARROW_AVAILABLE = False
+
+from .normalize import ClusterAccumulator, DrainMiner, FingerprintMemo, template_hash
+from .schema import Cluster, LogItem, LogRecord, Summary
+
+COLUMNAR_FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow"}
+# Rows buffered per record batch (and Parquet row group) while streaming items out
+DEFAULT_BATCH_ROWS = 64 * 1024
+
+# Low-cardinality string columns; stored once per distinct value with int32 codes per row
+ITEM_DICTIONARY_COLUMNS = ("run_id", "tool", "level", "code", "fingerprint", "cluster_id", "source")
+CLUSTER_DICTIONARY_COLUMNS = ("run_id", "cluster_id", "fingerprint", "tool", "severity")
+SEVERITY_ORDER = {'error': 3, 'warning': 2, 'info': 1}
+
+def default_run_id() -> str:
+  return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+def columnar_format(path: Union[str, Path]) -> str:
+  fmt = COLUMNAR_FORMATS.get(Path(path).suffix.lower())
+  if fmt is None:
+    raise ValueError(f"cannot tell the export format of {path}; use one of {', '.join(COLUMNAR_FORMATS)}")
+  return fmt
+
+def _require_pyarrow() -> None:
+  if not PYARROW_AVAILABLE:
+    raise RuntimeError("Parquet/Arrow export needs pyarrow; install it with `pip install pyarrow`")
+
+def _dictionary_type():
+  return pa.dictionary(pa.int32(), pa.string())
+
+def item_schema():
+  _require_pyarrow()
+  return pa.schema([
+    ("run_id", _dictionary_type()),
+    ("position", pa.int64()),
+    ("tool", _dictionary_type()),
+    ("level", _dictionary_type()),
+    ("code", _dictionary_type()),
+    ("fingerprint", _dictionary_type()),
+    ("cluster_id", _dictionary_type()),
+    ("msg", pa.string()),
+    ("source", _dictionary_type()),
+    ("offset", pa.int64()),
+    ("raw", pa.string()),
+  ])
+
+def cluster_schema():
+  _require_pyarrow()
+  return pa.schema([
+    ("run_id", _dictionary_type()),
+    ("cluster_id", _dictionary_type()),
+    ("fingerprint", _dictionary_type()),
+    ("key", pa.string()),
+    ("count", pa.int64()),
+    ("tool", _dictionary_type()),
+    ("severity", _dictionary_type()),
+    ("level_counts", pa.map_(pa.string(), pa.int64())),
+    ("tool_counts", pa.map_(pa.string(), pa.int64())),
+    ("first_seen", pa.int64()),
+    ("last_seen", pa.int64()),
+    ("explanation", pa.string()),
+    ("suggested_fixes", pa.list_(pa.string())),
+  ])
+
+class _DictionaryColumn:
+  """
+    Dictionary codes for one column, kept across batches. Each batch's dictionary extends the previous one,
+    so the Arrow IPC file writer can emit it as a delta instead of rejecting a replacement.
+  """
+
+  def __init__(self):
+    self.values: List[str] = []
+    self.codes: Dict[str, int] = {}
+
+  def encode(self, values: Sequence[Optional[str]]):
+    indices = []
+    for v in values:
+      if v is None:
+        indices.append(None)
+        continue
+      code = self.codes.get(v)
+      if code is None:
+        code = self.codes[v] = len(self.values)
+        self.values.append(v)
+      indices.append(code)
+    return pa.DictionaryArray.from_arrays(pa.array(indices, pa.int32()), pa.array(self.values, pa.string()))
+
+class _ColumnarWriter:
+  def __init__(self, path: Path, schema, fmt: Optional[str], dictionary_columns: Sequence[str]):
+    _require_pyarrow()
+    self.path = Path(path)
+    self.fmt = fmt or columnar_format(self.path)
+    self.schema = schema
+    self.path.parent.mkdir(parents=True, exist_ok=True)
+    self._dictionaries = {name: _DictionaryColumn() for name in dictionary_columns}
+    if self.fmt == "parquet":
+      self._writer = pq.ParquetWriter(str(self.path), schema, compression="zstd")
+    else:
+      options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+      self._writer = pa.ipc.new_file(str(self.path), schema, options=options)
+    self.rows = 0
+
+  def write_columns(self, columns: Dict[str, list]) -> None:
+    arrays = []
+    for field in self.schema:
+      values = columns[field.name]
+      dictionary = self._dictionaries.get(field.name)
+      arrays.append(dictionary.encode(values) if dictionary is not None else pa.array(values, field.type))
+    batch = pa.record_batch(arrays, schema=self.schema)
+    self._writer.write_batch(batch)
+    self.rows += batch.num_rows
+
+  def close(self) -> None:
+    self._writer.close()
+
+class ItemExporter:
+  """
+    ClusterTable item sink that streams every parsed item into a Parquet or Arrow IPC file, one record
+    batch at a time, tagged with its run, cluster id and template fingerprint. Items join the cluster export
+    on (run_id, cluster_id). With a clusterer whose templates are still being learned while items stream by
+    (see `memo.stable_templates`), the fingerprint is not known yet and is left null.
+  """
+
+  def __init__(
+    self,
+    path: Path,
+    run_id: str,
+    fmt: Optional[str] = None,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    memo: Optional[Union[FingerprintMemo, DrainMiner]] = None,
+  ):
+    self.run_id = run_id
+    self.batch_rows = max(1, batch_rows)
+    self._memo = memo if memo is not None else FingerprintMemo(0)
+    self._writer = _ColumnarWriter(path, item_schema(), fmt, ITEM_DICTIONARY_COLUMNS)
+    self._fingerprints: Dict[int, Optional[str]] = {}
+    self._columns: Dict[str, list] = {name: [] for name in self._writer.schema.names}
+
+  @property
+  def path(self) -> Path:
+    return self._writer.path
+
+  @property
+  def rows(self) -> int:
+    return self._writer.rows + len(self._columns["position"])
+
+  def __call__(self, acc: ClusterAccumulator, item: Union[LogItem, LogRecord], position: int) -> None:
+    if acc.index in self._fingerprints:
+      fp = self._fingerprints[acc.index]
+    else:
+      # Same derivation as ClusterTable.clusters(), so both exports agree on every cluster's fingerprint
+      fp = template_hash(self._memo.describe(acc.key, acc.template)[1]) if self._memo.stable_templates else None
+      self._fingerprints[acc.index] = fp
+    cols = self._columns
+    cols["run_id"].append(self.run_id)
+    cols["position"].append(position)
+    cols["tool"].append(item.tool)
+    cols["level"].append(item.level)
+    cols["code"].append(item.code)
+    cols["fingerprint"].append(fp)
+    cols["cluster_id"].append(f"cluster_{acc.index}")
+    cols["msg"].append(item.msg)
+    if isinstance(item, LogItem):
+      cols["source"].append(None)
+      cols["offset"].append(None)
+      cols["raw"].append(item.raw)
+    else:
+      cols["source"].append(item.source)
+      cols["offset"].append(item.offset)
+      cols["raw"].append(item.raw_text)
+    if len(cols["position"]) >= self.batch_rows:
+      self.flush()
+
+  def flush(self) -> None:
+    if not self._columns["position"]:
+      return
+    self._writer.write_columns(self._columns)
+    self._columns = {name: [] for name in self._writer.schema.names}
+
+  def close(self) -> None:
+    self.flush()
+    self._writer.close()
+
+def export_clusters(
+  clusters: Sequence[Cluster],
+  summaries: Dict[str, Summary],
+  path: Path,
+  run_id: str,
+  fmt: Optional[str] = None,
+) -> int:
+  """Write one row per cluster (exact counters plus its summary, if any) as Parquet or Arrow IPC."""
+  writer = _ColumnarWriter(path, cluster_schema(), fmt, CLUSTER_DICTIONARY_COLUMNS)
+  columns: Dict[str, list] = {name: [] for name in writer.schema.names}
+  for c in clusters:
+    levels = c.level_counter()
+    tools = c.tool_counter()
+    s = summaries.get(c.id)
+    columns["run_id"].append(run_id)
+    columns["cluster_id"].append(c.id)
+    columns["fingerprint"].append(c.fingerprint or None)
+    columns["key"].append(c.key)
+    columns["count"].append(c.count)
+    columns["tool"].append(next(iter(tools), None))
+    columns["severity"].append(max(levels, key=lambda x: SEVERITY_ORDER.get(x, 0)) if levels else None)
+    columns["level_counts"].append(list(levels.items()))
+    columns["tool_counts"].append(list(tools.items()))
+    columns["first_seen"].append(c.first_seen)
+    columns["last_seen"].append(c.last_seen)
+    columns["explanation"].append(s.explanation if s else None)
+    columns["suggested_fixes"].append(list(s.suggested_fixes) if s else None)
+  writer.write_columns(columns)
+  writer.close()
+  return writer.rows
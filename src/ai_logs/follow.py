@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, IO, List, Optional, Sequence, Set
+
+from .ingest import LogJob
+from .normalize import ClusterAccumulator, ClusterTable
+from .parse import parse_lines
+from .schema import Cluster, Summary
+from .summarize import has_no_key_heuristic, summarize_clusters, DEFAULT_MAX_CONCURRENCY
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_DEBOUNCE_SECONDS = 5.0
+READ_CHUNK_BYTES = 1 << 20
+
+class LogTailer:
+  """Follows one log the way `tail -F` does: the file may not exist yet, and may be rotated or truncated."""
+
+  def __init__(self, tool: str, path: str, from_start: bool = True):
+    self.tool = tool
+    self.path = path
+    # Only output that predates the follower is skipped; a file created later is new output from its first byte
+    self._skip_existing = not from_start and os.path.exists(path)
+    self._fh: Optional[IO[bytes]] = None
+    self._inode: Optional[int] = None
+    self._pending = b""
+
+  def _open(self) -> bool:
+    try:
+      fh = open(self.path, "rb")
+    except OSError:
+      return False
+    self._fh = fh
+    self._inode = os.fstat(fh.fileno()).st_ino
+    self._pending = b""
+    if self._skip_existing:
+      fh.seek(0, os.SEEK_END)
+    # Whatever replaces this file after a rotation is new output, so it is always read from the top
+    self._skip_existing = False
+    return True
+
+  def close(self) -> None:
+    if self._fh is not None:
+      self._fh.close()
+      self._fh = None
+
+  def _drain(self) -> List[str]:
+    lines: List[str] = []
+    while True:
+      chunk = self._fh.read(READ_CHUNK_BYTES)
+      if not chunk:
+        return lines
+      data = self._pending + chunk
+      # Hold back a trailing partial line until the writer finishes it
+      cut = data.rfind(b"\n") + 1
+      self._pending = data[cut:]
+      lines += [line.rstrip(b"\r").decode("utf-8", errors="replace") for line in data[:cut].split(b"\n")[:-1]]
+
+  def read_lines(self) -> List[str]:
+    """Complete lines written since the previous call."""
+    if self._fh is None and not self._open():
+      return []
+    # Drain the current handle first so lines written just before a rotation are not lost
+    lines = self._drain()
+    try:
+      st = os.stat(self.path)
+    except OSError:
+      return lines
+    if st.st_ino != self._inode:
+      self.close()
+      if self._open():
+        lines += self._drain()
+    elif st.st_size < self._fh.tell():
+      self._fh.seek(0)
+      self._pending = b""
+      lines += self._drain()
+    return lines
+
+
+class LogFollower:
+  """
+    Tails a set of logs into one cluster table. Summaries are requested in the background the first time a
+    cluster crosses has_no_key_heuristic, and outputs are rewritten at most once per debounce interval.
+  """
+
+  def __init__(
+    self,
+    jobs: Sequence[LogJob],
+    table: ClusterTable,
+    write_outputs: Callable[[List[Cluster], Dict[str, Summary]], None],
+    debounce_seconds: float = DEFAULT_DEBOUNCE_SECONDS,
+    from_start: bool = True,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    clock: Callable[[], float] = time.monotonic,
+    **summarize_kwargs: Any,
+  ):
+    self.tailers = [LogTailer(tool, path, from_start) for tool, path in jobs]
+    self.table = table
+    self.write_outputs = write_outputs
+    self.debounce_seconds = debounce_seconds
+    self.summarize_kwargs = summarize_kwargs
+    self._clock = clock
+    self._pool = ThreadPoolExecutor(max_workers=max(1, max_concurrency))
+    self._lock = threading.Lock()
+    self._summaries: Dict[str, Summary] = {}
+    self._requested: Set[str] = set()
+    self._dirty = False
+    self._last_write: Optional[float] = None
+
+  def poll(self) -> int:
+    """Ingest newly written lines from every log; returns the number of new log items."""
+    changed: Dict[int, ClusterAccumulator] = {}
+    seen_before = self.table.items_seen
+    for tailer in self.tailers:
+      for item in parse_lines(tailer.tool, tailer.read_lines()):
+        acc = self.table.add(item)
+        changed[acc.index] = acc
+    for acc in changed.values():
+      cluster_id = f"cluster_{acc.index}"
+      if cluster_id in self._requested:
+        continue
+      # Same key and fingerprint as ClusterTable.clusters(), so cache and index lookups agree with batch runs
+      key, template = self.table.memo.describe(acc.key, acc.template)
+      cluster = acc.to_cluster(cluster_id, key=key, template=template)
+      if has_no_key_heuristic(cluster):
+        self._requested.add(cluster_id)
+        self._pool.submit(self._summarize, cluster)
+    new_items = self.table.items_seen - seen_before
+    if new_items:
+      with self._lock:
+        self._dirty = True
+    return new_items
+
+  def _summarize(self, cluster: Cluster) -> None:
+    summaries = summarize_clusters([cluster], max_concurrency=1, **self.summarize_kwargs)
+    if not summaries:
+      return
+    with self._lock:
+      self._summaries.update(summaries)
+      self._dirty = True
+
+  def summaries(self) -> Dict[str, Summary]:
+    with self._lock:
+      return dict(self._summaries)
+
+  def flush(self, force: bool = False) -> bool:
+    """Rewrite the outputs if anything changed and the debounce interval has passed (or force is set)."""
+    now = self._clock()
+    with self._lock:
+      if not self._dirty:
+        return False
+      if not force and self._last_write is not None and now - self._last_write < self.debounce_seconds:
+        return False
+      self._dirty = False
+      self._last_write = now
+      summaries = dict(self._summaries)
+    clusters = self.table.clusters()
+    self.write_outputs(clusters, {c.id: summaries[c.id] for c in clusters if c.id in summaries})
+    return True
+
+  def run(
+    self,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    stop: Callable[[], bool] = lambda: False,
+    sleep: Callable[[float], None] = time.sleep,
+  ) -> None:
+    try:
+      while not stop():
+        if not self.poll():
+          sleep(poll_interval)
+        self.flush()
+    except KeyboardInterrupt:
+      pass
+    finally:
+      self.close()
+
+  def close(self) -> None:
+    # Let in-flight summaries land so the final write includes them
+    self._pool.shutdown(wait=True)
+    for tailer in self.tailers:
+      tailer.close()
+    self.flush(force=True)
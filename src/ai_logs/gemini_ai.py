@@ -1,36 +1,133 @@
 import os
-from typing import List, Optional
+import re
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+from .lazy import lazy_import
+from .normalize import QUOTED_STRING_PATTERN, message_key, message_template
+from .ratelimit import TokenBucket
 from .schema import Cluster, Summary
 
+# Both are imported on the first LLM call, so runs that never summarize do not pay for them
+tenacity = lazy_import("tenacity")
+urllib_error = lazy_import("urllib.error")
+
 try:
-  from google import genai
+  genai = lazy_import("google.genai")
   GEMINI_AVAILABLE = True
 except ImportError:
   GEMINI_AVAILABLE = False
 
-def create_summary_prompt(cluster: Cluster) -> str:
-  # Use the first 3 msgs in the cluster as example for now (future_work-validate performance & quality under different sample sizes)
-  sample_messages = [item.msg for item in cluster.items[:3]]  
-  tool_types = list(set(item.tool for item in cluster.items))
-  levels = list(set(item.level for item in cluster.items))
-  prompt = f"""
-    You are an expert in Electronic Design Automation (EDA) tools. Analyze the following log messages and provide a clear explanation and suggested fixes.
-    Tool(s): {', '.join(tool_types)}
-    Severity: {', '.join(levels)}
-    Occurrences: {cluster.count}
-    Message template: {cluster.key}
-
-    Sample messages:
-    {chr(10).join(f"- {msg}" for msg in sample_messages)}
-
-    Write ONLY in this exact format (no extra prose, no code fences, no markdown headings):
-    EXPLANATION: <one concise paragraph>
-    FIXES:
-    - <fix 1>
-    - <fix 2>
-    - <fix 3>
+MODEL_NAME = "gemini-2.5-flash"
+# Bump whenever create_summary_prompt changes so cached summaries are not reused across prompt revisions
+PROMPT_VERSION = "2"
+
+# Sample messages per cluster prompt: at most this many, and at most this many estimated tokens of them
+MAX_SAMPLES = 5
+DEFAULT_SAMPLE_TOKENS = 160
+# Two values are enough to show the model a position varies; more samples are only added for new templates
+VALUES_PER_SLOT = 2
+
+# Retry transient API failures with jittered exponential backoff
+RETRY_ATTEMPTS = 4
+RETRY_BACKOFF_BASE = 0.5
+RETRY_BACKOFF_MAX = 8.0
+# HTTP statuses worth another attempt: request timeout, rate limited, and server-side failures
+RETRY_STATUS = frozenset({408, 429})
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client() -> Any:
+  # One shared client per process so its HTTP connection pool is reused across clusters and threads
+  global _client
+  if _client is None:
+    with _client_lock:
+      if _client is None:
+        _client = genai.Client()
+  return _client
+
+# Rough chars-per-token ratio for English/log text; used for prompt budgets and token reporting
+CHARS_PER_TOKEN = 4
+
+# Shared by the single-cluster and batched prompts
+EXPERT_PREAMBLE = "You are an expert in Electronic Design Automation (EDA) tools."
+RESPONSE_FORMAT = """EXPLANATION: <one concise paragraph>
+FIXES:
+- <fix 1>
+- <fix 2>
+- <fix 3>"""
+
+def estimate_tokens(text: str) -> int:
+  return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def _variable_values(msg: str) -> Set[Tuple[str, str]]:
+  """
+    The (slot, value) pairs a message fills into its template, e.g. {("q0", "'clk'"), ("w3", "42")}: quoted
+    strings by occurrence, and every other word the normalizer replaced by its position. The template itself
+    is included, so members of a merged or Drain cluster that normalize differently also count as distinct.
+  """
+  quoted = QUOTED_STRING_PATTERN.findall(msg)
+  values = {(f"q{i}", q) for i, q in enumerate(quoted)}
+  # Quoted strings may contain spaces, so words are compared with those already collapsed on both sides
+  words = QUOTED_STRING_PATTERN.sub("'<SIG>'", msg).split()
+  template = message_template(message_key(msg))
+  values.update((f"w{i}", w) for i, (w, t) in enumerate(zip(words, template.split())) if w != t)
+  values.add(("template", template))
+  return values
+
+def select_samples(cluster: Cluster, token_budget: int = DEFAULT_SAMPLE_TOKENS, max_samples: int = MAX_SAMPLES) -> List[str]:
+  """
+    Representative sample messages: greedily the one that fits the token budget and shows the most variable
+    values not seen yet (shorter first on ties), until nothing fits, `max_samples` is reached, or every slot
+    already shows VALUES_PER_SLOT values and no new template is left. Exact duplicates are never repeated; when
+    no message fits the budget at all, the most informative one is still shown.
   """
-  return prompt
+  candidates = [
+    (msg, _variable_values(msg), estimate_tokens(msg) + 1)
+    for msg in dict.fromkeys(item.msg for item in cluster.items)
+  ]
+  shown: Dict[str, Set[str]] = {}
+
+  def gain(values: Set[Tuple[str, str]]) -> int:
+    return sum(
+      1 for slot, value in values
+      if value not in shown.get(slot, ()) and (slot == "template" or len(shown.get(slot, ())) < VALUES_PER_SLOT)
+    )
+
+  samples: List[str] = []
+  used = 0
+  while candidates and len(samples) < max_samples:
+    msg, values, cost = candidates.pop(max(
+      range(len(candidates)),
+      key=lambda i: (used + candidates[i][2] <= token_budget, gain(candidates[i][1]), -candidates[i][2]),
+    ))
+    if samples and (used + cost > token_budget or not gain(values)):
+      break
+    samples.append(msg)
+    for slot, value in values:
+      shown.setdefault(slot, set()).add(value)
+    used += cost
+  return samples
+
+def _cluster_fields(cluster: Cluster, sample_tokens: int) -> List[str]:
+  lines = [
+    f"Tool(s): {', '.join(cluster.tool_counter())}",
+    f"Severity: {', '.join(cluster.level_counter())}",
+    f"Occurrences: {cluster.count}",
+    f"Message template: {cluster.key}",
+    "Sample messages:",
+  ]
+  return lines + [f"- {msg}" for msg in select_samples(cluster, sample_tokens)]
+
+def create_summary_prompt(cluster: Cluster, sample_tokens: int = DEFAULT_SAMPLE_TOKENS) -> str:
+  return "\n".join([
+    f"{EXPERT_PREAMBLE} Analyze the following log messages and provide a clear explanation and suggested fixes.",
+    *_cluster_fields(cluster, sample_tokens),
+    "",
+    "Write ONLY in this exact format (no extra prose, no code fences, no markdown headings):",
+    RESPONSE_FORMAT,
+  ]) + "\n"
 
 def parse_summary_response(response_text: str, cluster_id: int) -> Summary:
   """
@@ -96,21 +193,107 @@ def parse_summary_response(response_text: str, cluster_id: int) -> Summary:
     suggested_fixes=suggested_fixes
   )
 
-def generate_summary_with_gemini(cluster: Cluster) -> Optional[Summary]:
-  if not GEMINI_AVAILABLE:
+BATCH_PREAMBLE = f"""{EXPERT_PREAMBLE} Each cluster below groups similar log messages. For EVERY cluster, provide a clear explanation and suggested fixes.
+
+Answer each cluster in its own block, keeping the cluster id exactly as given (no extra prose, no code fences, no markdown headings):
+=== CLUSTER <cluster id> ===
+{RESPONSE_FORMAT}
+=== END ===
+"""
+
+BATCH_BLOCK_PTRN = re.compile(r"^=== CLUSTER (?P<id>\S+) ===\s*$(?P<body>.*?)(?=^=== (?:END|CLUSTER)\b|\Z)", re.M | re.S)
+
+def _cluster_block(cluster: Cluster, sample_tokens: int = DEFAULT_SAMPLE_TOKENS) -> str:
+  return "\n".join([f"=== CLUSTER {cluster.id} ===", *_cluster_fields(cluster, sample_tokens), "=== END ==="])
+
+def create_batch_prompt(clusters: List[Cluster], sample_tokens: int = DEFAULT_SAMPLE_TOKENS) -> str:
+  # The instruction preamble is sent once per batch instead of once per cluster
+  return BATCH_PREAMBLE + "\n" + "\n\n".join(_cluster_block(c, sample_tokens) for c in clusters) + "\n"
+
+def pack_batches(clusters: List[Cluster], token_budget: int, sample_tokens: int = DEFAULT_SAMPLE_TOKENS) -> List[List[Cluster]]:
+  """Greedily pack clusters, in order, into batches whose prompt stays under token_budget."""
+  batches: List[List[Cluster]] = []
+  current: List[Cluster] = []
+  used = estimate_tokens(BATCH_PREAMBLE)
+  for cluster in clusters:
+    cost = estimate_tokens(_cluster_block(cluster, sample_tokens)) + 1
+    if current and used + cost > token_budget:
+      batches.append(current)
+      current = []
+      used = estimate_tokens(BATCH_PREAMBLE)
+    # A cluster larger than the budget on its own still gets a batch of one
+    current.append(cluster)
+    used += cost
+  if current:
+    batches.append(current)
+  return batches
+
+def parse_multi_summary_response(response_text: str, cluster_ids: List[str]) -> Dict[str, Summary]:
+  """
+    Goal (one block per cluster, any order):
+      === CLUSTER cluster_3 ===
+      EXPLANATION: <some explanation text>
+      FIXES:
+      - <fix 1>
+      === END ===
+    Clusters the model dropped or mangled are simply absent from the result.
+  """
+  wanted = set(cluster_ids)
+  summaries: Dict[str, Summary] = {}
+  for m in BATCH_BLOCK_PTRN.finditer(response_text.strip().strip('`')):
+    cid = m.group("id")
+    body = m.group("body").strip()
+    if cid not in wanted or cid in summaries or not body:
+      continue
+    summaries[cid] = parse_summary_response(body, int(cid.split('_')[1]))
+  return summaries
+
+def is_transient_error(exc: BaseException) -> bool:
+  """Rate limiting, 5xx, timeouts and connection failures; auth, bad-request and other 4xx errors are final."""
+  # genai's APIError and urllib's HTTPError both carry the HTTP status as `code`
+  code = getattr(exc, "code", None)
+  if isinstance(code, int):
+    return code in RETRY_STATUS or 500 <= code < 600
+  if isinstance(exc, (ConnectionError, TimeoutError)):
+    return True
+  # The genai client sends requests through httpx, whose transport errors do not subclass the builtins
+  if type(exc).__module__.split(".")[0] == "httpx":
+    return isinstance(exc, sys.modules["httpx"].TransportError)
+  return isinstance(exc, urllib_error.URLError)
+
+def _generate_content(client: Any, prompt: str, rate_limiter: Optional[TokenBucket] = None) -> str:
+  retrying = tenacity.Retrying(
+    retry=tenacity.retry_if_exception(is_transient_error),
+    stop=tenacity.stop_after_attempt(RETRY_ATTEMPTS),
+    wait=tenacity.wait_random_exponential(multiplier=RETRY_BACKOFF_BASE, max=RETRY_BACKOFF_MAX),
+    reraise=True,
+  )
+  for attempt in retrying:
+    with attempt:
+      # Every attempt, retries included, spends a rate-limit token
+      if rate_limiter is not None:
+        rate_limiter.acquire()
+      response = client.models.generate_content(
+          model=MODEL_NAME,
+          contents=prompt
+      )
+      return response.text
+
+def generate_summary_with_gemini(
+  cluster: Cluster,
+  client: Any = None,
+  rate_limiter: Optional[TokenBucket] = None,
+  sample_tokens: int = DEFAULT_SAMPLE_TOKENS,
+) -> Optional[Summary]:
+  if client is None and not GEMINI_AVAILABLE:
     print("Gemini API not available; google-genai package not installed")
     return None
   try:
-    client = genai.Client()
+    client = client if client is not None else get_client()
 
-    prompt = create_summary_prompt(cluster)
+    prompt = create_summary_prompt(cluster, sample_tokens)
 
-    response = client.models.generate_content(
-        model="gemini-2.5-flash", 
-        contents=prompt
-    )
-    
-    response_text = response.text.strip()
+    response_text = _generate_content(client, prompt, rate_limiter).strip()
     cluster_id = int(cluster.id.split('_')[1])
 
     return parse_summary_response(response_text, cluster_id)
@@ -119,12 +302,34 @@ def generate_summary_with_gemini(cluster: Cluster) -> Optional[Summary]:
     print(f"Error generating summary for cluster: {cluster.id}: {e}")
     return None
 
+def generate_batch_summaries_with_gemini(
+  clusters: List[Cluster],
+  client: Any = None,
+  rate_limiter: Optional[TokenBucket] = None,
+  sample_tokens: int = DEFAULT_SAMPLE_TOKENS,
+) -> Dict[str, Summary]:
+  if client is None and not GEMINI_AVAILABLE:
+    print("Gemini API not available; google-genai package not installed")
+    return {}
+  try:
+    client = client if client is not None else get_client()
+
+    prompt = create_batch_prompt(clusters, sample_tokens)
+
+    response_text = _generate_content(client, prompt, rate_limiter)
+
+    return parse_multi_summary_response(response_text, [c.id for c in clusters])
+
+  except Exception as e:
+    print(f"Error generating batch summary for clusters: {', '.join(c.id for c in clusters)}: {e}")
+    return {}
+
 def create_fallback_summary(cluster: Cluster) -> Summary:
   cluster_id = int(cluster.id.split('_')[1])
   return Summary(
     cluster_id=cluster_id,
     explanation=(
-      f"This cluster contains {cluster.count} {cluster.items[0].level}(s) "
+      f"This cluster contains {cluster.count} {next(iter(cluster.level_counter()), 'message')}(s) "
       f"matching: {cluster.key}"
     ),
     suggested_fixes=[
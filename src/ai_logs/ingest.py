@@ -0,0 +1,133 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+from .normalize import ClusterTable, FingerprintMemo, DEFAULT_MEMO_CAPACITY, DEFAULT_SAMPLE_SIZE
+from .parse import parse_records, read_lines_with_offsets, mmap_lines_with_offsets, split_byte_ranges
+from .batch import batch_ingest_range
+from .metrics import PipelineMetrics
+
+GLOB_CHARS = set("*?[")
+
+# Files above this size are split into newline-aligned byte ranges parsed by separate workers
+DEFAULT_CHUNK_BYTES = 64 << 20
+
+# (tool, path) pairs, e.g. ("iverilog", "regress/tc_001/iverilog.log")
+LogJob = Tuple[str, str]
+# (tool, path, start, end): a byte range of one log file; workers get offsets only, never copied text
+RangeJob = Tuple[str, str, int, Optional[int]]
+
+def expand_log_paths(pattern: Optional[str]) -> List[str]:
+  """A file, a directory (every *.log below it) or a glob pattern (`**` allowed), as a sorted file list."""
+  if not pattern:
+    return []
+  if GLOB_CHARS & set(pattern):
+    return sorted(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+  p = Path(pattern)
+  if p.is_dir():
+    return sorted(str(f) for f in p.rglob("*.log") if f.is_file())
+  if p.is_file():
+    return [pattern]
+  return []
+
+def plan_ranges(ranges: Sequence[RangeJob], chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> List[RangeJob]:
+  chunks: List[RangeJob] = []
+  for tool, path, start, end in ranges:
+    try:
+      chunks += [(tool, path, s, e) for s, e in split_byte_ranges(path, chunk_bytes, start, end)]
+    except OSError as e:
+      print(f"Skipping unreadable log {path}: {e}")
+  return chunks
+
+def _update_timed(table: ClusterTable, tool: str, path: str, lines, metrics: PipelineMetrics) -> None:
+  # The streaming stages interleave per line, so each slice of time is charged to whichever one is running;
+  # time in table.update itself, outside the memo lookup, is the clustering
+  records = metrics.timed_iter(parse_records(tool, metrics.timed_iter(lines, "read"), source=path), "parse")
+  table.memo.lookup = metrics.timed_call(table.memo.lookup, "fingerprint")
+  try:
+    with metrics.attribute("cluster") as stats:
+      before = table.items_seen
+      table.update(records)
+      stats.items += table.items_seen - before
+  finally:
+    del table.memo.lookup
+
+def cluster_range(
+  tool: str,
+  path: str,
+  start: int = 0,
+  end: Optional[int] = None,
+  sample_size: int = DEFAULT_SAMPLE_SIZE,
+  memo_capacity: int = DEFAULT_MEMO_CAPACITY,
+  engine: str = "stream",
+) -> ClusterTable:
+  table = ClusterTable(memo=FingerprintMemo(memo_capacity), sample_size=sample_size)
+  try:
+    if engine == "pandas":
+      batch_ingest_range(table, tool, path, start, end)
+    else:
+      table.update(parse_records(tool, mmap_lines_with_offsets(path, start, end), source=path))
+  except OSError as e:
+    print(f"Skipping unreadable log {path}: {e}")
+  return table
+
+def _cluster_range_job(args: Tuple[str, str, int, Optional[int], int, int, str]) -> ClusterTable:
+  table = cluster_range(*args)
+  # Only the counters are needed back in the parent; don't pickle the memo entries
+  table.memo.clear()
+  return table
+
+def ingest_ranges(
+  ranges: Sequence[RangeJob],
+  workers: int = 1,
+  sample_size: int = DEFAULT_SAMPLE_SIZE,
+  memo_capacity: int = DEFAULT_MEMO_CAPACITY,
+  table: Optional[ClusterTable] = None,
+  chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+  engine: str = "stream",
+  metrics: Optional[PipelineMetrics] = None,
+) -> ClusterTable:
+  """
+    Map each file range, or each newline-aligned chunk of a large one, to a partial cluster table in a process
+    pool, then reduce the partials in input order. The result matches a sequential pass over the same ranges:
+    cluster ids depend only on input order, never on which worker finishes first. The "pandas" engine
+    parses and aggregates each range column-wise (see batch.py) with the same results. With `metrics`,
+    in-process ingestion is broken down into read/parse/fingerprint/cluster stages; work done in the pool
+    is not, and only shows up in the caller's ingest total.
+  """
+  table = table if table is not None else ClusterTable(sample_size=sample_size)
+  if workers <= 1:
+    # In-process: stream straight into the caller's table so its memo and member spill apply
+    for tool, path, start, end in ranges:
+      try:
+        if engine == "pandas":
+          batch_ingest_range(table, tool, path, start, end, metrics=metrics)
+        elif metrics is not None:
+          _update_timed(table, tool, path, read_lines_with_offsets(path, start, end), metrics)
+        else:
+          table.update(parse_records(tool, read_lines_with_offsets(path, start, end), source=path))
+      except OSError as e:
+        print(f"Skipping unreadable log {path}: {e}")
+    return table
+
+  args = [(tool, path, start, end, sample_size, memo_capacity, engine) for tool, path, start, end in plan_ranges(ranges, chunk_bytes)]
+  if len(args) <= 1:
+    return ingest_ranges(ranges, 1, sample_size, memo_capacity, table, engine=engine, metrics=metrics)
+
+  with ProcessPoolExecutor(max_workers=workers) as pool:
+    # map() yields results in submission order, so the reduce is deterministic
+    for partial in pool.map(_cluster_range_job, args):
+      table.merge(partial)
+  return table
+
+def ingest_files(
+  jobs: Sequence[LogJob],
+  workers: int = 1,
+  sample_size: int = DEFAULT_SAMPLE_SIZE,
+  memo_capacity: int = DEFAULT_MEMO_CAPACITY,
+  table: Optional[ClusterTable] = None,
+  chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+  engine: str = "stream",
+) -> ClusterTable:
+  return ingest_ranges([(tool, path, 0, None) for tool, path in jobs], workers, sample_size, memo_capacity, table, chunk_bytes, engine)
@@ -0,0 +1,257 @@
+import re
+import threading
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+from .schema import Cluster
+
+# Bump whenever KNOWN_MESSAGES changes so cached knowledge-base answers are not reused across revisions
+KNOWLEDGE_VERSION = "2"
+# Distinct cluster keys whose lookup result is remembered
+DEFAULT_LOOKUP_CACHE = 10_000
+
+class KnownMessage(NamedTuple):
+  tools: Tuple[str, ...]  # tools that emit the message; an empty tuple matches any tool
+  pattern: str            # case-insensitive regex searched in the normalized cluster key
+  explanation: str
+  fixes: Tuple[str, ...]
+
+# Curated answers for common Icarus Verilog and Yosys messages, matched against normalized keys (quoted names
+# read '<SIG>', numbers <NUM>). The entry matching earliest in the key wins; at the same position, the one
+# listed first does, so specific patterns come before general ones.
+KNOWN_MESSAGES: Tuple[KnownMessage, ...] = (
+  KnownMessage(
+    ("iverilog", "yosys"),
+    r"syntax error",
+    "The parser hit a token it did not expect, so the file could not be read past this point. The real mistake "
+    "is usually on the line before the reported one: a missing semicolon, an unbalanced begin/end or "
+    "module/endmodule pair, or a SystemVerilog construct given to a Verilog-2005 frontend.",
+    (
+      "Check the line before the reported location for a missing ';' or an unclosed begin/end, case/endcase or module/endmodule",
+      "Compile SystemVerilog sources with SystemVerilog enabled (iverilog -g2012, yosys read_verilog -sv)",
+      "Look for a stray keyword or macro that expands to nothing near the reported token",
+    ),
+  ),
+  KnownMessage(
+    ("iverilog", "yosys"),
+    r"unknown module type|module '<SIG>' not found|undefined module|referenced in design but not found|is not part of the design",
+    "A module is instantiated but no definition for it was read, so the design hierarchy cannot be built. The "
+    "file defining it was not passed to the tool, the library search path is missing, or the module name is misspelled.",
+    (
+      "Add the file that defines the module to the command line or file list",
+      "Point the tool at the library directory (iverilog -y <dir> / -l <file>, yosys read_verilog -lib)",
+      "Check the module name in the instantiation against its definition, including case",
+    ),
+  ),
+  KnownMessage(
+    ("iverilog", "yosys"),
+    r"unable to elaborate|failed to elaborate|unable to resolve top module|no top module|top module .* not found",
+    "Elaboration could not build the design hierarchy from the top module down. This usually follows an earlier "
+    "error (a missing module, a bad port connection or an undeclared name), or the tool picked the wrong top module.",
+    (
+      "Fix the first error reported before this one; elaboration failures are usually a consequence",
+      "Name the top module explicitly (iverilog -s <top>, yosys hierarchy -top <top>)",
+      "Make sure every source file of the design is passed to the tool",
+    ),
+  ),
+  KnownMessage(
+    ("iverilog", "yosys"),
+    r"unable to bind|undefined variable|is not declared|was not declared|undeclared",
+    "A name is used that is not declared in the scope where it appears, so the tool cannot tell what it refers "
+    "to. It is typically a typo, a signal declared after its first use, or a reference into another module that "
+    "needs a hierarchical path or a port.",
+    (
+      "Declare the signal (wire/reg/logic) before its first use in the module",
+      "Check the spelling and case of the name against its declaration",
+      "Pass values between modules through ports instead of referring to another module's internals",
+    ),
+  ),
+  KnownMessage(
+    ("iverilog",),
+    r"not a valid l-value",
+    "A net (a wire, or an output port left as a wire) is assigned inside an always or initial block. Procedural "
+    "assignments can only drive variables, while nets are driven by continuous assignments or module outputs.",
+    (
+      "Declare the signal as reg (or logic in SystemVerilog) if it is meant to be assigned procedurally",
+      "For an output port, declare it `output reg` instead of a plain `output`",
+      "Otherwise keep it a wire and drive it with a continuous `assign` outside the block",
+    ),
+  ),
+  KnownMessage(
+    ("iverilog", "yosys"),
+    r"implicitly declared|implicit declaration|implicit definition",
+    "A name was used without a declaration and the tool created an implicit 1-bit wire for it. Implicit nets "
+    "silently truncate buses and hide typos in connection names.",
+    (
+      "Declare the net explicitly with the intended width",
+      "Add `default_nettype none at the top of each file so undeclared names become errors",
+      "Check the connection name for a typo against the signal it was meant to reach",
+    ),
+  ),
+  KnownMessage(
+    ("iverilog", "yosys"),
+    r"port mismatch|expects <NUM> ports|too many ports|is not a port of|has no port|port .* not found",
+    "An instance connects ports that do not match the module's declaration: the wrong number of ports, or a "
+    "named connection the module does not have. The instance was probably written against an older version of "
+    "the module interface.",
+    (
+      "Compare the instance's connections with the module's current port list",
+      "Use named port connections (.port(signal)) instead of positional ones",
+      "Rebuild after updating every instantiation when a module's ports change",
+    ),
+  ),
+  KnownMessage(
+    ("iverilog", "yosys"),
+    r"multiple drivers|conflicting drivers|driven by multiple|multiple conflicting",
+    "More than one process or continuous assignment drives the same net, so its value is ambiguous in "
+    "simulation and cannot be built in hardware.",
+    (
+      "Drive the signal from exactly one always block or assign statement",
+      "Merge the competing assignments into one block with explicit priority, or use a mux",
+      "If a tri-state bus is intended, make every driver release the net with 'z when inactive",
+    ),
+  ),
+  KnownMessage(
+    ("iverilog", "yosys"),
+    r"truncat|width mismatch|resizing cell port|padding <NUM> bits|expression size|port size mismatch",
+    "The two sides of an assignment or port connection have different bit widths, so bits are silently dropped "
+    "or zero-extended. This is a common source of wrong results that simulate without any other error.",
+    (
+      "Size the constant or signal to the destination width explicitly (e.g. 16'd5)",
+      "Check that the declared widths of connected signals and ports agree",
+      "Use an explicit part-select or extension where truncation or padding is intended",
+    ),
+  ),
+  KnownMessage(
+    ("iverilog", "yosys"),
+    r"has no driver|used but has no driver|never assigned|undriven|no driver",
+    "A signal is read but nothing ever assigns it, so it stays at x in simulation and is left floating or tied "
+    "off in synthesis. Usually an assignment was forgotten or targets a misspelled name.",
+    (
+      "Assign the signal in an always block or continuous assignment, or connect it to a driving port",
+      "Check that the assignment meant for it does not target a similarly named signal",
+      "Remove the signal if it is genuinely unused",
+    ),
+  ),
+  KnownMessage(
+    ("iverilog", "yosys"),
+    r"not connected|unconnected|left floating|connected to constant value",
+    "A port is left unconnected or tied to a constant at an instance. Unconnected inputs float (x in simulation) "
+    "and tied-off ports let synthesis optimize away the logic behind them.",
+    (
+      "Connect every input port of the instance, or tie it off explicitly to the intended value",
+      "Check for a port renamed in the module but not in the instantiation",
+      "Leave intentionally unused outputs connected with an empty .port() so the intent is visible",
+    ),
+  ),
+  KnownMessage(
+    ("iverilog", "yosys"),
+    r"is unused|declared but not used|unused sequential element|removing unused|never used",
+    "Logic or a signal has no effect on any output, so synthesis removes it. This is harmless when intentional, "
+    "but often means an output was never connected or a result is written to the wrong name.",
+    (
+      "Check that the result is connected to the output or register that should use it",
+      "Remove the unused declaration or logic if it is left over",
+      "Keep debug-only logic with a (* keep *) attribute if it must survive synthesis",
+    ),
+  ),
+  KnownMessage(
+    ("yosys",),
+    r"latch inferred|inferring latch|creating latch",
+    "A combinational always block does not assign the signal on every path, so synthesis keeps its old value "
+    "with a latch. Latches are rarely intended and cause timing and simulation/synthesis mismatches.",
+    (
+      "Assign a default value to the signal at the top of the always block",
+      "Add the missing else branch or default case",
+      "Use always_ff / a clocked always block if storage is intended",
+    ),
+  ),
+  KnownMessage(
+    ("yosys",),
+    r"replacing memory .* with list of registers",
+    "An array could not be mapped to a memory block (for example because of asynchronous reads or a reset), so "
+    "Yosys built it from individual registers, which costs far more area.",
+    (
+      "Register the read address so the array matches a synchronous RAM template",
+      "Remove the reset from the array contents",
+      "Accept the registers if the array is small",
+    ),
+  ),
+  KnownMessage(
+    ("iverilog", "yosys"),
+    r"signed/unsigned|signedness mismatch|comparison between signed and unsigned",
+    "A signed and an unsigned operand are mixed, so Verilog treats the whole expression as unsigned and negative "
+    "values compare as large positive ones.",
+    (
+      "Cast operands explicitly with $signed() or $unsigned()",
+      "Declare both operands with the same signedness",
+      "Check comparisons against negative constants in particular",
+    ),
+  ),
+  KnownMessage(
+    ("iverilog", "yosys"),
+    r"hierarchical reference|hierarchical name|cannot resolve .* hierarchical",
+    "A hierarchical path (top.sub.signal) does not resolve to an existing object, usually because an instance "
+    "name in the path changed. Synthesis tools generally do not support such references at all.",
+    (
+      "Check every instance name along the path against the current hierarchy",
+      "Replace the reference with a port in synthesizable code",
+      "Keep hierarchical references to testbenches and assertions",
+    ),
+  ),
+  KnownMessage(
+    ("iverilog",),
+    r"timescale",
+    "Some modules have a `timescale and others do not, so delays in the modules without one use the simulator "
+    "default and timing may be inconsistent.",
+    (
+      "Add the same `timescale directive to every source file",
+      "Put the `timescale in a shared include file read first",
+    ),
+  ),
+)
+
+class KnowledgeBase:
+  """
+    Indexed lookup of known tool messages. Entries are compiled into one alternation per tool, so a key is
+    matched against the whole table in a single regex search, and results are remembered per key.
+  """
+
+  def __init__(self, entries: Sequence[KnownMessage] = KNOWN_MESSAGES, cache_size: int = DEFAULT_LOOKUP_CACHE):
+    self.entries = list(entries)
+    self.cache_size = cache_size
+    self._patterns: Dict[str, "re.Pattern[str]"] = {}
+    self._cache: Dict[Tuple[str, str], Optional[int]] = {}
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+
+  def _pattern(self, tool: str) -> "re.Pattern[str]":
+    pattern = self._patterns.get(tool)
+    if pattern is None:
+      # Named groups carry the entry index; alternation tries them in table order at each position
+      alternatives = [f"(?P<e{i}>{e.pattern})" for i, e in enumerate(self.entries) if not e.tools or tool in e.tools]
+      pattern = self._patterns[tool] = re.compile("|".join(alternatives) or r"(?!)", re.I)
+    return pattern
+
+  def _find(self, tool: str, key: str) -> Optional[int]:
+    cache_key = (tool, key)
+    if cache_key in self._cache:
+      return self._cache[cache_key]
+    m = self._pattern(tool).search(key)
+    found = int(m.lastgroup[1:]) if m else None
+    if len(self._cache) >= self.cache_size:
+      self._cache.clear()
+    self._cache[cache_key] = found
+    return found
+
+  def lookup(self, cluster: Cluster) -> Optional[KnownMessage]:
+    """The entry matching the cluster's key; with several tools, the one listed first wins."""
+    with self._lock:
+      found = [i for i in (self._find(tool, cluster.key) for tool in cluster.tool_counter() or [""]) if i is not None]
+      if not found:
+        self.misses += 1
+        return None
+      self.hits += 1
+    return self.entries[min(found)]
+
+  def stats(self) -> Dict[str, int]:
+    return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
@@ -0,0 +1,37 @@
+import importlib
+import importlib.util
+import threading
+import types
+
+class LazyModule(types.ModuleType):
+  """
+    Stand-in for a heavy module that is only imported on first attribute access. Once imported, its attributes
+    are copied onto the stand-in, so later lookups cost the same as on the real module.
+  """
+
+  def __init__(self, name: str):
+    super().__init__(name)
+    self._lazy_lock = threading.Lock()
+
+  def __getattr__(self, attr: str):
+    # Only reached for attributes not yet copied over, i.e. before the first import
+    with self._lazy_lock:
+      module = importlib.import_module(self.__name__)
+      self.__dict__.update(module.__dict__)
+    return getattr(module, attr)
+
+def lazy_import(name: str) -> types.ModuleType:
+  """
+    `import name`, deferred until the module is first used. Raises ImportError straight away when it is not
+    installed, so the usual try/except availability flags keep working; the check only locates the package and
+    never runs its code.
+  """
+  top, _, rest = name.partition(".")
+  spec = importlib.util.find_spec(top)
+  # A namespace package such as `google` has no code of its own and is shared by unrelated distributions, so
+  # look for the submodule itself; inside a regular package that would run the package's (possibly heavy) __init__
+  if spec is not None and rest and spec.origin is None:
+    spec = importlib.util.find_spec(name)
+  if spec is None:
+    raise ImportError(f"No module named {name!r}", name=name)
+  return LazyModule(name)
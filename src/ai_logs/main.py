@@ -1,74 +1,484 @@
-import json
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Set
 
 import typer
-from dotenv import load_dotenv
 
-from .parse import parse_lines
-from .normalize import cluster_logs
-from .summarize import summarize_clusters
-from .report import make_markdown, write_report
+from .lazy import lazy_import
+from .normalize import (
+  ClusterTable,
+  make_clusterer,
+  CLUSTERERS,
+  DEFAULT_MEMO_CAPACITY,
+  DEFAULT_SAMPLE_SIZE,
+  DEFAULT_DRAIN_DEPTH,
+  DEFAULT_DRAIN_SIMILARITY,
+)
+from .batch import ENGINES, PANDAS_AVAILABLE
+from .ingest import expand_log_paths, ingest_ranges, DEFAULT_CHUNK_BYTES, GLOB_CHARS
+from .follow import LogFollower, DEFAULT_POLL_INTERVAL, DEFAULT_DEBOUNCE_SECONDS
+from .state import AnalysisState
+from .similarity import merge_similar_clusters
+from .summarize import summarize_clusters, DEFAULT_MAX_CONCURRENCY
+from .cache import SummaryCache, DEFAULT_MAX_ENTRIES
+from .semantic import SemanticIndex, DEFAULT_REUSE_THRESHOLD
+from .metrics import PipelineMetrics, stage
+from .server import AnalysisService, make_server, DEFAULT_PORT, DEFAULT_JOB_WORKERS, DEFAULT_QUEUE_SIZE, DEFAULT_MAX_JOBS
+from .ratelimit import TokenBucket
+from .gemini_ai import DEFAULT_SAMPLE_TOKENS
+from .providers import make_provider, KnowledgeBaseProvider, SummaryProvider, PROVIDERS, DEFAULT_HTTP_URL, DEFAULT_HTTP_MODEL
+from .export import ItemExporter, export_clusters, columnar_format, default_run_id, PYARROW_AVAILABLE
+from .report import make_markdown, write_report, write_results, RESULTS_FORMATS
+from .schema import Cluster, Summary
+
+# The CLI is started once per CI step, so anything a typical run does not touch is imported on first use
+cProfile = lazy_import("cProfile")
+dotenv = lazy_import("dotenv")
 
 app = typer.Typer(add_completion=False, help="EDA log analysis pipeline: parse → cluster → summarize → report")
 
-def _read_lines_if_exists(path_str: Optional[str], tool: str) -> list[str]:
-  if not path_str:
-    return []
-  p = Path(path_str)
-  if not p.exists():
-    return []
-  try:
-    return p.read_text(encoding="utf-8", errors="ignore").splitlines()
-  except Exception:
-    return []
+
+def _make_provider(provider: str, http_url: str, http_model: str, sample_tokens: int) -> SummaryProvider:
+  if provider not in PROVIDERS:
+    raise typer.BadParameter(f"--provider must be one of {', '.join(PROVIDERS)}")
+  return make_provider(provider, http_url=http_url, http_model=http_model, sample_tokens=sample_tokens)
+
+
+def _knowledge(knowledge_base: bool, summarizer: SummaryProvider) -> Optional[KnowledgeBaseProvider]:
+  # The kb provider already answers from the table; a second lookup would only repeat it
+  if not knowledge_base or isinstance(summarizer, KnowledgeBaseProvider):
+    return None
+  return KnowledgeBaseProvider()
+
+
+def _open_cache(cache_db: Optional[str], cache_ttl_hours: float, cache_max_entries: int, summarizer: SummaryProvider) -> Optional[SummaryCache]:
+  if not cache_db:
+    return None
+  return SummaryCache(
+    Path(cache_db),
+    model=summarizer.model,
+    prompt_version=summarizer.prompt_version,
+    ttl_seconds=cache_ttl_hours * 3600,
+    max_entries=cache_max_entries,
+  )
+
+
+def _open_index(semantic_index: Optional[str], reuse_threshold: float, summarizer: SummaryProvider) -> Optional[SemanticIndex]:
+  if not semantic_index:
+    return None
+  return SemanticIndex.load(Path(semantic_index), summarizer.model, summarizer.prompt_version, threshold=reuse_threshold)
+
+
+def _close_index(index: Optional[SemanticIndex], semantic_index: Optional[str]) -> None:
+  if index is None:
+    return
+  index.save(Path(semantic_index))
+  stats = index.stats()
+  typer.echo(f"Semantic index: {stats['hits']} reused | {stats['misses']} misses | {stats['entries']} entries")
+
+
+def _results_format(json_format: Optional[str], out_json: str) -> str:
+  fmt = json_format or ("jsonl" if Path(out_json).suffix == ".jsonl" else "json")
+  if fmt not in RESULTS_FORMATS:
+    raise typer.BadParameter(f"--json-format must be one of {', '.join(RESULTS_FORMATS)}")
+  return fmt
+
+
+def _write_outputs(
+  clusters: List[Cluster],
+  summaries: Dict[str, Summary],
+  out_json: str,
+  out_md: str,
+  feedback_url: str,
+  json_format: str = "json",
+  compact_json: bool = False,
+  metrics: Optional[PipelineMetrics] = None,
+) -> None:
+  Path(out_json).parent.mkdir(parents=True, exist_ok=True)
+  Path(out_md).parent.mkdir(parents=True, exist_ok=True)
+
+  with stage(metrics, "write_json") as stats:
+    write_results(clusters, summaries, Path(out_json), fmt=json_format, indent=None if compact_json else 2)
+  with stage(metrics, "render_markdown") as md_stats:
+    md = make_markdown(clusters, summaries, feedback_url)
+    write_report(md, Path(out_md))
+  if metrics is not None:
+    stats.items += len(clusters)
+    md_stats.items += len(clusters)
 
 
 @app.command()
 def run(
-  iverilog_log: str = typer.Option("data/verilog_small.log", help="Path to Icarus Verilog log"),
-  yosys_log: str = typer.Option("data/yosys_small.log", help="Path to Yosys log"),
+  iverilog_log: str = typer.Option("data/verilog_small.log", help="Icarus Verilog log: a file, a directory of *.log files or a glob such as 'regress/**/iverilog.log'"),
+  yosys_log: str = typer.Option("data/yosys_small.log", help="Yosys log: a file, a directory of *.log files or a glob"),
+  workers: int = typer.Option(1, help="Processes used to parse and fingerprint log files, or chunks of large files, in parallel"),
+  chunk_mb: int = typer.Option(DEFAULT_CHUNK_BYTES >> 20, help="With --workers > 1, split files larger than this many MiB into chunks"),
+  engine: str = typer.Option("stream", help="Clustering engine: 'stream' (line by line) or 'pandas' (vectorized batches of lines)"),
+  merge_similar: float = typer.Option(0.0, help="Fold near-duplicate clusters whose keys reach this word-shingle Jaccard similarity, e.g. 0.7 (0 disables)"),
   feedback_url: str = typer.Option("https://example.com/feedback", help="Feedback form URL to embed in the report"),
   out_json: str = typer.Option("data/processed/results.json", help="Path to write structured JSON results"),
   out_md: str = typer.Option("data/reports/report.md", help="Path to write Markdown report"),
+  json_format: Optional[str] = typer.Option(None, help="Results format: 'json' (one document) or 'jsonl' (one cluster per line); defaults from the --out-json extension"),
+  compact_json: bool = typer.Option(False, help="Write JSON results without indentation"),
+  memo_size: int = typer.Option(DEFAULT_MEMO_CAPACITY, help="Distinct raw messages remembered by the fingerprint memo (0 disables)"),
+  clusterer: str = typer.Option("fingerprint", help="How messages are grouped: 'fingerprint' (regex-normalized keys) or 'drain' (online template mining)"),
+  drain_depth: int = typer.Option(DEFAULT_DRAIN_DEPTH, help="With --clusterer drain, parse tree depth (token count plus leading tokens)"),
+  drain_similarity: float = typer.Option(DEFAULT_DRAIN_SIMILARITY, help="With --clusterer drain, share of matching tokens needed to join a template"),
+  sample_size: int = typer.Option(DEFAULT_SAMPLE_SIZE, help="Member items kept per cluster (counts are always exact)"),
+  spill_members: Optional[str] = typer.Option(None, help="JSON Lines file to list every cluster member (disabled if omitted)"),
+  export_items: Optional[str] = typer.Option(None, help="Export every parsed item to a .parquet or .arrow file with dictionary-encoded columns"),
+  export_clusters_to: Optional[str] = typer.Option(None, "--export-clusters", help="Export the cluster table and summaries to a .parquet or .arrow file"),
+  run_id: Optional[str] = typer.Option(None, help="Run identifier stored in exported rows (defaults to a UTC timestamp)"),
+  state: Optional[str] = typer.Option(None, help="Incremental mode: JSON file persisting clusters, read offsets and summaries between runs"),
+  cache_db: Optional[str] = typer.Option(None, help="SQLite file for the persistent summary cache (disabled if omitted)"),
+  cache_ttl_hours: float = typer.Option(168.0, help="Hours before a cached summary expires"),
+  cache_max_entries: int = typer.Option(DEFAULT_MAX_ENTRIES, help="Maximum cached summaries before LRU eviction"),
+  semantic_index: Optional[str] = typer.Option(None, help="Index file (.npz) of summarized cluster keys; similar new clusters reuse those summaries (disabled if omitted)"),
+  reuse_threshold: float = typer.Option(DEFAULT_REUSE_THRESHOLD, help="TF-IDF cosine similarity a cluster key needs to reuse an indexed summary"),
+  max_concurrency: int = typer.Option(DEFAULT_MAX_CONCURRENCY, help="Maximum concurrent LLM summary requests"),
+  rate_limit: float = typer.Option(0.0, help="Maximum LLM requests per second (0 disables rate limiting)"),
+  rate_burst: int = typer.Option(1, help="Requests allowed to burst above --rate-limit"),
+  provider: str = typer.Option("gemini", help="Summarization backend: 'gemini', 'http' (a local model server) or 'kb' (offline: known-message table, generic summaries otherwise)"),
+  http_url: str = typer.Option(DEFAULT_HTTP_URL, help="With --provider http, completion endpoint that takes {model, prompt} JSON"),
+  http_model: str = typer.Option(DEFAULT_HTTP_MODEL, help="With --provider http, model name sent to the endpoint"),
+  prompt_sample_tokens: int = typer.Option(DEFAULT_SAMPLE_TOKENS, help="Token budget for the representative sample messages in each cluster's LLM prompt"),
+  knowledge_base: bool = typer.Option(True, "--knowledge-base/--no-knowledge-base", help="Answer well-known Icarus/Yosys messages from the built-in table before asking the LLM"),
+  batch_tokens: int = typer.Option(0, help="Pack several clusters per LLM request up to this prompt token budget (0 sends one request per cluster)"),
+  max_llm_calls: int = typer.Option(0, help="Most LLM requests this run may make; errors are summarized first and the rest get fallback summaries (0 = no limit)"),
+  max_llm_tokens: int = typer.Option(0, help="Estimated prompt tokens this run may send to the LLM (0 = no limit)"),
+  llm_deadline: float = typer.Option(0.0, help="Seconds after which no new LLM request is started; the remaining clusters get fallback summaries (0 = no deadline)"),
+  metrics_json: Optional[str] = typer.Option(None, "--metrics", help="Write per-stage wall/CPU time, item counts and peak memory to this JSON file. The per-line read/parse/fingerprint/cluster stages have wall time only, and are only broken out when ingesting in-process (--workers 1); per-line stage timing slows ingestion slightly"),
+  profile: Optional[str] = typer.Option(None, help="Write a cProfile dump of the run to this file (inspect with `python -m pstats`)"),
 ):
   """Run the full pipeline on the provided logs and generate a report"""
-  load_dotenv()
+  dotenv.load_dotenv()
+  json_format = _results_format(json_format, out_json)
 
-  items = []
+  jobs = [("iverilog", p) for p in expand_log_paths(iverilog_log)]
+  jobs += [("yosys", p) for p in expand_log_paths(yosys_log)]
+  if engine not in ENGINES:
+    raise typer.BadParameter(f"--engine must be one of {', '.join(ENGINES)}")
+  if engine == "pandas":
+    if not PANDAS_AVAILABLE:
+      raise typer.BadParameter("--engine pandas needs pandas and numpy installed")
+    if spill_members or export_items:
+      raise typer.BadParameter("--spill-members and --export-items need --engine stream")
+  if clusterer not in CLUSTERERS:
+    raise typer.BadParameter(f"--clusterer must be one of {', '.join(CLUSTERERS)}")
+  if clusterer == "drain" and (workers > 1 or engine != "stream" or state):
+    # Templates are learned in arrival order and not persisted, so they cannot be merged across workers or runs
+    raise typer.BadParameter("--clusterer drain needs --workers 1 and --engine stream, and cannot be combined with --state")
+  if spill_members and workers > 1:
+    raise typer.BadParameter("--spill-members is only supported with --workers 1")
+  if spill_members and state:
+    raise typer.BadParameter("--spill-members cannot be combined with --state")
+  if export_items and workers > 1:
+    raise typer.BadParameter("--export-items is only supported with --workers 1")
+  for export_path in (export_items, export_clusters_to):
+    if export_path:
+      if not PYARROW_AVAILABLE:
+        raise typer.BadParameter("Parquet/Arrow export needs pyarrow; install it with `pip install pyarrow`")
+      try:
+        columnar_format(export_path)
+      except ValueError as e:
+        raise typer.BadParameter(str(e))
+  run_id = run_id or default_run_id()
+  summarizer = _make_provider(provider, http_url, http_model, prompt_sample_tokens)
+  knowledge = _knowledge(knowledge_base, summarizer)
 
-  iv_lines = _read_lines_if_exists(iverilog_log, "iverilog")
-  if iv_lines:
-    items += parse_lines("iverilog", iv_lines)
+  profiler = cProfile.Profile() if profile else None
+  if profiler is not None:
+    profiler.enable()
+  metrics = PipelineMetrics() if metrics_json else None
 
-  ys_lines = _read_lines_if_exists(yosys_log, "yosys")
-  if ys_lines:
-    items += parse_lines("yosys", ys_lines)
+  memo = make_clusterer(clusterer, memo_size, drain_depth, drain_similarity)
+  analysis = None
+  cursors = {}
+  if state:
+    analysis = AnalysisState.load(Path(state), memo=memo, sample_size=sample_size)
+    planned = analysis.plan(jobs)
+    if planned is None:
+      typer.echo("A tracked log was rotated, truncated or removed; rebuilding analysis state from scratch")
+      analysis = AnalysisState(AnalysisState.fresh(memo, sample_size).table, summaries=analysis.summaries)
+      planned = analysis.plan(jobs)
+    ranges, cursors = planned
+    table = analysis.table
+  else:
+    ranges = [(tool, path, 0, None) for tool, path in jobs]
+    table = ClusterTable(memo=memo, sample_size=sample_size, spill_path=Path(spill_members) if spill_members else None)
 
-  clusters = cluster_logs(items)
+  item_exporter = ItemExporter(Path(export_items), run_id, memo=table.memo) if export_items else None
+  table.item_sink = item_exporter
 
-  summaries = summarize_clusters(clusters)
+  # Lines are read lazily and compact records flow straight into clustering, never held as a full list
+  items_before = table.items_seen
+  with stage(metrics, "ingest") as ingest_stats:
+    ingest_ranges(
+      ranges,
+      workers=workers,
+      sample_size=table.sample_size,
+      memo_capacity=memo_size,
+      table=table,
+      chunk_bytes=max(1, chunk_mb) << 20,
+      engine=engine,
+      metrics=metrics,
+    )
+    clusters = table.clusters()
+    table.close()
+    table.item_sink = None
+    if item_exporter is not None:
+      item_exporter.close()
+  if metrics is not None:
+    ingest_stats.items += table.items_seen - items_before
+  if merge_similar > 0:
+    before = len(clusters)
+    with stage(metrics, "merge_similar"):
+      clusters = merge_similar_clusters(clusters, merge_similar)
+    typer.echo(f"Merged near-duplicate clusters: {before} -> {len(clusters)}")
 
-  Path(out_json).parent.mkdir(parents=True, exist_ok=True)
-  Path(out_md).parent.mkdir(parents=True, exist_ok=True)
+  cache = _open_cache(cache_db, cache_ttl_hours, cache_max_entries, summarizer)
+  index = _open_index(semantic_index, reuse_threshold, summarizer)
+  rate_limiter = TokenBucket(rate_limit, capacity=rate_burst) if rate_limit > 0 else None
 
-  Path(out_json).write_text(
-    json.dumps(
-      {
-        "clusters": [c.model_dump() for c in clusters],
-        "summaries": {k: v.model_dump() for k, v in summaries.items()},
-      },
-      indent=2,
-    ),
-    encoding="utf-8",
-  )
+  # In incremental mode, clusters that have not materially changed keep the summary from an earlier run
+  reused: Dict[str, Summary] = {}
+  if analysis is not None:
+    for c in clusters:
+      s = analysis.reusable_summary(c)
+      if s is not None:
+        reused[c.id] = s
+  to_summarize = [c for c in clusters if c.id not in reused]
+  fallbacks: Set[str] = set()
+
+  with stage(metrics, "summarize") as summarize_stats:
+    fresh = summarize_clusters(
+      to_summarize,
+      cache=cache,
+      max_concurrency=max_concurrency,
+      rate_limiter=rate_limiter,
+      batch_token_budget=batch_tokens,
+      index=index,
+      metrics=metrics,
+      provider=summarizer,
+      knowledge=knowledge,
+      max_calls=max_llm_calls,
+      max_tokens=max_llm_tokens,
+      deadline_seconds=llm_deadline,
+      fallbacks=fallbacks,
+    )
+  if metrics is not None:
+    summarize_stats.items += len(to_summarize)
+  summaries = {c.id: reused.get(c.id) or fresh[c.id] for c in clusters if c.id in reused or c.id in fresh}
+
+  if analysis is not None:
+    # Budget fallbacks are not kept, so the next run with budget to spare asks the LLM for them
+    analysis.record_summaries([c for c in to_summarize if c.id not in fallbacks], fresh)
+    analysis.cursors.update(cursors)
+    analysis.save(Path(state))
+
+  _write_outputs(clusters, summaries, out_json, out_md, feedback_url, json_format, compact_json, metrics)
+  if export_clusters_to:
+    with stage(metrics, "export_clusters"):
+      export_clusters(clusters, summaries, Path(export_clusters_to), run_id)
 
-  md = make_markdown(clusters, summaries, feedback_url)
-  write_report(md, Path(out_md))
+  typer.echo(f"Parsed items: {sum(c.count for c in clusters)} | Clusters: {len(clusters)} | Summaries: {len(summaries)}")
+  if item_exporter is not None:
+    typer.echo(f"Exported {item_exporter.rows} items: {export_items}")
+  if export_clusters_to:
+    typer.echo(f"Exported {len(clusters)} clusters: {export_clusters_to}")
+  if analysis is not None:
+    typer.echo(f"Incremental: {table.items_seen - items_before} new items | {len(reused)} summaries reused | state: {state}")
+  typer.echo(f"Wrote JSON: {out_json}")
+  typer.echo(f"Wrote Markdown: {out_md}")
+  if clusterer == "drain":
+    typer.echo(f"Drain templates: {len(memo)} live | {memo.hits} matched | {memo.misses} created")
+  else:
+    typer.echo(f"Fingerprint memo: {memo.hits} hits | {memo.misses} misses | {memo.hit_rate:.1%} hit rate")
+  if knowledge is not None:
+    stats = knowledge.knowledge.stats()
+    typer.echo(f"Knowledge base: {stats['hits']} answered | {stats['misses']} left to {summarizer.name}")
+    if metrics is not None:
+      metrics.counters["knowledge_base"] = stats
+  if cache is not None:
+    stats = cache.stats()
+    typer.echo(f"Summary cache: {stats['hits']} hits | {stats['misses']} misses | {stats['entries']} entries")
+    cache.close()
+    if metrics is not None:
+      metrics.counters["summary_cache"] = stats
+  _close_index(index, semantic_index)
+
+  if profiler is not None:
+    profiler.disable()
+    Path(profile).parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(profile)
+    typer.echo(f"Wrote profile: {profile}")
+  if metrics is not None:
+    metrics.counters.update({
+      "items": table.items_seen - items_before,
+      "clusters": len(clusters),
+      "summaries": len(summaries),
+      "memo": memo.stats(),
+      "workers": workers,
+      "engine": engine,
+    })
+    metrics.write(Path(metrics_json))
+    typer.echo(f"Stage timings: {metrics.describe()}")
+    typer.echo(f"Wrote metrics: {metrics_json}")
+
+
+def _follow_paths(pattern: Optional[str]) -> List[str]:
+  # Like tail -F, a plain file path is followed even before the tool has created it
+  paths = expand_log_paths(pattern)
+  if not paths and pattern and not GLOB_CHARS & set(pattern) and not Path(pattern).is_dir():
+    paths = [pattern]
+  return paths
+
+
+@app.command()
+def follow(
+  iverilog_log: Optional[str] = typer.Option(None, help="Growing Icarus Verilog log to follow: a file, a directory of *.log files or a glob"),
+  yosys_log: Optional[str] = typer.Option(None, help="Growing Yosys log to follow: a file, a directory of *.log files or a glob"),
+  from_start: bool = typer.Option(True, "--from-start/--from-end", help="Read existing log contents first, or only lines written from now on"),
+  poll_interval: float = typer.Option(DEFAULT_POLL_INTERVAL, help="Seconds to wait between checks for new lines when the logs are idle"),
+  debounce: float = typer.Option(DEFAULT_DEBOUNCE_SECONDS, help="Minimum seconds between rewrites of the JSON/Markdown outputs"),
+  feedback_url: str = typer.Option("https://example.com/feedback", help="Feedback form URL to embed in the report"),
+  out_json: str = typer.Option("data/processed/results.json", help="Path to write structured JSON results"),
+  out_md: str = typer.Option("data/reports/report.md", help="Path to write Markdown report"),
+  json_format: Optional[str] = typer.Option(None, help="Results format: 'json' (one document) or 'jsonl' (one cluster per line); defaults from the --out-json extension"),
+  compact_json: bool = typer.Option(False, help="Write JSON results without indentation"),
+  memo_size: int = typer.Option(DEFAULT_MEMO_CAPACITY, help="Distinct raw messages remembered by the fingerprint memo (0 disables)"),
+  clusterer: str = typer.Option("fingerprint", help="How messages are grouped: 'fingerprint' (regex-normalized keys) or 'drain' (online template mining)"),
+  drain_depth: int = typer.Option(DEFAULT_DRAIN_DEPTH, help="With --clusterer drain, parse tree depth (token count plus leading tokens)"),
+  drain_similarity: float = typer.Option(DEFAULT_DRAIN_SIMILARITY, help="With --clusterer drain, share of matching tokens needed to join a template"),
+  sample_size: int = typer.Option(DEFAULT_SAMPLE_SIZE, help="Member items kept per cluster (counts are always exact)"),
+  cache_db: Optional[str] = typer.Option(None, help="SQLite file for the persistent summary cache (disabled if omitted)"),
+  cache_ttl_hours: float = typer.Option(168.0, help="Hours before a cached summary expires"),
+  cache_max_entries: int = typer.Option(DEFAULT_MAX_ENTRIES, help="Maximum cached summaries before LRU eviction"),
+  semantic_index: Optional[str] = typer.Option(None, help="Index file (.npz) of summarized cluster keys; similar new clusters reuse those summaries (disabled if omitted)"),
+  reuse_threshold: float = typer.Option(DEFAULT_REUSE_THRESHOLD, help="TF-IDF cosine similarity a cluster key needs to reuse an indexed summary"),
+  max_concurrency: int = typer.Option(DEFAULT_MAX_CONCURRENCY, help="Maximum concurrent LLM summary requests"),
+  rate_limit: float = typer.Option(0.0, help="Maximum LLM requests per second (0 disables rate limiting)"),
+  rate_burst: int = typer.Option(1, help="Requests allowed to burst above --rate-limit"),
+  provider: str = typer.Option("gemini", help="Summarization backend: 'gemini', 'http' (a local model server) or 'kb' (offline: known-message table, generic summaries otherwise)"),
+  http_url: str = typer.Option(DEFAULT_HTTP_URL, help="With --provider http, completion endpoint that takes {model, prompt} JSON"),
+  http_model: str = typer.Option(DEFAULT_HTTP_MODEL, help="With --provider http, model name sent to the endpoint"),
+  prompt_sample_tokens: int = typer.Option(DEFAULT_SAMPLE_TOKENS, help="Token budget for the representative sample messages in each cluster's LLM prompt"),
+  knowledge_base: bool = typer.Option(True, "--knowledge-base/--no-knowledge-base", help="Answer well-known Icarus/Yosys messages from the built-in table before asking the LLM"),
+):
+  """Follow growing logs like tail -F, keeping the clusters, summaries and report up to date until interrupted"""
+  dotenv.load_dotenv()
+  json_format = _results_format(json_format, out_json)
+
+  jobs = [("iverilog", p) for p in _follow_paths(iverilog_log)]
+  jobs += [("yosys", p) for p in _follow_paths(yosys_log)]
+  if not jobs:
+    raise typer.BadParameter("Nothing to follow: pass --iverilog-log and/or --yosys-log")
+  if clusterer not in CLUSTERERS:
+    raise typer.BadParameter(f"--clusterer must be one of {', '.join(CLUSTERERS)}")
+  summarizer = _make_provider(provider, http_url, http_model, prompt_sample_tokens)
+
+  memo = make_clusterer(clusterer, memo_size, drain_depth, drain_similarity)
+  table = ClusterTable(memo=memo, sample_size=sample_size)
+  cache = _open_cache(cache_db, cache_ttl_hours, cache_max_entries, summarizer)
+  index = _open_index(semantic_index, reuse_threshold, summarizer)
+  rate_limiter = TokenBucket(rate_limit, capacity=rate_burst) if rate_limit > 0 else None
+
+  def write(clusters: List[Cluster], summaries: Dict[str, Summary]) -> None:
+    _write_outputs(clusters, summaries, out_json, out_md, feedback_url, json_format, compact_json)
+    typer.echo(f"Parsed items: {table.items_seen} | Clusters: {len(clusters)} | Summaries: {len(summaries)}")
+
+  typer.echo(f"Following {len(jobs)} log(s); press Ctrl+C to stop")
+  follower = LogFollower(
+    jobs,
+    table,
+    write,
+    debounce_seconds=debounce,
+    from_start=from_start,
+    max_concurrency=max_concurrency,
+    cache=cache,
+    rate_limiter=rate_limiter,
+    index=index,
+    provider=summarizer,
+    knowledge=_knowledge(knowledge_base, summarizer),
+  )
+  follower.run(poll_interval=poll_interval)
 
-  typer.echo(f"Parsed items: {len(items)} | Clusters: {len(clusters)} | Summaries: {len(summaries)}")
   typer.echo(f"Wrote JSON: {out_json}")
   typer.echo(f"Wrote Markdown: {out_md}")
+  if cache is not None:
+    cache.close()
+  _close_index(index, semantic_index)
+
+
+
+@app.command()
+def serve(
+  host: str = typer.Option("127.0.0.1", help="Interface to listen on"),
+  port: int = typer.Option(DEFAULT_PORT, help="TCP port to listen on"),
+  socket_path: Optional[str] = typer.Option(None, "--socket", help="Listen on this Unix socket instead of TCP"),
+  log_root: Optional[List[str]] = typer.Option(None, help="Directory jobs may read logs from by path (repeatable); without one, jobs must send logs as text"),
+  workers: int = typer.Option(DEFAULT_JOB_WORKERS, help="Analysis jobs run concurrently"),
+  queue_size: int = typer.Option(DEFAULT_QUEUE_SIZE, help="Jobs that may wait for a worker before submissions are rejected"),
+  max_jobs: int = typer.Option(DEFAULT_MAX_JOBS, help="Finished jobs kept for status queries"),
+  memo_size: int = typer.Option(DEFAULT_MEMO_CAPACITY, help="Distinct raw messages remembered by each worker's fingerprint memo"),
+  sample_size: int = typer.Option(DEFAULT_SAMPLE_SIZE, help="Member items kept per cluster (counts are always exact)"),
+  cache_db: str = typer.Option(":memory:", help="SQLite file for the summary cache; the default keeps it in memory for the server's lifetime"),
+  cache_ttl_hours: float = typer.Option(168.0, help="Hours before a cached summary expires"),
+  cache_max_entries: int = typer.Option(DEFAULT_MAX_ENTRIES, help="Maximum cached summaries before LRU eviction"),
+  semantic_index: Optional[str] = typer.Option(None, help="Index file (.npz) of summarized cluster keys; similar new clusters reuse those summaries (disabled if omitted)"),
+  reuse_threshold: float = typer.Option(DEFAULT_REUSE_THRESHOLD, help="TF-IDF cosine similarity a cluster key needs to reuse an indexed summary"),
+  max_concurrency: int = typer.Option(DEFAULT_MAX_CONCURRENCY, help="Maximum concurrent LLM summary requests per job"),
+  rate_limit: float = typer.Option(0.0, help="Maximum LLM requests per second across all jobs (0 disables rate limiting)"),
+  rate_burst: int = typer.Option(1, help="Requests allowed to burst above --rate-limit"),
+  provider: str = typer.Option("gemini", help="Summarization backend: 'gemini', 'http' (a local model server) or 'kb' (offline: known-message table, generic summaries otherwise)"),
+  http_url: str = typer.Option(DEFAULT_HTTP_URL, help="With --provider http, completion endpoint that takes {model, prompt} JSON"),
+  http_model: str = typer.Option(DEFAULT_HTTP_MODEL, help="With --provider http, model name sent to the endpoint"),
+  prompt_sample_tokens: int = typer.Option(DEFAULT_SAMPLE_TOKENS, help="Token budget for the representative sample messages in each cluster's LLM prompt"),
+  knowledge_base: bool = typer.Option(True, "--knowledge-base/--no-knowledge-base", help="Answer well-known Icarus/Yosys messages from the built-in table before asking the LLM"),
+  batch_tokens: int = typer.Option(0, help="Pack several clusters per LLM request up to this prompt token budget (0 sends one request per cluster)"),
+  max_llm_calls: int = typer.Option(0, help="Most LLM requests each job may make; errors are summarized first and the rest get fallback summaries (0 = no limit)"),
+  max_llm_tokens: int = typer.Option(0, help="Estimated prompt tokens each job may send to the LLM (0 = no limit)"),
+  llm_deadline: float = typer.Option(0.0, help="Seconds after which no new LLM request is started; the remaining clusters get fallback summaries (0 = no deadline)"),
+):
+  """Serve analyses over a local HTTP API, keeping parsers, memos, caches and the LLM client warm between jobs"""
+  dotenv.load_dotenv()
+  summarizer = _make_provider(provider, http_url, http_model, prompt_sample_tokens)
+  service = AnalysisService(
+    workers=workers,
+    queue_size=queue_size,
+    max_jobs=max_jobs,
+    sample_size=sample_size,
+    memo_capacity=memo_size,
+    cache=_open_cache(cache_db, cache_ttl_hours, cache_max_entries, summarizer),
+    index=_open_index(semantic_index, reuse_threshold, summarizer),
+    log_roots=log_root or (),
+    max_concurrency=max_concurrency,
+    rate_limiter=TokenBucket(rate_limit, capacity=rate_burst) if rate_limit > 0 else None,
+    batch_token_budget=batch_tokens,
+    provider=summarizer,
+    knowledge=_knowledge(knowledge_base, summarizer),
+    max_calls=max_llm_calls,
+    max_tokens=max_llm_tokens,
+    deadline_seconds=llm_deadline,
+  )
+  try:
+    server = make_server(service, host, port, socket_path)
+  except FileExistsError as e:
+    raise typer.BadParameter(str(e))
+  service.start()
+  where = f"unix:{socket_path}" if socket_path else f"http://{host}:{server.server_address[1]}"
+  typer.echo(f"Serving on {where} ({service.workers} workers, queue of {queue_size}); press Ctrl+C to stop")
+  try:
+    server.serve_forever()
+  except KeyboardInterrupt:
+    pass
+  finally:
+    server.server_close()
+    if socket_path and Path(socket_path).exists():
+      Path(socket_path).unlink()
+    service.stop()
+    if service.cache is not None:
+      service.cache.close()
+    _close_index(service.index, semantic_index)
 
 
 if __name__ == "__main__":
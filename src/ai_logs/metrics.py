@@ -0,0 +1,193 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, Optional, TypeVar
+
+try:
+  import resource
+  RESOURCE_AVAILABLE = True
+except ImportError:
+  # Not available on Windows; memory and child CPU figures are then omitted
+  RESOURCE_AVAILABLE = False
+
+METRICS_VERSION = 1
+
+T = TypeVar("T")
+
+def peak_rss_mb() -> Optional[float]:
+  """High-water mark of this process's resident memory, in MiB."""
+  if not RESOURCE_AVAILABLE:
+    return None
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  # Linux reports KiB, macOS bytes
+  return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+def cpu_seconds() -> float:
+  """CPU time of this process plus reaped worker processes, so --workers runs are not under-counted."""
+  total = time.process_time()
+  if RESOURCE_AVAILABLE:
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    total += children.ru_utime + children.ru_stime
+  return total
+
+class StageStats:
+  __slots__ = ("wall_seconds", "cpu_seconds", "items", "calls", "max_seconds", "peak_rss_mb")
+
+  def __init__(self):
+    self.wall_seconds = 0.0
+    self.cpu_seconds: Optional[float] = None
+    self.items = 0
+    self.calls = 0
+    self.max_seconds = 0.0
+    self.peak_rss_mb: Optional[float] = None
+
+  def to_dict(self) -> Dict[str, Any]:
+    data: Dict[str, Any] = {"wall_seconds": round(self.wall_seconds, 6), "items": self.items, "calls": self.calls}
+    if self.cpu_seconds is not None:
+      data["cpu_seconds"] = round(self.cpu_seconds, 6)
+    if self.max_seconds:
+      data["max_seconds"] = round(self.max_seconds, 6)
+    if self.peak_rss_mb is not None:
+      data["peak_rss_mb"] = round(self.peak_rss_mb, 1)
+    if self.items and self.wall_seconds:
+      data["items_per_second"] = round(self.items / self.wall_seconds, 1)
+    return data
+
+class PipelineMetrics:
+  """
+    Wall time, CPU time, item counts and peak memory per pipeline stage, written as one JSON file per run.
+    Sequential stages are measured with stage(). The streaming stages (read, parse, fingerprint, cluster)
+    interleave line by line, so instead each slice of wall time is charged to whichever of them is running,
+    which makes their times exclusive and lets them add up to the ingest time. Reading the CPU clock costs
+    several times more than perf_counter at that rate, so those stages report wall time and items only;
+    their CPU time and peak memory are covered by the enclosing ingest stage.
+  """
+
+  def __init__(self, clock: Callable[[], float] = time.perf_counter):
+    self._clock = clock
+    self._lock = threading.Lock()
+    self.stages: Dict[str, StageStats] = {}
+    self.counters: Dict[str, Any] = {}
+    self._current: Optional[StageStats] = None
+    self._mark = 0.0
+    self._started = clock()
+    self._started_cpu = cpu_seconds()
+
+  def _stats(self, name: str) -> StageStats:
+    stats = self.stages.get(name)
+    if stats is None:
+      with self._lock:
+        stats = self.stages.setdefault(name, StageStats())
+    return stats
+
+  @contextmanager
+  def stage(self, name: str) -> Iterator[StageStats]:
+    """Time a block of the pipeline; add its item count to the yielded stats."""
+    stats = self._stats(name)
+    wall, cpu = self._clock(), cpu_seconds()
+    try:
+      yield stats
+    finally:
+      elapsed = self._clock() - wall
+      stats.wall_seconds += elapsed
+      stats.cpu_seconds = (stats.cpu_seconds or 0.0) + cpu_seconds() - cpu
+      stats.calls += 1
+      stats.max_seconds = max(stats.max_seconds, elapsed)
+      stats.peak_rss_mb = peak_rss_mb()
+
+  def record(self, name: str, seconds: float, items: int = 1) -> None:
+    """Add one externally timed call, e.g. a single LLM request; safe to call from worker threads."""
+    stats = self._stats(name)
+    with self._lock:
+      stats.wall_seconds += seconds
+      stats.items += items
+      stats.calls += 1
+      stats.max_seconds = max(stats.max_seconds, seconds)
+
+  def _switch(self, stats: Optional[StageStats]) -> Optional[StageStats]:
+    # Called several times per log line, so it works on the stats objects rather than stage names
+    now = self._clock()
+    if self._current is not None:
+      self._current.wall_seconds += now - self._mark
+    previous, self._current, self._mark = self._current, stats, now
+    return previous
+
+  @contextmanager
+  def attribute(self, name: str) -> Iterator[StageStats]:
+    """Charge time spent in this block, minus nested timed_iter/timed_call time, to `name`."""
+    stats = self._stats(name)
+    previous = self._switch(stats)
+    try:
+      yield stats
+    finally:
+      self._switch(previous)
+
+  def timed_iter(self, iterable: Iterable[T], name: str) -> Iterator[T]:
+    """Yield from `iterable`, charging the time spent producing each item to `name`."""
+    return self._timed_iter(iter(iterable), self._stats(name))
+
+  def _timed_iter(self, it: Iterator[T], stats: StageStats) -> Iterator[T]:
+    switch = self._switch
+    while True:
+      previous = switch(stats)
+      try:
+        item = next(it)
+      except StopIteration:
+        return
+      finally:
+        switch(previous)
+      stats.items += 1
+      yield item
+
+  def timed_call(self, fn: Callable[..., T], name: str) -> Callable[..., T]:
+    stats = self._stats(name)
+
+    def call(*args: Any, **kwargs: Any) -> T:
+      previous = self._switch(stats)
+      try:
+        return fn(*args, **kwargs)
+      finally:
+        self._switch(previous)
+        stats.items += 1
+    return call
+
+  def queued_task(self, fn: Callable[..., T], wait_stage: str, run_stage: str) -> Callable[..., T]:
+    """Wrap a task about to be submitted to a pool: time from now until it starts counts as queue wait."""
+    submitted = self._clock()
+
+    def task(*args: Any, **kwargs: Any) -> T:
+      started = self._clock()
+      self.record(wait_stage, started - submitted)
+      try:
+        return fn(*args, **kwargs)
+      finally:
+        self.record(run_stage, self._clock() - started)
+    return task
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {
+      "version": METRICS_VERSION,
+      "wall_seconds": round(self._clock() - self._started, 6),
+      "cpu_seconds": round(cpu_seconds() - self._started_cpu, 6),
+      "peak_rss_mb": peak_rss_mb(),
+      "stages": {name: stats.to_dict() for name, stats in self.stages.items()},
+      "counters": self.counters,
+    }
+
+  def write(self, path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+  def describe(self) -> str:
+    return " | ".join(f"{name} {stats.wall_seconds:.3f}s" for name, stats in self.stages.items())
+
+def stage(metrics: Optional[PipelineMetrics], name: str) -> ContextManager[Optional[StageStats]]:
+  """metrics.stage(name), or a no-op when metrics are not being collected."""
+  return metrics.stage(name) if metrics is not None else nullcontext()
@@ -1,52 +1,544 @@
 import hashlib
-from collections import defaultdict
+import heapq
+import json
+from collections import OrderedDict
 import re
-from typing import List
-from .schema import LogItem, Cluster
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, IO, Iterable, List, Optional, Set, Tuple, Union
+from .parse import materialize
+from .schema import LogItem, LogRecord, Cluster
 
 NUM_PATTERN = re.compile(r'\b\d+\b')
 IDENTIFIER_PATTERN = re.compile(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b')
 QUOTED_STRING_PATTERN = re.compile(r"(\"[^\"]*\"|'[^']*')")
+# A word whose word characters form one contiguous run, e.g. `clk` or `(clk);` but not `top.clk`
+SINGLE_RUN_WORD_PATTERN = re.compile(r'([^\w]*)(\w+)([^\w]*)')
 
-def fingerprint(msg: str) -> str:
-    template = NUM_PATTERN.sub('<NUM>', msg)
-    template = QUOTED_STRING_PATTERN.sub("'<SIG>'", template)
-    keywords = {'signal', 'port', 'module', 'net', 'driver', 'assignment', 'reference', 'instance', 'variable'}
-    words = template.split()
-    normalized_words = []
-    
-    for word in words:
-        clean_word = re.sub(r'[^\w]', '', word)
-        if clean_word and clean_word not in keywords and IDENTIFIER_PATTERN.match(clean_word):
-            normalized_word = re.sub(r'\b' + re.escape(clean_word) + r'\b', '<ID>', word)
-            normalized_words.append(normalized_word)
-        else:
-            normalized_words.append(word)
-    
-    template = ' '.join(normalized_words)
-    
+KEYWORDS = frozenset({'signal', 'port', 'module', 'net', 'driver', 'assignment', 'reference', 'instance', 'variable'})
+
+# EDA messages reuse a small vocabulary, so each distinct word is normalized once and then looked up
+WORD_CACHE_LIMIT = 1 << 16
+_word_cache: Dict[str, str] = {}
+
+def _normalize_word(word: str) -> str:
+    m = SINGLE_RUN_WORD_PATTERN.fullmatch(word)
+    if m is None:
+        return word
+    core = m.group(2)
+    # Same test as IDENTIFIER_PATTERN.match on the word's characters: a pure ASCII identifier
+    if core in KEYWORDS or not (core.isascii() and core.isidentifier()):
+        return word
+    return m.group(1) + '<ID>' + m.group(3)
+
+def _normalize_word_miss(word: str) -> str:
+    normalized = _normalize_word(word)
+    if len(_word_cache) >= WORD_CACHE_LIMIT:
+        _word_cache.clear()
+    _word_cache[word] = normalized
+    return normalized
+
+def message_key(msg: str) -> str:
+    # Quotes before numbers gives the same text as numbers before quotes (neither pattern can create or split
+    # the other), and lets both substitutions run as plain C-level replacements
+    return NUM_PATTERN.sub('<NUM>', QUOTED_STRING_PATTERN.sub("'<SIG>'", msg))
+
+def message_template(key: str) -> str:
+    get = _word_cache.get
+    return ' '.join([get(word) or _normalize_word_miss(word) for word in key.split()])
+
+def template_hash(template: str) -> str:
     return hashlib.md5(template.encode()).hexdigest()
 
+def fingerprint(msg: str, hashed: bool = True) -> str:
+    # The normalized template itself is a perfectly good dict key; MD5 is only needed for a stable, compact id
+    template = message_template(message_key(msg))
+    return template_hash(template) if hashed else template
+
+
+DEFAULT_MEMO_CAPACITY = 100_000
+
+class FingerprintMemo:
+    """Bounded LRU of raw message -> (cluster key, template), so exact duplicate lines skip normalization."""
+
+    # A cluster's template, and so its fingerprint, is final as soon as its first item is seen
+    stable_templates = True
+
+    def __init__(self, capacity: int = DEFAULT_MEMO_CAPACITY):
+        self.capacity = capacity
+        self._entries: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, msg: str) -> Tuple[str, str]:
+        entry = self._entries.get(msg)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(msg)
+            return entry
+
+        self.misses += 1
+        key = message_key(msg)
+        entry = (key, message_template(key))
+        if self.capacity > 0:
+            self._entries[msg] = entry
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        # Drops the entries but keeps the counters, e.g. before shipping a partial table between processes
+        self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "capacity": self.capacity,
+            "hit_rate": self.hit_rate,
+        }
+
+    def describe(self, key: str, group: str) -> Tuple[str, str]:
+        # Fingerprint groups are the templates themselves and never change once assigned
+        return key, group
+
+
+# Drain (He et al., ICWS 2017): messages are routed by token count and their first tokens down a fixed-depth
+# tree to a small leaf of templates; the most similar template absorbs the message and its differing positions
+# become wildcards, so variable positions are learned online instead of coming from fixed regexes
+DRAIN_WILDCARD = '<*>'
+DEFAULT_DRAIN_DEPTH = 4
+DEFAULT_DRAIN_SIMILARITY = 0.4
+DEFAULT_DRAIN_MAX_CHILDREN = 100
+DEFAULT_DRAIN_MAX_TEMPLATES = 50_000
+
+
+class _DrainTemplate:
+    __slots__ = ("id", "tokens", "size", "route")
+
+    def __init__(self, template_id: int, tokens: List[str], route: List[Tuple[dict, object]]):
+        self.id = template_id
+        self.tokens = tokens
+        self.size = 1
+        # (node, key) pairs from the root down to the leaf list holding this template, for pruning on eviction
+        self.route = route
+
+
+class DrainMiner:
+    """
+    Drain-style online template miner with the FingerprintMemo interface, so ClusterTable can use either.
+    Each lookup is O(depth) to reach a leaf plus a scan of that leaf's templates. Live templates are capped
+    with LRU eviction, tree nodes left empty by an eviction are pruned, and the text kept for evicted
+    templates is capped at the same size, so memory stays bounded on endless streams.
+    """
+
+    # Templates keep generalizing as items arrive, so a fingerprint is only known once the stream ends
+    stable_templates = False
+
+    def __init__(
+        self,
+        depth: int = DEFAULT_DRAIN_DEPTH,
+        similarity: float = DEFAULT_DRAIN_SIMILARITY,
+        max_children: int = DEFAULT_DRAIN_MAX_CHILDREN,
+        max_templates: int = DEFAULT_DRAIN_MAX_TEMPLATES,
+    ):
+        self.depth = max(3, depth)
+        self.similarity = similarity
+        self.max_children = max_children
+        self.max_templates = max_templates
+        self._root: Dict[int, dict] = {}
+        self._templates: "OrderedDict[int, _DrainTemplate]" = OrderedDict()
+        # Final text of the most recently evicted templates, whose clusters may still be reported
+        self._retired: "OrderedDict[int, str]" = OrderedDict()
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _has_digits(token: str) -> bool:
+        return any(ch.isdigit() for ch in token)
+
+    def _leaf(self, tokens: List[str]) -> Tuple[List[_DrainTemplate], List[Tuple[dict, object]]]:
+        route: List[Tuple[dict, object]] = [(self._root, len(tokens))]
+        node = self._root.setdefault(len(tokens), {})
+        for token in tokens[:self.depth - 2]:
+            children = node
+            if token not in children and (self._has_digits(token) or len(children) >= self.max_children - 1):
+                # Tokens with digits are likely variables, and a full node sends new tokens to its wildcard child
+                token = DRAIN_WILDCARD
+            route.append((children, token))
+            node = children.setdefault(token, {})
+        route.append((node, None))
+        return node.setdefault(None, []), route
+
+    def _match(self, leaf: List[_DrainTemplate], tokens: List[str]) -> Optional[_DrainTemplate]:
+        best, best_score = None, (-1.0, -1)
+        for template in leaf:
+            same = wildcards = 0
+            for t, token in zip(template.tokens, tokens):
+                if t == DRAIN_WILDCARD:
+                    wildcards += 1
+                elif t == token:
+                    same += 1
+            score = (same / len(tokens) if tokens else 1.0, wildcards)
+            if score > best_score:
+                best, best_score = template, score
+        if best is not None and best_score[0] >= self.similarity:
+            return best
+        return None
+
+    def lookup(self, msg: str) -> Tuple[str, str]:
+        """(message key, template group) for a message; the group is stable while the template generalizes."""
+        key = message_key(msg)
+        tokens = key.split()
+        leaf, route = self._leaf(tokens)
+        template = self._match(leaf, tokens)
+        if template is None:
+            self.misses += 1
+            template = _DrainTemplate(self._next_id, tokens, route)
+            self._next_id += 1
+            leaf.append(template)
+            self._templates[template.id] = template
+            if len(self._templates) > self.max_templates:
+                self._evict()
+        else:
+            self.hits += 1
+            template.size += 1
+            template.tokens = [t if t == token else DRAIN_WILDCARD for t, token in zip(template.tokens, tokens)]
+            self._templates.move_to_end(template.id)
+        return key, f"drain:{template.id}"
+
+    def _evict(self) -> None:
+        _, old = self._templates.popitem(last=False)
+        node, key = old.route[-1]
+        node[key].remove(old)
+        # Drop the leaf and any ancestors it leaves empty, deepest first
+        for node, key in reversed(old.route):
+            if node[key]:
+                break
+            del node[key]
+        self._retired[old.id] = ' '.join(old.tokens)
+        if len(self._retired) > self.max_templates:
+            self._retired.popitem(last=False)
+
+    def describe(self, key: str, group: str) -> Tuple[str, str]:
+        # Report the template as learned so far: its text is both the cluster key and the fingerprint input.
+        # A template evicted too long ago to be remembered falls back to its cluster's first message key
+        template_id = int(group.split(':', 1)[1])
+        template = self._templates.get(template_id)
+        text = ' '.join(template.tokens) if template is not None else self._retired.get(template_id, key)
+        return text, text
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._templates),
+            "capacity": self.max_templates,
+            "hit_rate": self.hit_rate,
+        }
+
+
+CLUSTERERS = ("fingerprint", "drain")
+
+def make_clusterer(
+    name: str = "fingerprint",
+    memo_capacity: int = DEFAULT_MEMO_CAPACITY,
+    drain_depth: int = DEFAULT_DRAIN_DEPTH,
+    drain_similarity: float = DEFAULT_DRAIN_SIMILARITY,
+) -> Union[FingerprintMemo, DrainMiner]:
+    """The message -> (key, group) backend a ClusterTable groups by."""
+    if name == "fingerprint":
+        return FingerprintMemo(memo_capacity)
+    if name == "drain":
+        return DrainMiner(depth=drain_depth, similarity=drain_similarity)
+    raise ValueError(f"unknown clusterer {name!r}; expected one of {', '.join(CLUSTERERS)}")
+
+
+DEFAULT_SAMPLE_SIZE = 20
+
+_MASK64 = (1 << 64) - 1
+_source_salts: Dict[Optional[str], int] = {None: 0}
+
+def _sample_priority(item: Union[LogItem, LogRecord], position: int) -> int:
+    # Bottom-k sampling on a hash of the item's identity (source file + offset) instead of a random draw:
+    # the sample is reproducible, and partial samples merge into exactly the sample a single pass would keep
+    source = getattr(item, "source", None)
+    offset = getattr(item, "offset", position)
+    salt = _source_salts.get(source)
+    if salt is None:
+        salt = _source_salts[source] = zlib.crc32(source.encode())
+    x = ((offset ^ (salt << 32)) * 0x9E3779B97F4A7C15) & _MASK64
+    return (x ^ (x >> 29)) & _MASK64
+
+
+def _item_to_dict(item: Union[LogItem, LogRecord]) -> dict:
+    if isinstance(item, LogItem):
+        return {"tool": item.tool, "level": item.level, "code": item.code, "msg": item.msg, "raw_text": item.raw}
+    return {
+        "tool": item.tool,
+        "level": item.level,
+        "code": item.code,
+        "msg": item.msg,
+        "source": item.source,
+        "offset": item.offset,
+        "raw_text": item.raw_text,
+    }
+
+def _item_from_dict(data: dict) -> LogRecord:
+    return LogRecord(
+        data["tool"],
+        data["level"],
+        data["code"],
+        data["msg"],
+        data.get("source"),
+        data.get("offset", -1),
+        data.get("raw_text"),
+    )
+
+
+class ClusterAccumulator:
+    """Exact counts plus a bounded sample of members for one cluster, so memory is O(1) per cluster."""
+    __slots__ = ("index", "key", "template", "count", "level_counts", "tool_counts", "sources", "first_seen", "last_seen", "sample_size", "_sample")
+
+    def __init__(self, index: int, key: str, template: str, sample_size: int = DEFAULT_SAMPLE_SIZE):
+        self.index = index          # first-seen order; becomes the cluster id
+        self.key = key
+        self.template = template
+        self.count = 0
+        self.level_counts: Dict[str, int] = {}
+        self.tool_counts: Dict[str, int] = {}
+        self.sources: Set[str] = set()   # log files with a member
+        self.first_seen = -1
+        self.last_seen = -1
+        self.sample_size = sample_size
+        # Max-heap (via negated priority) of the sample_size lowest-priority members
+        self._sample: List[Tuple[int, int, Union[LogItem, LogRecord]]] = []
+
+    def add(self, item: Union[LogItem, LogRecord], position: int) -> None:
+        self.count += 1
+        self.level_counts[item.level] = self.level_counts.get(item.level, 0) + 1
+        self.tool_counts[item.tool] = self.tool_counts.get(item.tool, 0) + 1
+        source = getattr(item, "source", None)
+        if source is not None:
+            self.sources.add(source)
+        if self.first_seen < 0:
+            self.first_seen = position
+        self.last_seen = position
+        self._offer(-_sample_priority(item, position), position, item)
+
+    def _offer(self, neg_priority: int, position: int, item: Union[LogItem, LogRecord]) -> None:
+        if self.sample_size <= 0:
+            return
+        entry = (neg_priority, position, item)
+        if len(self._sample) < self.sample_size:
+            heapq.heappush(self._sample, entry)
+        elif entry > self._sample[0]:
+            heapq.heapreplace(self._sample, entry)
+
+    def merge(self, other: "ClusterAccumulator", position_offset: int = 0) -> None:
+        """Fold in a partial accumulator whose positions are relative to position_offset."""
+        self.count += other.count
+        for level, n in other.level_counts.items():
+            self.level_counts[level] = self.level_counts.get(level, 0) + n
+        for tool, n in other.tool_counts.items():
+            self.tool_counts[tool] = self.tool_counts.get(tool, 0) + n
+        self.sources |= other.sources
+        if self.first_seen < 0:
+            self.first_seen = other.first_seen + position_offset
+        self.last_seen = other.last_seen + position_offset
+        for neg_priority, position, item in other._sample:
+            self._offer(neg_priority, position + position_offset, item)
+
+    def to_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "key": self.key,
+            "template": self.template,
+            "count": self.count,
+            "level_counts": self.level_counts,
+            "tool_counts": self.tool_counts,
+            "sources": sorted(self.sources),
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "sample": [[neg_priority, position, _item_to_dict(item)] for neg_priority, position, item in self._sample],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, sample_size: int = DEFAULT_SAMPLE_SIZE) -> "ClusterAccumulator":
+        acc = cls(data["index"], data["key"], data["template"], sample_size)
+        acc.count = data["count"]
+        acc.level_counts = dict(data["level_counts"])
+        acc.tool_counts = dict(data["tool_counts"])
+        acc.sources = set(data.get("sources", ()))
+        acc.first_seen = data["first_seen"]
+        acc.last_seen = data["last_seen"]
+        for neg_priority, position, item in data["sample"]:
+            acc._offer(neg_priority, position, _item_from_dict(item))
+        return acc
+
+    def sample(self) -> List[Union[LogItem, LogRecord]]:
+        return [item for _, _, item in sorted(self._sample, key=lambda e: e[1])]
+
+    def to_cluster(
+        self,
+        cluster_id: str,
+        members_path: Optional[str] = None,
+        key: Optional[str] = None,
+        template: Optional[str] = None,
+    ) -> Cluster:
+        return Cluster(
+            id=cluster_id,
+            key=key if key is not None else self.key,
+            count=self.count,
+            items=materialize(self.sample()),
+            fingerprint=template_hash(template if template is not None else self.template),
+            level_counts=dict(self.level_counts),
+            tool_counts=dict(self.tool_counts),
+            first_seen=self.first_seen,
+            last_seen=self.last_seen,
+            members_path=members_path,
+            file_count=len(self.sources),
+        )
+
+
+class ClusterTable:
+    """Incrementally clusters a stream of items; optionally spills every member to a JSON Lines file."""
+
+    def __init__(
+        self,
+        memo: Optional[Union["FingerprintMemo", "DrainMiner"]] = None,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        spill_path: Optional[Path] = None,
+        item_sink: Optional[Callable[[ClusterAccumulator, Union[LogItem, LogRecord], int], None]] = None,
+    ):
+        self.memo = memo if memo is not None else FingerprintMemo()
+        # Called with (accumulator, item, position) for every item, e.g. to export the full item stream
+        self.item_sink = item_sink
+        self.sample_size = sample_size
+        self.items_seen = 0
+        self._clusters: Dict[str, ClusterAccumulator] = {}
+        self.spill_path = Path(spill_path) if spill_path else None
+        self._spill: Optional[IO[str]] = None
+        if self.spill_path is not None:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            self._spill = self.spill_path.open("w", encoding="utf-8")
+
+    def add(self, item: Union[LogItem, LogRecord]) -> ClusterAccumulator:
+        key, template = self.memo.lookup(item.msg)
+        acc = self._clusters.get(template)
+        if acc is None:
+            acc = self._clusters[template] = ClusterAccumulator(len(self._clusters), key, template, self.sample_size)
+        acc.add(item, self.items_seen)
+        if self._spill is not None:
+            self._spill_member(acc, item)
+        if self.item_sink is not None:
+            self.item_sink(acc, item, self.items_seen)
+        self.items_seen += 1
+        return acc
+
+    def update(self, items: Iterable[Union[LogItem, LogRecord]]) -> "ClusterTable":
+        for item in items:
+            self.add(item)
+        return self
+
+    def _spill_member(self, acc: ClusterAccumulator, item: Union[LogItem, LogRecord]) -> None:
+        # Cluster ids follow first-seen order, so a member's final cluster id is already known here
+        record = {
+            "cluster_id": f"cluster_{acc.index}",
+            "tool": item.tool,
+            "level": item.level,
+            "code": item.code,
+            "msg": item.msg,
+        }
+        if isinstance(item, LogRecord) and item.raw_text is None:
+            record["source"] = item.source
+            record["offset"] = item.offset
+        else:
+            record["raw"] = item.raw if isinstance(item, LogItem) else item.raw_text
+        self._spill.write(json.dumps(record) + "\n")
+
+    def merge(self, other: "ClusterTable") -> "ClusterTable":
+        """
+        Append a partial table built from the items that come after this table's items.
+        Merging partials in input order gives the same cluster ids, counts and samples as one sequential pass.
+        """
+        offset = self.items_seen
+        for acc in sorted(other._clusters.values(), key=lambda a: a.index):
+            mine = self._clusters.get(acc.template)
+            if mine is None:
+                mine = self._clusters[acc.template] = ClusterAccumulator(len(self._clusters), acc.key, acc.template, self.sample_size)
+            mine.merge(acc, offset)
+        self.items_seen += other.items_seen
+        self.memo.hits += other.memo.hits
+        self.memo.misses += other.memo.misses
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "items_seen": self.items_seen,
+            "sample_size": self.sample_size,
+            "clusters": [acc.to_dict() for acc in self._clusters.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, memo: Optional[FingerprintMemo] = None) -> "ClusterTable":
+        table = cls(memo=memo, sample_size=data["sample_size"])
+        table.items_seen = data["items_seen"]
+        for acc_data in data["clusters"]:
+            acc = ClusterAccumulator.from_dict(acc_data, table.sample_size)
+            table._clusters[acc.template] = acc
+        return table
+
+    def __len__(self) -> int:
+        return len(self._clusters)
+
+    def accumulators(self) -> List[ClusterAccumulator]:
+        return list(self._clusters.values())
+
+    def clusters(self) -> List[Cluster]:
+        if self._spill is not None:
+            self._spill.flush()
+        members_path = str(self.spill_path) if self.spill_path is not None else None
+        clusters = []
+        for acc in self._clusters.values():
+            key, template = self.memo.describe(acc.key, acc.template)
+            clusters.append(acc.to_cluster(f"cluster_{acc.index}", members_path, key, template))
+        return clusters
+
+    def close(self) -> None:
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
 
-def cluster_logs(items: List[LogItem]) -> List[Cluster]:
-    clusters = defaultdict(list)
-    
-    for item in items:
-        fp = fingerprint(item.msg)
-        clusters[fp].append(item)
-    
-    result = []
-    for i, (fp, cluster_items) in enumerate(clusters.items()):
-        template = cluster_items[0].msg
-        
-        key = NUM_PATTERN.sub('<NUM>', template)
-        key = QUOTED_STRING_PATTERN.sub("'<SIG>'", key)
-        
-        result.append(Cluster(
-            id=f"cluster_{i}",
-            key=key,
-            count=len(cluster_items),
-            items=cluster_items
-        ))
-    
-    return result
\ No newline at end of file
+def cluster_logs(
+    items: Iterable[Union[LogItem, LogRecord]],
+    memo: Optional[FingerprintMemo] = None,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    spill_path: Optional[Path] = None,
+) -> List[Cluster]:
+    # Consumes items incrementally, so a streaming parse_lines generator can be passed directly
+    table = ClusterTable(memo=memo, sample_size=sample_size, spill_path=spill_path)
+    try:
+        table.update(items)
+        return table.clusters()
+    finally:
+        table.close()
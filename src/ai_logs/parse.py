@@ -1,15 +1,22 @@
+import mmap
+import os
 import re
-from typing import Iterable, List
-from .schema import LogItem
+import sys
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple, Union
+from .schema import LogItem, LogRecord
 
 IVERILOG_PTRN = re.compile(r"^(?:iverilog:\s+)?(?P<level>warning|error):(?P<msg>.*?)$", re.I)
 YOSYS_STEP_PTRN = re.compile(r"^(?P<step>\d+)\.\s+(?P<msg>.*)$")
 YOSYS_LEVELED_PTRN = re.compile(r"^(?P<level>warning|error):\s*(?P<msg>.*?)$", re.I)
 
-def parse_lines(tool:str, lines: Iterable[str]) -> List[LogItem]:
-  items: List[LogItem] = []
-  
-  for raw in lines:
+# Read buffer for streaming logs; large enough to amortize syscalls on multi-GB files
+READ_BUFFER_SIZE = 1 << 20
+
+_intern = sys.intern
+
+def _match_lines(tool: str, lines: Iterable[Tuple[int, str]]) -> Iterator[Tuple[int, str, str, Optional[str], str]]:
+  # Yields (offset, line, level, code, msg) for every line that carries a log message
+  for offset, raw in lines:
     s = raw.rstrip("\n")
     if not s:
       continue
@@ -23,44 +30,125 @@ def parse_lines(tool:str, lines: Iterable[str]) -> List[LogItem]:
       level = data['level'].lower()
       msg = data['msg'].strip()
       
-      items.append(
-        LogItem(
-          tool=tool,
-          level=level,
-          code=None,
-          msg=msg,
-          raw=s
-        )
-      )
+      yield offset, s, level, None, msg
 
     elif tool == "yosys":
       ys = YOSYS_STEP_PTRN.match(s)
       if ys:
         step = int(ys.group("step"))
         msg = ys.group("msg").strip()
-        items.append(
-          LogItem(
-            tool=tool,
-            level="info",
-            code=f"step:{step}",
-            msg=msg,
-            raw=s
-          )
-        )
+        yield offset, s, "info", f"step:{step}", msg
       
       yl = YOSYS_LEVELED_PTRN.match(s)
       if yl:
         data = yl.groupdict()
         level = data["level"].lower()
         msg = data["msg"].strip()
-        items.append(
-          LogItem(
-            tool=tool,
-            level=level,
-            code=None,
-            msg=msg,
-            raw=s
-          )
-        )
+        yield offset, s, level, None, msg
+
+def parse_lines(tool:str, lines: Iterable[str]) -> Iterator[LogItem]:
+  # Generator so callers can stream multi-GB logs without materializing every item
+  for _, s, level, code, msg in _match_lines(tool, enumerate(lines)):
+    yield LogItem(
+      tool=tool,
+      level=level,
+      code=code,
+      msg=msg,
+      raw=s
+    )
+
+def parse_records(
+  tool: str,
+  lines: Iterable[Union[str, Tuple[int, str]]],
+  source: Optional[str] = None,
+) -> Iterator[LogRecord]:
+  """
+    Compact counterpart of parse_lines for the clustering hot path.
+    With a source path, `lines` are (byte offset, text) pairs from read_lines_with_offsets and records keep
+    only the offset; otherwise `lines` are plain strings and records keep their raw text.
+  """
+  numbered = lines if source is not None else enumerate(lines)
+  tool = _intern(tool)
+  source = _intern(source) if source is not None else None
+  for offset, s, level, code, msg in _match_lines(tool, numbered):
+    yield LogRecord(
+      tool,
+      _intern(level),
+      _intern(code) if code is not None else None,
+      msg,
+      source,
+      offset,
+      None if source is not None else s,
+    )
+
+def read_lines_with_offsets(path: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+  # Binary buffered read so each line's byte offset is known without calling tell()
+  with open(path, "rb", buffering=READ_BUFFER_SIZE) as fh:
+    fh.seek(start)
+    offset = start
+    for line in fh:
+      if end is not None and offset >= end:
+        break
+      yield offset, line.decode("utf-8", errors="ignore").rstrip("\r\n")
+      offset += len(line)
 
-  return items
\ No newline at end of file
+def mmap_lines_with_offsets(path: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+  """
+    Same contract as read_lines_with_offsets (lines that start in [start, end)), but reads through a
+    read-only mmap so parallel workers can share the page cache instead of copying text around.
+  """
+  with open(path, "rb") as fh:
+    size = os.fstat(fh.fileno()).st_size
+    if size == 0:
+      return
+    with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+      end = size if end is None else min(end, size)
+      find = mm.find
+      pos = start
+      while pos < end:
+        nl = find(b"\n", pos)
+        stop = size if nl < 0 else nl + 1
+        yield pos, mm[pos:stop].decode("utf-8", errors="ignore").rstrip("\r\n")
+        pos = stop
+
+def split_byte_ranges(path: str, chunk_bytes: int, start: int = 0, end: Optional[int] = None) -> List[Tuple[int, int]]:
+  """Split [start, end) of a file into consecutive byte ranges of roughly chunk_bytes, each ending on a newline."""
+  limit = os.path.getsize(path)
+  limit = limit if end is None else min(end, limit)
+  if limit <= start:
+    return []
+  if limit - start <= chunk_bytes:
+    return [(start, limit)]
+  ranges: List[Tuple[int, int]] = []
+  with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+    while start < limit:
+      nl = mm.find(b"\n", min(start + chunk_bytes, limit) - 1, limit)
+      stop = limit if nl < 0 else nl + 1
+      ranges.append((start, stop))
+      start = stop
+  return ranges
+
+def _read_raw(handle: IO[bytes], offset: int) -> str:
+  handle.seek(offset)
+  return handle.readline().decode("utf-8", errors="ignore").rstrip("\r\n")
+
+def materialize(records: Iterable[Union[LogRecord, LogItem]]) -> List[LogItem]:
+  """Build pydantic LogItems at the output boundary, re-reading raw lines from their source files."""
+  handles: Dict[str, IO[bytes]] = {}
+  items: List[LogItem] = []
+  try:
+    for rec in records:
+      if isinstance(rec, LogItem):
+        items.append(rec)
+        continue
+      raw = rec.raw_text
+      if raw is None:
+        handle = handles.get(rec.source)
+        if handle is None:
+          handle = handles[rec.source] = open(rec.source, "rb")
+        raw = _read_raw(handle, rec.offset)
+      items.append(LogItem(tool=rec.tool, level=rec.level, code=rec.code, msg=rec.msg, raw=raw))
+  finally:
+    for handle in handles.values():
+      handle.close()
+  return items
@@ -0,0 +1,143 @@
+import json
+from abc import ABC, abstractmethod
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from . import gemini_ai
+from .gemini_ai import DEFAULT_SAMPLE_TOKENS, MODEL_NAME, PROMPT_VERSION, create_batch_prompt, create_fallback_summary, create_summary_prompt, estimate_tokens
+from .knowledge import KnowledgeBase, KNOWLEDGE_VERSION
+from .lazy import lazy_import
+from .ratelimit import TokenBucket
+from .schema import Cluster, Summary
+
+# Only the http provider needs it
+urllib_request = lazy_import("urllib.request")
+
+PROVIDERS = ("gemini", "http", "kb")
+# Ollama's completion endpoint; any server taking {"model", "prompt"} and answering "response" or "text" works
+DEFAULT_HTTP_URL = "http://127.0.0.1:11434/api/generate"
+DEFAULT_HTTP_MODEL = "llama3"
+DEFAULT_HTTP_TIMEOUT = 120.0
+
+class SummaryProvider(ABC):
+  """
+    A summarization backend. `summarize` answers one cluster, or returns None when it cannot; `summarize_batch`
+    answers several in one round trip and returns {} when the backend has no batch mode, so callers fall back
+    to single requests. `model` and `prompt_version` key the summary cache and semantic index, so answers from
+    different backends are never mixed up.
+  """
+  name = "base"
+  # Remote backends are called through the thread pool and rate limiter; local ones are answered inline
+  remote = True
+  model = ""
+  prompt_version = ""
+  # Token budget for the sample messages in each cluster's prompt, for backends that build one
+  sample_tokens = DEFAULT_SAMPLE_TOKENS
+
+  @abstractmethod
+  def summarize(self, cluster: Cluster, rate_limiter: Optional[TokenBucket] = None) -> Optional[Summary]:
+    ...
+
+  def summarize_batch(self, clusters: List[Cluster], rate_limiter: Optional[TokenBucket] = None) -> Dict[str, Summary]:
+    return {}
+
+  def prompt_tokens(self, clusters: List[Cluster]) -> int:
+    """Estimated prompt tokens of one request for `clusters`, charged against the run's token budget."""
+    return 0
+
+class GeminiProvider(SummaryProvider):
+  name = "gemini"
+
+  def __init__(self, client: Any = None, model: str = MODEL_NAME, sample_tokens: int = DEFAULT_SAMPLE_TOKENS):
+    # None uses the shared process-wide genai client
+    self.client = client
+    self.model = model
+    self.prompt_version = PROMPT_VERSION
+    self.sample_tokens = sample_tokens
+
+  def summarize(self, cluster: Cluster, rate_limiter: Optional[TokenBucket] = None) -> Optional[Summary]:
+    return gemini_ai.generate_summary_with_gemini(cluster, self.client, rate_limiter, self.sample_tokens)
+
+  def summarize_batch(self, clusters: List[Cluster], rate_limiter: Optional[TokenBucket] = None) -> Dict[str, Summary]:
+    return gemini_ai.generate_batch_summaries_with_gemini(clusters, self.client, rate_limiter, self.sample_tokens)
+
+  def prompt_tokens(self, clusters: List[Cluster]) -> int:
+    if len(clusters) == 1:
+      return estimate_tokens(create_summary_prompt(clusters[0], self.sample_tokens))
+    return estimate_tokens(create_batch_prompt(clusters, self.sample_tokens))
+
+class HTTPClient:
+  """Stand-in for genai.Client that posts each prompt to a local completion endpoint."""
+
+  def __init__(self, url: str = DEFAULT_HTTP_URL, model: str = DEFAULT_HTTP_MODEL, timeout: float = DEFAULT_HTTP_TIMEOUT):
+    self.url = url
+    self.model = model
+    self.timeout = timeout
+    self.models = SimpleNamespace(generate_content=self.generate_content)
+
+  def generate_content(self, model: str, contents: str) -> Any:
+    # `model` names the Gemini model the prompts were written for; the endpoint gets its own
+    body = json.dumps({"model": self.model, "prompt": contents, "stream": False}).encode()
+    request = urllib_request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+    with urllib_request.urlopen(request, timeout=self.timeout) as response:
+      payload = response.read().decode("utf-8", errors="replace")
+    try:
+      data = json.loads(payload)
+    except ValueError:
+      return SimpleNamespace(text=payload)
+    text = data.get("response", data.get("text")) if isinstance(data, dict) else None
+    if not isinstance(text, str):
+      raise ValueError(f"no 'response' or 'text' field in the reply from {self.url}")
+    return SimpleNamespace(text=text)
+
+class HTTPProvider(GeminiProvider):
+  """Same prompts, retries and response parsing as Gemini, answered by a local HTTP model server."""
+  name = "http"
+
+  def __init__(
+    self,
+    url: str = DEFAULT_HTTP_URL,
+    model: str = DEFAULT_HTTP_MODEL,
+    timeout: float = DEFAULT_HTTP_TIMEOUT,
+    sample_tokens: int = DEFAULT_SAMPLE_TOKENS,
+  ):
+    super().__init__(HTTPClient(url, model, timeout), model=f"http:{model}", sample_tokens=sample_tokens)
+
+class KnowledgeBaseProvider(SummaryProvider):
+  """
+    Deterministic offline answers from the curated table of known tool messages. With `fallback`, clusters
+    the table does not know get the generic fallback summary instead of None, so every cluster is answered.
+  """
+  name = "kb"
+  remote = False
+  model = "knowledge-base"
+  prompt_version = KNOWLEDGE_VERSION
+
+  def __init__(self, knowledge: Optional[KnowledgeBase] = None, fallback: bool = False):
+    self.knowledge = knowledge if knowledge is not None else KnowledgeBase()
+    self.fallback = fallback
+
+  def summarize(self, cluster: Cluster, rate_limiter: Optional[TokenBucket] = None) -> Optional[Summary]:
+    entry = self.knowledge.lookup(cluster)
+    if entry is None:
+      return create_fallback_summary(cluster) if self.fallback else None
+    return Summary(
+      cluster_id=int(cluster.id.split('_')[1]),
+      explanation=entry.explanation,
+      suggested_fixes=list(entry.fixes),
+    )
+
+def make_provider(
+  name: str,
+  client: Any = None,
+  http_url: str = DEFAULT_HTTP_URL,
+  http_model: str = DEFAULT_HTTP_MODEL,
+  http_timeout: float = DEFAULT_HTTP_TIMEOUT,
+  sample_tokens: int = DEFAULT_SAMPLE_TOKENS,
+) -> SummaryProvider:
+  if name == "gemini":
+    return GeminiProvider(client, sample_tokens=sample_tokens)
+  if name == "http":
+    return HTTPProvider(http_url, http_model, http_timeout, sample_tokens)
+  if name == "kb":
+    return KnowledgeBaseProvider(fallback=True)
+  raise ValueError(f"unknown summary provider {name!r}; expected one of {', '.join(PROVIDERS)}")
@@ -0,0 +1,45 @@
+import threading
+import time
+from typing import Callable
+
+class TokenBucket:
+  """Thread-safe token bucket: `rate` tokens per second, bursting up to `capacity`."""
+
+  def __init__(
+    self,
+    rate: float,
+    capacity: float = 1.0,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+  ):
+    if rate <= 0:
+      raise ValueError("rate must be positive")
+    self.rate = rate
+    self.capacity = max(1.0, capacity)
+    self._clock = clock
+    self._sleep = sleep
+    self._tokens = self.capacity
+    self._updated = clock()
+    self._lock = threading.Lock()
+
+  def _refill(self) -> None:
+    now = self._clock()
+    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+    self._updated = now
+
+  def try_acquire(self, tokens: float = 1.0) -> bool:
+    with self._lock:
+      self._refill()
+      if self._tokens >= tokens:
+        self._tokens -= tokens
+        return True
+      return False
+
+  def acquire(self, tokens: float = 1.0) -> None:
+    # Reserve under the lock, then sleep off any deficit outside it so other threads can queue up
+    with self._lock:
+      self._refill()
+      self._tokens -= tokens
+      deficit = -self._tokens
+    if deficit > 0:
+      self._sleep(deficit / self.rate)
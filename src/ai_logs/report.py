@@ -1,7 +1,11 @@
+import json
+import os
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple
 from .schema import Cluster, Summary
 
+RESULTS_FORMATS = ("json", "jsonl")
+
 def make_markdown(clusters: List[Cluster], summaries: Dict[str, Summary], feedback_url: str) -> str:
   lines = ["# Engineering Log Analysis Report", ""]
   lines += [f"- Total clusters: **{len(clusters)}**",
@@ -9,14 +13,16 @@ def make_markdown(clusters: List[Cluster], summaries: Dict[str, Summary], feedba
 
   for element in clusters:
     s = summaries.get(element.id)
-    severity_levels = [item.level for item in element.items] if element.items else ['unknown']
+    # Counters cover every member, not just the sampled items
+    severity_levels = list(element.level_counter()) or ['unknown']
     severity_order = {'error': 3, 'warning': 2, 'info': 1}
     most_severe = max(severity_levels, key=lambda x: severity_order.get(x, 0))
+    tools = list(element.tool_counter())
 
     # Use backticks to display placeholders as code instead of HTML entities
     escaped_key = element.key.replace('<', '`<').replace('>', '>`')
     lines += [f"## Cluster {element.id} — {escaped_key}",
-              f"- Count: **{element.count}** | Tool: `{element.items[0].tool if element.items else 'n/a'}`",
+              f"- Count: **{element.count}** | Tool: `{tools[0] if tools else 'n/a'}`",
               f"- Severity: `{most_severe}`",
               "",
               "**Explanation**",
@@ -39,4 +45,68 @@ def make_markdown_with_stats(clusters: List[Cluster], summaries: Dict[str, Summa
 
 def write_report(md: str, out_md: Path) -> None:
   out_md.write_text(md, encoding="utf-8")
-  print(f"Markdown report written to {out_md}")
\ No newline at end of file
+  print(f"Markdown report written to {out_md}")
+
+def _dumps(obj: dict, indent: Optional[int]) -> str:
+  if indent is None:
+    return json.dumps(obj, separators=(",", ":"))
+  return json.dumps(obj, indent=indent)
+
+def _nested(text: str, indent: int, depth: int) -> str:
+  # JSON strings never contain raw newlines, so re-indenting line by line nests a document safely
+  return text.replace("\n", "\n" + " " * (indent * depth))
+
+def _write_json_document(fh: IO[str], clusters: Iterable[Cluster], summaries: Dict[str, Summary], indent: Optional[int]) -> None:
+  # Same document json.dumps({"clusters": [...], "summaries": {...}}, indent=indent) produces, one cluster at a time
+  if indent is None:
+    nl, pad1, pad2, colon = "", "", "", ":"
+  else:
+    nl, pad1, pad2, colon = "\n", " " * indent, " " * (2 * indent), ": "
+  fh.write("{" + nl + pad1 + '"clusters"' + colon + "[")
+  first = True
+  for cluster in clusters:
+    fh.write(("" if first else ",") + nl + pad2 + _nested(_dumps(cluster.model_dump(), indent), indent or 0, 2))
+    first = False
+  fh.write(("" if first else nl + pad1) + "]," + nl + pad1 + '"summaries"' + colon + "{")
+  first = True
+  for cluster_id, summary in summaries.items():
+    fh.write(("" if first else ",") + nl + pad2 + json.dumps(cluster_id) + colon + _nested(_dumps(summary.model_dump(), indent), indent or 0, 2))
+    first = False
+  fh.write(("" if first else nl + pad1) + "}" + nl + "}")
+
+def write_results(
+  clusters: Iterable[Cluster],
+  summaries: Dict[str, Summary],
+  out_json: Path,
+  fmt: str = "json",
+  indent: Optional[int] = 2,
+) -> None:
+  """
+    Stream results to disk cluster by cluster instead of building one big string. "json" writes the
+    {"clusters": [...], "summaries": {...}} document (compact when indent is None); "jsonl" writes one
+    {"cluster": ..., "summary": ...} object per line so consumers can read it back incrementally.
+  """
+  if fmt not in RESULTS_FORMATS:
+    raise ValueError(f"unknown results format {fmt!r}; expected one of {', '.join(RESULTS_FORMATS)}")
+  out_json = Path(out_json)
+  # Write-then-rename so a reader polling the file (e.g. during `follow`) never sees half a document
+  tmp = out_json.with_name(out_json.name + ".tmp")
+  with tmp.open("w", encoding="utf-8") as fh:
+    if fmt == "json":
+      _write_json_document(fh, clusters, summaries, indent)
+    else:
+      for cluster in clusters:
+        summary = summaries.get(cluster.id)
+        record = {"cluster": cluster.model_dump(), "summary": summary.model_dump() if summary else None}
+        fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+  os.replace(tmp, out_json)
+
+def iter_results(path: Path) -> Iterator[Tuple[Cluster, Optional[Summary]]]:
+  """Read back a JSON Lines results file one cluster at a time."""
+  with Path(path).open("r", encoding="utf-8") as fh:
+    for line in fh:
+      if not line.strip():
+        continue
+      record = json.loads(line)
+      summary = record.get("summary")
+      yield Cluster.model_validate(record["cluster"]), Summary.model_validate(summary) if summary else None
@@ -0,0 +1,84 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+from .schema import Cluster
+
+# Severity dominates the order: every error is scheduled before any warning, every warning before any info
+SEVERITY_RANK = {"error": 3, "warning": 2, "info": 1}
+
+def severity_rank(cluster: Cluster) -> int:
+  return max((SEVERITY_RANK.get(level, 0) for level in cluster.level_counter()), default=0)
+
+def priority_score(cluster: Cluster, novelty: float = 1.0) -> float:
+  """
+    Impact of explaining a cluster within its severity: grows with the log-scaled occurrence count and number
+    of files it spans, and with `novelty` (1 - similarity to the closest already summarized key).
+  """
+  impact = math.log2(1 + cluster.count) * (1 + math.log2(max(1, cluster.file_count)))
+  return impact * (0.5 + 0.5 * min(1.0, max(0.0, novelty)))
+
+def prioritize(clusters: Sequence[Cluster], novelty: Optional[Dict[str, float]] = None) -> List[Cluster]:
+  """Clusters in summarization order: by severity, then priority score; ties keep their input order."""
+  novelty = novelty or {}
+  return sorted(clusters, key=lambda c: (-severity_rank(c), -priority_score(c, novelty.get(c.id, 1.0))))
+
+class SummaryBudget:
+  """
+    Per-run limits on LLM calls, prompt tokens and wall-clock time (0 disables a limit). Requests reserve their
+    share just before they are sent; once a limit is reached every later request is refused, so work submitted
+    in priority order is cut from the least important end. Calls already in flight at the deadline finish.
+  """
+
+  def __init__(
+    self,
+    max_calls: int = 0,
+    max_tokens: int = 0,
+    deadline_seconds: float = 0.0,
+    clock: Callable[[], float] = time.monotonic,
+  ):
+    self.max_calls = max_calls
+    self.max_tokens = max_tokens
+    self.deadline_seconds = deadline_seconds
+    self._clock = clock
+    self._started = clock()
+    self._lock = threading.Lock()
+    self.calls = 0
+    self.tokens = 0
+    self.refused = 0
+    # Set by the first refusal, so a smaller, less important request can never slip in after a larger one
+    self.exhausted = False
+
+  @property
+  def limited(self) -> bool:
+    return self.max_calls > 0 or self.max_tokens > 0 or self.deadline_seconds > 0
+
+  def expired(self) -> bool:
+    return self.deadline_seconds > 0 and self._clock() - self._started >= self.deadline_seconds
+
+  def try_spend(self, tokens: int) -> bool:
+    """
+      Reserve one call of `tokens` prompt tokens; False when it would exceed a limit, the deadline passed, or
+      an earlier request was already refused.
+    """
+    with self._lock:
+      if (
+        self.exhausted
+        or self.expired()
+        or (self.max_calls > 0 and self.calls + 1 > self.max_calls)
+        or (self.max_tokens > 0 and self.tokens + tokens > self.max_tokens)
+      ):
+        self.exhausted = True
+        self.refused += 1
+        return False
+      self.calls += 1
+      self.tokens += tokens
+      return True
+
+  def stats(self) -> Dict[str, float]:
+    return {
+      "calls": self.calls,
+      "tokens": self.tokens,
+      "refused": self.refused,
+      "elapsed_seconds": round(self._clock() - self._started, 3),
+    }
@@ -8,11 +8,64 @@ class LogItem(BaseModel):
   msg: str
   raw: str
 
+class LogRecord:
+  """
+    Compact item for the parse -> cluster path. tool/level/code are interned and, for file input, the raw
+    line is not copied: only its byte offset is kept and the text is re-read when a LogItem is built.
+  """
+  __slots__ = ("tool", "level", "code", "msg", "source", "offset", "raw_text")
+
+  def __init__(
+    self,
+    tool: str,
+    level: str,
+    code: Optional[str],
+    msg: str,
+    source: Optional[str] = None,
+    offset: int = -1,
+    raw_text: Optional[str] = None,
+  ):
+    self.tool = tool
+    self.level = level
+    self.code = code
+    self.msg = msg
+    self.source = source        # log file path, or None when parsed from in-memory lines
+    self.offset = offset        # byte offset of the line in source (line index for in-memory input)
+    self.raw_text = raw_text    # only set when there is no source file to re-read from
+
+  def __repr__(self) -> str:
+    return f"LogRecord(tool={self.tool!r}, level={self.level!r}, msg={self.msg!r}, source={self.source!r}, offset={self.offset})"
+
 class Cluster(BaseModel):
   id: str
   key: str              # fingerprint key (msg template)
   count: int
   items: List[LogItem]
+  fingerprint: str = "" # stable hash of the normalized template, used as the summary cache key
+  # Exact statistics over every member; `items` above is only a bounded sample once these are set
+  level_counts: Dict[str, int] = {}
+  tool_counts: Dict[str, int] = {}
+  first_seen: Optional[int] = None    # position of the first/last member in the run's item stream
+  last_seen: Optional[int] = None
+  members_path: Optional[str] = None  # JSON Lines file listing every member, when spilling is enabled
+  merged_keys: List[str] = []         # keys of near-duplicate clusters folded into this one
+  file_count: int = 0                 # distinct log files with a member (0 when parsed from in-memory lines)
+
+  def level_counter(self) -> Dict[str, int]:
+    if self.level_counts:
+      return self.level_counts
+    counts: Dict[str, int] = {}
+    for item in self.items:
+      counts[item.level] = counts.get(item.level, 0) + 1
+    return counts
+
+  def tool_counter(self) -> Dict[str, int]:
+    if self.tool_counts:
+      return self.tool_counts
+    counts: Dict[str, int] = {}
+    for item in self.items:
+      counts[item.tool] = counts.get(item.tool, 0) + 1
+    return counts
 
 class Summary(BaseModel):
   cluster_id: int
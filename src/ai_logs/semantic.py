@@ -0,0 +1,223 @@
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .lazy import lazy_import
+from .schema import Summary
+from .similarity import TOKEN_PATTERN
+
+np = lazy_import("numpy")
+
+INDEX_VERSION = 1
+# Hashed feature space: unigrams and bigrams of a key land in one of this many buckets
+DEFAULT_DIMENSIONS = 1 << 12
+DEFAULT_REUSE_THRESHOLD = 0.85
+DEFAULT_MAX_INDEX_ENTRIES = 10_000
+
+def key_features(key: str, dimensions: int = DEFAULT_DIMENSIONS) -> Tuple["np.ndarray", "np.ndarray"]:
+  """Sparse term counts (sorted feature ids, counts) of a cluster key's word unigrams and bigrams."""
+  tokens = TOKEN_PATTERN.findall(key.lower())
+  terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+  # crc32 rather than hash(): the buckets must agree across processes and runs
+  hashed = np.array([zlib.crc32(t.encode()) % dimensions for t in terms], dtype=np.int64)
+  features, counts = np.unique(hashed, return_counts=True)
+  return features.astype(np.uint16), counts.astype(np.float32)
+
+def _text_array(text: str) -> "np.ndarray":
+  return np.frombuffer(text.encode(), dtype=np.uint8)
+
+def _split_lines(data: "np.ndarray") -> List[str]:
+  text = data.tobytes().decode()
+  return text.split("\n") if text else []
+
+class SemanticIndex:
+  """
+    TF-IDF index of already summarized cluster keys, persisted as one .npz file. A new cluster whose key's
+    cosine similarity to a stored key reaches `threshold` reuses that summary instead of a new LLM call, which
+    catches rewordings that exact fingerprints miss. Entries are kept as sparse term counts and queried through
+    an inverted index, so a query only touches the entries sharing one of its terms.
+  """
+
+  def __init__(
+    self,
+    model: str,
+    prompt_version: str,
+    threshold: float = DEFAULT_REUSE_THRESHOLD,
+    max_entries: int = DEFAULT_MAX_INDEX_ENTRIES,
+    dimensions: int = DEFAULT_DIMENSIONS,
+  ):
+    if not 0 < dimensions <= 1 << 16:
+      raise ValueError("dimensions must be in 1..65536")
+    self.model = model
+    self.prompt_version = prompt_version
+    self.threshold = threshold
+    self.max_entries = max_entries
+    self.dimensions = dimensions
+    self.keys: List[str] = []
+    self._key_set: Set[str] = set()
+    # Summaries stay serialized until reused, so loading a large index does not parse every one
+    self._payloads: List[str] = []
+    # Term counts of all entries in CSR layout, plus rows added since it was last rebuilt
+    self._indptr = np.zeros(1, dtype=np.int64)
+    self._features = np.zeros(0, dtype=np.uint16)
+    self._counts = np.zeros(0, dtype=np.float32)
+    self._pending: List[Tuple[np.ndarray, np.ndarray]] = []
+    self._postings: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+
+  @classmethod
+  def load(
+    cls,
+    path: Path,
+    model: str,
+    prompt_version: str,
+    threshold: float = DEFAULT_REUSE_THRESHOLD,
+    max_entries: int = DEFAULT_MAX_INDEX_ENTRIES,
+  ) -> "SemanticIndex":
+    path = Path(path)
+    if not path.exists():
+      return cls(model, prompt_version, threshold, max_entries)
+    try:
+      with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(data["meta"].tobytes())
+        if meta.get("version") != INDEX_VERSION:
+          raise ValueError(f"unsupported index version {meta.get('version')}")
+        # Summaries written for another model or prompt revision are not reusable, same as the summary cache
+        if meta["model"] != model or meta["prompt_version"] != prompt_version:
+          return cls(model, prompt_version, threshold, max_entries)
+        index = cls(model, prompt_version, threshold, max_entries, meta["dimensions"])
+        index._indptr, index._features, index._counts = data["indptr"], data["features"], data["counts"]
+        # Keys and summary JSON never contain raw newlines, so each is stored as newline-joined text
+        index.keys = _split_lines(data["keys"])
+        index._payloads = _split_lines(data["summaries"])
+        index._key_set = set(index.keys)
+      if not len(index.keys) == len(index._payloads) == len(index._indptr) - 1:
+        raise ValueError("entry arrays disagree in length")
+      index._evict()
+    except (OSError, ValueError, KeyError, TypeError) as e:
+      print(f"Ignoring unreadable semantic index {path}: {e}")
+      return cls(model, prompt_version, threshold, max_entries)
+    return index
+
+  def save(self, path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    meta = {
+      "version": INDEX_VERSION,
+      "model": self.model,
+      "prompt_version": self.prompt_version,
+      "dimensions": self.dimensions,
+    }
+    # Write-then-rename so an interrupted run never leaves a truncated index behind
+    tmp = path.with_name(path.name + ".tmp.npz")
+    with self._lock:
+      self._flush()
+      np.savez(
+        tmp,
+        meta=_text_array(json.dumps(meta)),
+        keys=_text_array("\n".join(self.keys)),
+        summaries=_text_array("\n".join(self._payloads)),
+        indptr=self._indptr,
+        features=self._features,
+        counts=self._counts,
+      )
+    os.replace(tmp, path)
+
+  def __len__(self) -> int:
+    return min(len(self.keys), self.max_entries)
+
+  def _flush(self) -> None:
+    if self._pending:
+      lengths = [len(f) for f, _ in self._pending]
+      self._indptr = np.concatenate([self._indptr, self._indptr[-1] + np.cumsum(lengths)])
+      self._features = np.concatenate([self._features, *(f for f, _ in self._pending)])
+      self._counts = np.concatenate([self._counts, *(c for _, c in self._pending)])
+      self._pending = []
+    self._evict()
+
+  def _evict(self) -> None:
+    # Oldest entries go first; call with no pending rows so every key has its CSR row
+    excess = len(self.keys) - self.max_entries
+    if excess > 0:
+      self._key_set.difference_update(self.keys[:excess])
+      del self.keys[:excess], self._payloads[:excess]
+      start = self._indptr[excess]
+      self._indptr = self._indptr[excess:] - start
+      self._features = self._features[start:]
+      self._counts = self._counts[start:]
+
+  def _prepare(self) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+    # IDF and row norms depend on every entry, so the postings are rebuilt lazily after adds
+    if self._postings is None:
+      self._flush()
+      n = len(self.keys)
+      rows = np.repeat(np.arange(n), np.diff(self._indptr))
+      features = self._features
+      df = np.bincount(features, minlength=self.dimensions)
+      idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+      weights = self._counts * idf[features]
+      norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n))
+      weights /= np.maximum(norms, 1e-12)[rows]
+      # Group the (row, weight) pairs by feature: a stable radix sort on the 16-bit feature ids
+      order = np.argsort(features, kind="stable")
+      starts = np.concatenate([[0], np.cumsum(df)])
+      self._postings = (idf, starts, rows[order], weights[order].astype(np.float32))
+    return self._postings
+
+  def _nearest(self, key: str) -> Tuple[int, float]:
+    if not self.keys:
+      return -1, 0.0
+    idf, starts, rows, weights = self._prepare()
+    features, counts = key_features(key, self.dimensions)
+    if not len(features):
+      # A key with no word tokens, e.g. '' or '---', shares nothing with any entry
+      return -1, 0.0
+    query = counts * idf[features]
+    query /= max(float(np.linalg.norm(query)), 1e-12)
+    hits = [slice(starts[f], starts[f + 1]) for f in features]
+    touched = np.concatenate([rows[s] for s in hits])
+    if not len(touched):
+      return -1, 0.0
+    contrib = np.concatenate([weights[s] * q for s, q in zip(hits, query)])
+    scores = np.bincount(touched, weights=contrib, minlength=len(self.keys))
+    best = int(scores.argmax())
+    return best, float(scores[best])
+
+  def nearest(self, keys: Sequence[str]) -> List[Tuple[int, float]]:
+    """(entry index, cosine similarity) of the closest stored key for each query key; (-1, 0.0) when none."""
+    with self._lock:
+      return [self._nearest(k) for k in keys]
+
+  def lookup(self, keys: Sequence[str]) -> List[Optional[Tuple[Summary, str, float]]]:
+    """(summary, matched key, similarity) for each key whose nearest stored key reaches the threshold."""
+    matches: List[Optional[Tuple[Summary, str, float]]] = []
+    with self._lock:
+      for key in keys:
+        i, score = self._nearest(key)
+        if i >= 0 and score >= self.threshold:
+          self.hits += 1
+          matches.append((Summary.model_validate_json(self._payloads[i]), self.keys[i], score))
+        else:
+          self.misses += 1
+          matches.append(None)
+    return matches
+
+  def add(self, key: str, summary: Summary) -> None:
+    row = key_features(key, self.dimensions)
+    with self._lock:
+      if key in self._key_set:
+        self._payloads[self.keys.index(key)] = summary.model_dump_json()
+        return
+      self._key_set.add(key)
+      self.keys.append(key)
+      self._payloads.append(summary.model_dump_json())
+      self._pending.append(row)
+      self._postings = None
+
+  def stats(self) -> Dict[str, int]:
+    return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
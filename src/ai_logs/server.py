@@ -0,0 +1,345 @@
+import json
+import os
+import queue
+import socketserver
+import stat
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional, Sequence
+from urllib.parse import parse_qs, urlsplit
+from pydantic import BaseModel, ValidationError, model_validator
+from .cache import SummaryCache
+from .ingest import expand_log_paths, ingest_ranges, GLOB_CHARS
+from .lazy import lazy_import
+from .normalize import ClusterTable, FingerprintMemo, DEFAULT_MEMO_CAPACITY, DEFAULT_SAMPLE_SIZE
+from .parse import parse_records
+from .semantic import SemanticIndex
+from .similarity import merge_similar_clusters
+from .summarize import summarize_clusters
+
+# Only `serve` needs an HTTP stack; CLI runs that merely import this module for its defaults skip it
+http_server = lazy_import("http.server")
+
+DEFAULT_PORT = 8765
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 64
+# Finished jobs kept for GET /jobs/<id> before the oldest are forgotten
+DEFAULT_MAX_JOBS = 1000
+# Longest a client may block on ?wait= or POST /analyze before getting the job id back instead
+MAX_WAIT_SECONDS = 600.0
+
+class LogSource(BaseModel):
+  tool: Literal["iverilog", "yosys"]
+  path: Optional[str] = None      # a file, a directory of *.log files or a glob under one of the server's log roots
+  text: Optional[str] = None      # log contents sent with the request
+
+  @model_validator(mode="after")
+  def _one_input(self) -> "LogSource":
+    if (self.path is None) == (self.text is None):
+      raise ValueError("give exactly one of path or text")
+    return self
+
+class AnalysisRequest(BaseModel):
+  logs: List[LogSource]
+  summarize: bool = True
+  merge_similar: float = 0.0
+
+class Job:
+  def __init__(self, request: AnalysisRequest):
+    self.id = uuid.uuid4().hex
+    self.request = request
+    self.status = "queued"
+    self.submitted_at = time.time()
+    self.started_at: Optional[float] = None
+    self.finished_at: Optional[float] = None
+    self.result: Optional[Dict[str, Any]] = None
+    self.error: Optional[str] = None
+    self.done = threading.Event()
+
+  def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+    data: Dict[str, Any] = {"id": self.id, "status": self.status, "submitted_at": self.submitted_at}
+    if self.started_at is not None:
+      data["queue_seconds"] = round(self.started_at - self.submitted_at, 6)
+    if self.finished_at is not None and self.started_at is not None:
+      data["run_seconds"] = round(self.finished_at - self.started_at, 6)
+    if self.error is not None:
+      data["error"] = self.error
+    if include_result and self.result is not None:
+      data["result"] = self.result
+    return data
+
+class AnalysisService:
+  """
+    Long-lived analysis state shared by every submitted job: compiled parsers, per-worker fingerprint memos,
+    the summary cache, the optional semantic index and the process-wide LLM client all stay warm between
+    requests. Jobs wait in a bounded queue for a fixed pool of worker threads; a full queue rejects new work
+    instead of growing without limit. The API is unauthenticated, so logs named by path are only read from
+    below `log_roots`; without any, jobs must send their logs as text.
+  """
+
+  def __init__(
+    self,
+    workers: int = DEFAULT_JOB_WORKERS,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    max_jobs: int = DEFAULT_MAX_JOBS,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    memo_capacity: int = DEFAULT_MEMO_CAPACITY,
+    cache: Optional[SummaryCache] = None,
+    index: Optional[SemanticIndex] = None,
+    log_roots: Sequence[str] = (),
+    **summarize_kwargs: Any,
+  ):
+    self.workers = max(1, workers)
+    self.log_roots = [Path(root).resolve() for root in log_roots]
+    self.max_jobs = max_jobs
+    self.sample_size = sample_size
+    self.memo_capacity = memo_capacity
+    self.cache = cache
+    self.index = index
+    self.summarize_kwargs = summarize_kwargs
+    self._queue: "queue.Queue[Optional[Job]]" = queue.Queue(maxsize=queue_size)
+    self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+    self._jobs_lock = threading.Lock()
+    self._threads: List[threading.Thread] = []
+    # FingerprintMemo is not thread-safe, so each worker keeps its own warm memo
+    self._local = threading.local()
+    self._memos: List[FingerprintMemo] = []
+    self.completed = 0
+    self.failed = 0
+
+  def start(self) -> None:
+    for i in range(self.workers):
+      thread = threading.Thread(target=self._work, name=f"analysis-worker-{i}", daemon=True)
+      thread.start()
+      self._threads.append(thread)
+
+  def stop(self) -> None:
+    for _ in self._threads:
+      self._queue.put(None)
+    for thread in self._threads:
+      thread.join()
+    self._threads = []
+
+  def _readable(self, path: str) -> bool:
+    resolved = Path(path).resolve()
+    return any(resolved == root or root in resolved.parents for root in self.log_roots)
+
+  def check_paths(self, request: AnalysisRequest) -> None:
+    """Raise ValueError for a log path that does not start below one of the log roots."""
+    for log in request.logs:
+      if log.path is None:
+        continue
+      if not self.log_roots:
+        raise ValueError("this server reads no log paths (start it with --log-root); send the log as text")
+      # For a glob, the fixed directory part must be inside a root; matches are checked again once expanded
+      static = log.path
+      if GLOB_CHARS & set(static):
+        static = os.path.dirname(static[:min(static.index(c) for c in GLOB_CHARS if c in static)]) or "."
+      if not self._readable(static):
+        raise ValueError(f"log path is outside the server's log roots: {log.path}")
+
+  def submit(self, request: AnalysisRequest) -> Job:
+    """Queue a job; raises ValueError for a log path outside the log roots and queue.Full at capacity."""
+    self.check_paths(request)
+    job = Job(request)
+    with self._jobs_lock:
+      self._queue.put_nowait(job)
+      self._jobs[job.id] = job
+      self._forget_finished()
+    return job
+
+  def _forget_finished(self) -> None:
+    excess = len(self._jobs) - self.max_jobs
+    for job_id in [j for j, job in self._jobs.items() if job.done.is_set()][:max(0, excess)]:
+      del self._jobs[job_id]
+
+  def get(self, job_id: str) -> Optional[Job]:
+    with self._jobs_lock:
+      return self._jobs.get(job_id)
+
+  def _memo(self) -> FingerprintMemo:
+    memo = getattr(self._local, "memo", None)
+    if memo is None:
+      memo = self._local.memo = FingerprintMemo(self.memo_capacity)
+      with self._jobs_lock:
+        self._memos.append(memo)
+    return memo
+
+  def _work(self) -> None:
+    while True:
+      job = self._queue.get()
+      if job is None:
+        return
+      job.status = "running"
+      job.started_at = time.time()
+      try:
+        job.result = self.analyze(job.request)
+        job.status = "done"
+        self.completed += 1
+      except Exception as e:
+        job.status = "failed"
+        job.error = f"{type(e).__name__}: {e}"
+        self.failed += 1
+      finally:
+        job.finished_at = time.time()
+        job.done.set()
+
+  def analyze(self, request: AnalysisRequest) -> Dict[str, Any]:
+    """Run parse -> cluster -> summarize for one request in the calling thread."""
+    table = ClusterTable(memo=self._memo(), sample_size=self.sample_size)
+    missing = []
+    for log in request.logs:
+      if log.text is not None:
+        table.update(parse_records(log.tool, log.text.splitlines()))
+        continue
+      paths = expand_log_paths(log.path)
+      if not paths:
+        missing.append(log.path)
+      # Symlinks and `..` after a glob can still lead out of the roots
+      escaped = [p for p in paths if not self._readable(p)]
+      if escaped:
+        raise PermissionError(f"log path is outside the server's log roots: {escaped[0]}")
+      ingest_ranges([(log.tool, p, 0, None) for p in paths], table=table)
+    if missing:
+      raise FileNotFoundError(f"no log files match: {', '.join(missing)}")
+    clusters = table.clusters()
+    if request.merge_similar > 0:
+      clusters = merge_similar_clusters(clusters, request.merge_similar)
+
+    summaries = {}
+    if request.summarize:
+      summaries = summarize_clusters(clusters, cache=self.cache, index=self.index, **self.summarize_kwargs)
+    return {
+      "clusters": [c.model_dump() for c in clusters],
+      "summaries": {cid: s.model_dump() for cid, s in summaries.items()},
+    }
+
+  def stats(self) -> Dict[str, Any]:
+    with self._jobs_lock:
+      memos = list(self._memos)
+    data: Dict[str, Any] = {
+      "workers": self.workers,
+      "queued": self._queue.qsize(),
+      "queue_capacity": self._queue.maxsize,
+      "completed": self.completed,
+      "failed": self.failed,
+      "memo": {
+        "hits": sum(m.hits for m in memos),
+        "misses": sum(m.misses for m in memos),
+        "entries": sum(len(m) for m in memos),
+      },
+    }
+    if self.cache is not None:
+      data["summary_cache"] = self.cache.stats()
+    if self.index is not None:
+      data["semantic_index"] = self.index.stats()
+    return data
+
+def _wait_seconds(params: Dict[str, List[str]], name: str, default: float) -> float:
+  try:
+    return min(MAX_WAIT_SECONDS, max(0.0, float(params.get(name, [default])[0])))
+  except ValueError:
+    return default
+
+def make_handler(service: AnalysisService) -> type:
+  class AnalysisHandler(http_server.BaseHTTPRequestHandler):
+    """
+      GET  /health            service and cache statistics
+      POST /jobs              queue an analysis: 202 with the job id, 429 when the queue is full
+      GET  /jobs/<id>?wait=S  job status, and its clusters/summaries once done (optionally waiting S seconds)
+      POST /analyze?timeout=S queue and wait: 200 with the result, or 202 with the job id on timeout
+      A JSON body is an AnalysisRequest; a text/plain body is one log, with its tool given as ?tool=.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def address_string(self) -> str:
+      # Unix-socket peers have no address
+      return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def _send(self, status: int, payload: Dict[str, Any]) -> None:
+      body = json.dumps(payload).encode()
+      self.send_response(status)
+      self.send_header("Content-Type", "application/json")
+      self.send_header("Content-Length", str(len(body)))
+      self.end_headers()
+      self.wfile.write(body)
+
+    def _request(self, params: Dict[str, List[str]]) -> AnalysisRequest:
+      body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+      if self.headers.get("Content-Type", "").startswith("text/plain"):
+        tool = params.get("tool", [""])[0]
+        summarize = params.get("summarize", ["1"])[0] not in ("0", "false")
+        return AnalysisRequest(logs=[LogSource(tool=tool, text=body.decode("utf-8", errors="ignore"))], summarize=summarize)
+      return AnalysisRequest.model_validate_json(body)
+
+    def _submit(self, params: Dict[str, List[str]]) -> Optional[Job]:
+      try:
+        job = service.submit(self._request(params))
+      except (ValidationError, ValueError) as e:
+        self._send(400, {"error": str(e)})
+        return None
+      except queue.Full:
+        self._send(429, {"error": "job queue is full; retry later"})
+        return None
+      return job
+
+    def do_GET(self) -> None:
+      url = urlsplit(self.path)
+      params = parse_qs(url.query)
+      if url.path == "/health":
+        self._send(200, {"status": "ok", **service.stats()})
+        return
+      if url.path.startswith("/jobs/"):
+        job = service.get(url.path[len("/jobs/"):])
+        if job is None:
+          self._send(404, {"error": "unknown job"})
+          return
+        job.done.wait(_wait_seconds(params, "wait", 0.0))
+        self._send(200, job.to_dict())
+        return
+      self._send(404, {"error": f"no route for GET {url.path}"})
+
+    def do_POST(self) -> None:
+      url = urlsplit(self.path)
+      params = parse_qs(url.query)
+      if url.path not in ("/jobs", "/analyze"):
+        self._send(404, {"error": f"no route for POST {url.path}"})
+        return
+      job = self._submit(params)
+      if job is None:
+        return
+      if url.path == "/analyze" and job.done.wait(_wait_seconds(params, "timeout", MAX_WAIT_SECONDS)):
+        self._send(200, job.to_dict())
+        return
+      self._send(202, job.to_dict(include_result=False))
+
+  return AnalysisHandler
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+  daemon_threads = True
+
+def make_server(
+  service: AnalysisService,
+  host: str = "127.0.0.1",
+  port: int = DEFAULT_PORT,
+  socket_path: Optional[str] = None,
+) -> socketserver.BaseServer:
+  """An HTTP server for `service` on host:port, or on a Unix socket when socket_path is given."""
+  handler = make_handler(service)
+  if socket_path:
+    try:
+      mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+      pass
+    else:
+      # A stale socket from a previous run is replaced; anything else at that path is not ours to delete
+      if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{socket_path} exists and is not a Unix socket; refusing to replace it")
+      os.unlink(socket_path)
+    return UnixHTTPServer(socket_path, handler)
+  server = http_server.ThreadingHTTPServer((host, port), handler)
+  server.daemon_threads = True
+  return server
@@ -0,0 +1,166 @@
+import re
+import zlib
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+
+from .lazy import lazy_import
+from .schema import Cluster
+
+np = lazy_import("numpy")
+
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 2
+_MERSENNE_PRIME = (1 << 61) - 1
+# Shingle hashes processed per step when computing signatures, bounding the (num_perm x shingles) matrix
+_SIGNATURE_BLOCK = 1 << 16
+
+TOKEN_PATTERN = re.compile(r"<\w+>|\w+")
+
+def shingles(key: str, size: int = DEFAULT_SHINGLE_SIZE) -> FrozenSet[str]:
+  """Word n-grams of a cluster key; placeholders like <NUM> count as words, punctuation and case do not."""
+  tokens = TOKEN_PATTERN.findall(key.lower())
+  if len(tokens) <= size:
+    return frozenset([" ".join(tokens)])
+  return frozenset(" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1))
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+  if not a and not b:
+    return 1.0
+  return len(a & b) / len(a | b)
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+  """(bands, rows) with bands * rows <= num_perm whose S-curve midpoint (1/bands)^(1/rows) is closest to threshold."""
+  best = (1, num_perm)
+  best_err = float("inf")
+  for rows in range(1, num_perm + 1):
+    bands = num_perm // rows
+    err = abs((1 / bands) ** (1 / rows) - threshold)
+    if err < best_err:
+      best, best_err = (bands, rows), err
+  return best
+
+class MinHasher:
+  """MinHash signatures over shingle sets, computed for many sets at once with numpy."""
+
+  def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    self.num_perm = num_perm
+    # Shingle hashes are 32-bit, so a * h + b stays below 2**64 before the modulo
+    self._a = rng.integers(1, 1 << 32, size=(num_perm, 1), dtype=np.uint64)
+    self._b = rng.integers(0, 1 << 32, size=(num_perm, 1), dtype=np.uint64)
+
+  def signatures(self, sets: Sequence[FrozenSet[str]]) -> "np.ndarray":
+    """One row of num_perm minimum hashes per set."""
+    sigs = np.empty((len(sets), self.num_perm), dtype=np.uint64)
+    owners: List[int] = []
+    hashes: List[int] = []
+    start = 0
+    for i, s in enumerate(sets):
+      owners.extend([i] * len(s))
+      hashes.extend(zlib.crc32(sh.encode()) for sh in s)
+      if len(hashes) >= _SIGNATURE_BLOCK or i == len(sets) - 1:
+        self._fill(sigs, np.asarray(owners, dtype=np.int64), np.asarray(hashes, dtype=np.uint64), start)
+        owners, hashes, start = [], [], i + 1
+    return sigs
+
+  def _fill(self, sigs: "np.ndarray", owners: "np.ndarray", hashes: "np.ndarray", start: int) -> None:
+    if not len(hashes):
+      return
+    permuted = (self._a * hashes + self._b) % np.uint64(_MERSENNE_PRIME)
+    # owners is sorted, so each set's shingles are one contiguous segment of the permuted columns
+    starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+    sigs[owners[starts]] = np.minimum.reduceat(permuted, starts, axis=1).T
+
+def similar_groups(
+  keys: Sequence[str],
+  threshold: float,
+  num_perm: int = DEFAULT_NUM_PERM,
+  shingle_size: int = DEFAULT_SHINGLE_SIZE,
+) -> List[int]:
+  """
+    For each key, the index of the earliest key it is folded into (itself if none). Candidates come from
+    MinHash LSH banding, so the work is roughly linear in the number of keys; each candidate is then checked
+    against the exact shingle Jaccard similarity, and accepted pairs are joined transitively.
+  """
+  n = len(keys)
+  parent = list(range(n))
+
+  def find(i: int) -> int:
+    while parent[i] != i:
+      parent[i] = parent[parent[i]]
+      i = parent[i]
+    return i
+
+  if n < 2:
+    return parent
+  sets = [shingles(k, shingle_size) for k in keys]
+  sigs = MinHasher(num_perm).signatures(sets)
+  bands, rows = lsh_params(threshold, num_perm)
+  checked = set()
+  for band in range(bands):
+    block = np.ascontiguousarray(sigs[:, band * rows:(band + 1) * rows])
+    _, bucket = np.unique(block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel(), return_inverse=True)
+    order = np.argsort(bucket, kind="stable")
+    sorted_buckets = bucket[order]
+    starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    ends = np.r_[starts[1:], n]
+    for s, e in zip(starts.tolist(), ends.tolist()):
+      if e - s < 2:
+        continue
+      # Compare bucket members to the bucket's earliest key only, which keeps large buckets linear
+      head = int(order[s])
+      for j in order[s + 1:e].tolist():
+        pair = (head, j)
+        if pair in checked:
+          continue
+        checked.add(pair)
+        if jaccard(sets[head], sets[j]) >= threshold:
+          a, b = find(head), find(j)
+          if a != b:
+            parent[max(a, b)] = min(a, b)
+  return [find(i) for i in range(n)]
+
+def _fold(group: List[Cluster], sample_size: int) -> Cluster:
+  head = group[0]
+  if len(group) == 1:
+    return head
+  level_counts: Dict[str, int] = {}
+  tool_counts: Dict[str, int] = {}
+  for c in group:
+    for level, n in c.level_counter().items():
+      level_counts[level] = level_counts.get(level, 0) + n
+    for tool, n in c.tool_counter().items():
+      tool_counts[tool] = tool_counts.get(tool, 0) + n
+  firsts = [c.first_seen for c in group if c.first_seen is not None]
+  lasts = [c.last_seen for c in group if c.last_seen is not None]
+  items = [item for c in group for item in c.items][:sample_size]
+  return head.model_copy(update={
+    "count": sum(c.count for c in group),
+    "items": items,
+    "level_counts": level_counts,
+    "tool_counts": tool_counts,
+    "first_seen": min(firsts) if firsts else None,
+    "last_seen": max(lasts) if lasts else None,
+    # Which files overlap is no longer known here, so the largest single count is a lower bound
+    "file_count": max(c.file_count for c in group),
+    "merged_keys": head.merged_keys + [k for c in group[1:] for k in [c.key] + c.merged_keys],
+  })
+
+def merge_similar_clusters(
+  clusters: Sequence[Cluster],
+  threshold: float,
+  num_perm: int = DEFAULT_NUM_PERM,
+  shingle_size: int = DEFAULT_SHINGLE_SIZE,
+) -> List[Cluster]:
+  """
+    Second-stage merge of near-duplicate clusters, e.g. the same warning worded slightly differently by two
+    tool versions. Each group is folded into its earliest cluster, which keeps its id, key and fingerprint;
+    the other keys are listed in merged_keys and the exact counters are summed.
+  """
+  if threshold <= 0 or len(clusters) < 2:
+    return list(clusters)
+  roots = similar_groups([c.key for c in clusters], threshold, num_perm, shingle_size)
+  groups: Dict[int, List[Cluster]] = {}
+  for cluster, root in zip(clusters, roots):
+    groups.setdefault(root, []).append(cluster)
+  sample_size = max(len(c.items) for c in clusters)
+  return [_fold(group, sample_size) for group in groups.values()]
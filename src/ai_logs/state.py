@@ -0,0 +1,153 @@
+import json
+import mmap
+import os
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from pydantic import BaseModel
+from .ingest import LogJob, RangeJob
+from .normalize import ClusterTable, FingerprintMemo, DEFAULT_SAMPLE_SIZE
+from .schema import Cluster, Summary
+
+STATE_VERSION = 1
+# Bytes at the start of each log that are checksummed to detect a file rewritten in place
+HEAD_BYTES = 4096
+# A cluster is re-summarized once its count has grown by this factor since its last summary
+MATERIAL_GROWTH = 2.0
+
+class FileCursor(BaseModel):
+  tool: str
+  path: str
+  offset: int           # byte offset just past the last complete line consumed
+  inode: int
+  size: int
+  head_len: int
+  head_crc: int
+
+class SummaryRecord(BaseModel):
+  summary: Summary
+  count: int            # cluster count when the summary was generated
+  levels: List[str]     # severity levels present when the summary was generated
+
+def _head_crc(path: str, length: int) -> int:
+  with open(path, "rb") as fh:
+    return zlib.crc32(fh.read(length))
+
+def _complete_end(path: str, start: int, size: int) -> int:
+  # A writer may be mid-line; only consume up to the last newline and pick the rest up next run
+  if size <= start:
+    return start
+  with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+    nl = mm.rfind(b"\n", start, size)
+  return start if nl < 0 else nl + 1
+
+class AnalysisState:
+  """
+    Cluster table, per-file read cursors and past summaries persisted between runs, so each run only parses
+    bytes appended since the previous one and only re-summarizes new or materially changed clusters.
+  """
+
+  def __init__(
+    self,
+    table: ClusterTable,
+    cursors: Optional[Dict[str, FileCursor]] = None,
+    summaries: Optional[Dict[str, SummaryRecord]] = None,
+  ):
+    self.table = table
+    self.cursors = cursors or {}
+    self.summaries = summaries or {}
+
+  @classmethod
+  def fresh(cls, memo: Optional[FingerprintMemo] = None, sample_size: int = DEFAULT_SAMPLE_SIZE) -> "AnalysisState":
+    return cls(ClusterTable(memo=memo, sample_size=sample_size))
+
+  @classmethod
+  def load(cls, path: Path, memo: Optional[FingerprintMemo] = None, sample_size: int = DEFAULT_SAMPLE_SIZE) -> "AnalysisState":
+    path = Path(path)
+    if not path.exists():
+      return cls.fresh(memo, sample_size)
+    try:
+      data = json.loads(path.read_text(encoding="utf-8"))
+      if data.get("version") != STATE_VERSION:
+        raise ValueError(f"unsupported state version {data.get('version')}")
+      return cls(
+        ClusterTable.from_dict(data["table"], memo=memo),
+        {p: FileCursor.model_validate(c) for p, c in data["cursors"].items()},
+        {fp: SummaryRecord.model_validate(s) for fp, s in data["summaries"].items()},
+      )
+    except (ValueError, KeyError, TypeError) as e:
+      print(f"Ignoring unreadable analysis state {path}: {e}")
+      return cls.fresh(memo, sample_size)
+
+  def save(self, path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+      "version": STATE_VERSION,
+      "table": self.table.to_dict(),
+      "cursors": {p: c.model_dump() for p, c in self.cursors.items()},
+      "summaries": {fp: s.model_dump() for fp, s in self.summaries.items()},
+    }
+    # Write-then-rename so an interrupted run never leaves a truncated state file behind
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, path)
+
+  def plan(self, jobs: Sequence[LogJob]) -> Optional[Tuple[List[RangeJob], Dict[str, FileCursor]]]:
+    """
+      Byte ranges appended since the last run plus the cursors to commit once they are ingested, or None when
+      a tracked file was rotated, truncated, rewritten, deleted or dropped from the jobs and its earlier
+      contribution can no longer be trusted.
+    """
+    # Restored clusters keep sample records pointing into every tracked file, so each one must still be there
+    paths = {path for _, path in jobs}
+    if any(path not in paths or not os.path.isfile(path) for path in self.cursors):
+      return None
+    ranges: List[RangeJob] = []
+    cursors: Dict[str, FileCursor] = {}
+    for tool, path in jobs:
+      st = os.stat(path)
+      prev = self.cursors.get(path)
+      if prev is not None and (
+        prev.tool != tool
+        or prev.inode != st.st_ino
+        or st.st_size < prev.offset
+        or _head_crc(path, prev.head_len) != prev.head_crc
+      ):
+        return None
+      start = prev.offset if prev is not None else 0
+      end = _complete_end(path, start, st.st_size)
+      head_len = min(HEAD_BYTES, end)
+      cursors[path] = FileCursor(
+        tool=tool,
+        path=path,
+        offset=end,
+        inode=st.st_ino,
+        size=st.st_size,
+        head_len=head_len,
+        head_crc=_head_crc(path, head_len),
+      )
+      if end > start:
+        ranges.append((tool, path, start, end))
+    return ranges, cursors
+
+  def reusable_summary(self, cluster: Cluster) -> Optional[Summary]:
+    rec = self.summaries.get(cluster.fingerprint)
+    if rec is None:
+      return None
+    if cluster.count >= rec.count * MATERIAL_GROWTH:
+      return None
+    # A cluster that picked up a new severity (e.g. warnings that now also error) is worth a fresh look
+    if set(cluster.level_counter()) - set(rec.levels):
+      return None
+    return rec.summary.model_copy(update={"cluster_id": int(cluster.id.split('_')[1])})
+
+  def record_summaries(self, clusters: Sequence[Cluster], summaries: Dict[str, Summary]) -> None:
+    for cluster in clusters:
+      summary = summaries.get(cluster.id)
+      if summary is not None and cluster.fingerprint:
+        self.summaries[cluster.fingerprint] = SummaryRecord(
+          summary=summary,
+          count=cluster.count,
+          levels=list(cluster.level_counter()),
+        )
@@ -1,17 +1,26 @@
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Dict, Optional, Set
+from .cache import SummaryCache
+from .metrics import PipelineMetrics
+from .providers import GeminiProvider, SummaryProvider
+from .ratelimit import TokenBucket
+from .schedule import SummaryBudget, prioritize
+from .semantic import SemanticIndex
 from .schema import Cluster, Summary
-from .gemini_ai import generate_summary_with_gemini, create_fallback_summary
+from .gemini_ai import create_fallback_summary, pack_batches
+
+DEFAULT_MAX_CONCURRENCY = 8
 
 def has_no_key_heuristic(cluster: Cluster) -> bool:
   has_error_or_warnings = False
   has_placeholders = False
 
-  for item in cluster.items:
-    if item.level in ['error', 'warning']:
+  for level in cluster.level_counter():
+    if level in ['error', 'warning']:
       has_error_or_warnings = True
       break
   
-  for placeholder in ['<NUM>', '<SIG>', '<ID>']:
+  for placeholder in ['<NUM>', '<SIG>', '<ID>', '<*>']:
     if placeholder in cluster.key:
       has_placeholders = True
       break
@@ -21,18 +30,156 @@ def has_no_key_heuristic(cluster: Cluster) -> bool:
   
   return has_error_or_warnings and (has_placeholders or is_recurring)
 
-def summarize_clusters(clusters: List[Cluster]) -> Dict[str, Summary]:
+def _token_note(tokens: int) -> str:
+  # Providers that build no prompt report 0 tokens
+  return f" (~{tokens} prompt tokens)" if tokens else ""
+
+def summarize_clusters(
+  clusters: List[Cluster],
+  cache: Optional[SummaryCache] = None,
+  client: Any = None,
+  max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+  rate_limiter: Optional[TokenBucket] = None,
+  batch_token_budget: int = 0,
+  index: Optional[SemanticIndex] = None,
+  metrics: Optional[PipelineMetrics] = None,
+  provider: Optional[SummaryProvider] = None,
+  knowledge: Optional[SummaryProvider] = None,
+  max_calls: int = 0,
+  max_tokens: int = 0,
+  deadline_seconds: float = 0.0,
+  fallbacks: Optional[Set[str]] = None,
+) -> Dict[str, Summary]:
+  """
+    Summaries for the clusters worth explaining. Each is answered by the first of: `knowledge` (a local
+    provider such as the known-message table, consulted inline), the summary cache, the semantic index, and
+    finally `provider` (Gemini through `client` by default). Provider requests go out most important first
+    (see schedule.py); under a call/token budget or deadline, clusters it does not reach get a fallback summary,
+    and their ids are added to `fallbacks` so callers that persist summaries can leave them out.
+  """
   summaries = {}
+  provider = provider if provider is not None else GeminiProvider(client)
+  budget = SummaryBudget(max_calls, max_tokens, deadline_seconds)
+
+  def submit(pool: ThreadPoolExecutor, fn, *args):
+    # With metrics, split each request into time queued behind the concurrency limit and time in the call
+    if metrics is not None:
+      fn = metrics.queued_task(fn, "summarize_queue_wait", "summarize_llm")
+    return pool.submit(fn, *args)
+
+  pending: List[Cluster] = []
 
   for cluster in clusters:
     if has_no_key_heuristic(cluster):
-      print(f"Generating summary for cluster {cluster.id}...")
-      print(list(summaries.keys()))
-      summary = generate_summary_with_gemini(cluster)
+      if knowledge is not None:
+        known = knowledge.summarize(cluster)
+        if known is not None:
+          summaries[cluster.id] = known
+          continue
+      if cache is not None and cluster.fingerprint:
+        cached = cache.get(cluster.fingerprint)
+        if cached:
+          # Cached summaries come from earlier runs, so re-point them at this run's cluster id
+          summaries[cluster.id] = cached.model_copy(update={"cluster_id": int(cluster.id.split('_')[1])})
+          continue
+      pending.append(cluster)
+
+  if index is not None and pending:
+    # Clusters worded differently from one already summarized reuse its summary; one batched query for all
+    misses = []
+    for cluster, match in zip(pending, index.lookup([c.key for c in pending])):
+      if match is None:
+        misses.append(cluster)
+        continue
+      summary, matched_key, score = match
+      print(f"Reusing summary of similar cluster for {cluster.id} (similarity {score:.2f}): {matched_key}")
+      summaries[cluster.id] = summary.model_copy(update={"cluster_id": int(cluster.id.split('_')[1])})
+    pending = misses
+
+  if not pending:
+    return summaries
+
+  if not provider.remote:
+    # Local answers take microseconds and are deterministic, so they skip the pool and are not cached
+    for cluster in pending:
+      summary = provider.summarize(cluster)
       if summary:
         summaries[cluster.id] = summary
-      else:
-        print(f"Failed to generate summary for cluster {cluster.id}")
+    return summaries
+
+  # The pool runs requests in submission order, so errors, then the widest-reaching clusters, go out first
+  novelty: Dict[str, float] = {}
+  if index is not None:
+    for cluster, (_, score) in zip(pending, index.nearest([c.key for c in pending])):
+      novelty[cluster.id] = 1.0 - score
+  queue = prioritize(pending, novelty)
+  skipped: List[str] = []
+
+  def request(cluster: Cluster, tokens: int) -> Optional[Summary]:
+    # Budget is checked as each request starts, so a deadline also stops requests still queued behind the pool
+    if not budget.try_spend(tokens):
+      skipped.append(cluster.id)
+      return None
+    return provider.summarize(cluster, rate_limiter)
+
+  def request_batch(batch: List[Cluster], tokens: int) -> Dict[str, Summary]:
+    if not budget.try_spend(tokens):
+      return {}
+    return provider.summarize_batch(batch, rate_limiter)
+
+  # LLM calls are I/O bound, so a thread pool lets them overlap; results are still collected in cluster order
+  workers = max(1, min(max_concurrency, len(pending)))
+  with ThreadPoolExecutor(max_workers=workers) as pool:
+    generated: Dict[str, Summary] = {}
+    retry = queue
+
+    if batch_token_budget > 0:
+      batch_futures = []
+      for batch in pack_batches(queue, batch_token_budget, provider.sample_tokens):
+        tokens = provider.prompt_tokens(batch)
+        print(f"Generating batched summary for {len(batch)} cluster(s): {', '.join(c.id for c in batch)}{_token_note(tokens)}...")
+        batch_futures.append(submit(pool, request_batch, batch, tokens))
+      for future in batch_futures:
+        generated.update(future.result())
+      # Clusters the model dropped from a batch degrade to one request each; once the budget refused a batch,
+      # those requests are refused too and the clusters get fallback summaries
+      retry = [c for c in queue if c.id not in generated]
+
+    futures = []
+    for cluster in retry:
+      tokens = provider.prompt_tokens([cluster])
+      print(f"Generating summary for cluster {cluster.id}{_token_note(tokens)}...")
+      futures.append((cluster, submit(pool, request, cluster, tokens)))
+    for cluster, future in futures:
+      summary = future.result()
+      if summary:
+        generated[cluster.id] = summary
+
+  left_over = set(skipped)
+  for cluster in pending:
+    summary = generated.get(cluster.id)
+    if summary:
+      summaries[cluster.id] = summary
+      if cache is not None and cluster.fingerprint:
+        cache.put(cluster.fingerprint, summary)
+      if index is not None:
+        index.add(cluster.key, summary)
+    elif cluster.id in left_over:
+      # Not cached or indexed: the next run with budget to spare should ask the LLM
+      summaries[cluster.id] = create_fallback_summary(cluster)
+      if fallbacks is not None:
+        fallbacks.add(cluster.id)
+    else:
+      print(f"Failed to generate summary for cluster {cluster.id}")
+
+  stats = {**budget.stats(), "fallbacks": len(left_over)}
+  if stats["calls"]:
+    stats["tokens_per_prompt"] = round(stats["tokens"] / stats["calls"])
+    print(f"LLM prompts: {stats['calls']} calls | ~{stats['tokens']} prompt tokens (~{stats['tokens_per_prompt']} per prompt)")
+  if budget.limited:
+    print(f"LLM budget: {len(left_over)} cluster(s) left to fallback summaries")
+  if metrics is not None:
+    metrics.counters["llm_prompts"] = stats
 
   return summaries
 
@@ -0,0 +1,84 @@
+"""Fingerprint throughput: original per-word regex implementation vs normalize.fingerprint.
+
+  python src/benchmarks/bench_fingerprint.py --lines 1000000
+"""
+import argparse
+import hashlib
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from ai_logs.normalize import NUM_PATTERN, IDENTIFIER_PATTERN, QUOTED_STRING_PATTERN, fingerprint
+
+TEMPLATES = [
+  "signal '{sig}' is not connected to any module ports.",
+  "Truncating {n}-bit constant to 16 bits for signal '{sig}'.",
+  "Undefined variable '{sig}' in module '{mod}'.",
+  "port mismatch: instance 'u{n}' expects {n} ports, but {m} given.",
+  "multiple drivers detected for net '{sig}'.",
+  "Width mismatch in assignment to signal {mod}.{sig}[{n}].",
+  "Parser error in line {n}: syntax error, unexpected {tok}.",
+  "Module '\\{mod}' referenced in design but not found.",
+]
+TOKENS = ["END", "ENDMODULE", "BEGIN", "';'", "IDENTIFIER"]
+
+def legacy_fingerprint(msg: str) -> str:
+  # Frozen copy of the original implementation, used as the baseline
+  template = NUM_PATTERN.sub('<NUM>', msg)
+  template = QUOTED_STRING_PATTERN.sub("'<SIG>'", template)
+  keywords = {'signal', 'port', 'module', 'net', 'driver', 'assignment', 'reference', 'instance', 'variable'}
+  normalized_words = []
+  for word in template.split():
+    clean_word = re.sub(r'[^\w]', '', word)
+    if clean_word and clean_word not in keywords and IDENTIFIER_PATTERN.match(clean_word):
+      normalized_words.append(re.sub(r'\b' + re.escape(clean_word) + r'\b', '<ID>', word))
+    else:
+      normalized_words.append(word)
+  return hashlib.md5(' '.join(normalized_words).encode()).hexdigest()
+
+def synthetic_messages(n: int, seed: int = 0) -> list[str]:
+  rng = random.Random(seed)
+  return [
+    rng.choice(TEMPLATES).format(
+      sig=f"sig_{rng.randrange(5000)}",
+      mod=f"mod{rng.randrange(200)}",
+      n=rng.randrange(4096),
+      m=rng.randrange(8),
+      tok=rng.choice(TOKENS),
+    )
+    for _ in range(n)
+  ]
+
+def _throughput(fn, messages: list[str]) -> float:
+  start = time.perf_counter()
+  for msg in messages:
+    fn(msg)
+  return len(messages) / (time.perf_counter() - start)
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--lines", type=int, default=1_000_000)
+  parser.add_argument("--seed", type=int, default=0)
+  args = parser.parse_args()
+
+  messages = synthetic_messages(args.lines, args.seed)
+
+  mismatches = sum(1 for msg in messages[:100_000] if legacy_fingerprint(msg) != fingerprint(msg))
+  if mismatches:
+    raise SystemExit(f"{mismatches} fingerprint mismatches against the legacy implementation")
+
+  legacy = _throughput(legacy_fingerprint, messages)
+  current = _throughput(fingerprint, messages)
+  print(f"lines: {args.lines:,}")
+  print(f"legacy fingerprint:  {legacy:>12,.0f} lines/s")
+  print(f"current fingerprint: {current:>12,.0f} lines/s")
+  print(f"speedup:             {current / legacy:>12.2f}x")
+
+if __name__ == "__main__":
+  main()
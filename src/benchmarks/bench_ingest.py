@@ -0,0 +1,56 @@
+"""Multi-file (or chunked single-file) ingestion throughput for 1..N worker processes.
+
+  python src/benchmarks/bench_ingest.py --files 200 --lines-per-file 20000 --workers 1 2 4 8
+  python src/benchmarks/bench_ingest.py --single-file --files 200 --chunk-mb 8 --workers 1 2 4 8
+  python src/benchmarks/bench_ingest.py --single-file --files 50 --workers 1 --engines stream pandas
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from ai_logs.ingest import ingest_files
+from bench_fingerprint import synthetic_messages
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--files", type=int, default=64)
+  parser.add_argument("--lines-per-file", type=int, default=20_000)
+  parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+  parser.add_argument("--single-file", action="store_true", help="Write all lines to one file and split it into chunks")
+  parser.add_argument("--chunk-mb", type=int, default=8)
+  parser.add_argument("--engines", nargs="+", default=["stream"], choices=["stream", "pandas"])
+  args = parser.parse_args()
+
+  root = Path(tempfile.mkdtemp(prefix="bench_ingest_"))
+  try:
+    jobs = []
+    for i in range(args.files):
+      path = root / ("all.log" if args.single_file else f"tc_{i:04d}.log")
+      with path.open("a", encoding="utf-8") as fh:
+        for msg in synthetic_messages(args.lines_per_file, seed=i):
+          fh.write(f"iverilog: warning: {msg}\n")
+      if not jobs or not args.single_file:
+        jobs.append(("iverilog", str(path)))
+
+    total = args.files * args.lines_per_file
+    baseline = None
+    for engine in args.engines:
+      for workers in args.workers:
+        start = time.perf_counter()
+        table = ingest_files(jobs, workers=workers, chunk_bytes=args.chunk_mb << 20, engine=engine)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"engine={engine:<7} workers={workers:<3} {elapsed:7.2f}s  {total / elapsed:>12,.0f} lines/s  "
+              f"speedup {baseline / elapsed:5.2f}x  clusters={len(table)}")
+  finally:
+    shutil.rmtree(root)
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,59 @@
+"""Memory per parsed item: pydantic LogItem vs compact LogRecord.
+
+  python src/benchmarks/bench_items.py --lines 1000000
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from ai_logs.parse import parse_lines, parse_records, read_lines_with_offsets
+from bench_fingerprint import synthetic_messages
+
+def _retained_bytes(build) -> int:
+  gc.collect()
+  tracemalloc.start()
+  items = build()
+  current, _ = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  del items
+  return current
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--lines", type=int, default=1_000_000)
+  args = parser.parse_args()
+
+  fd, path = tempfile.mkstemp(suffix=".log")
+  try:
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+      for i, msg in enumerate(synthetic_messages(args.lines)):
+        fh.write(f"iverilog: {'error' if i % 3 == 0 else 'warning'}: {msg}\n")
+
+    def pydantic_items():
+      with open(path, encoding="utf-8") as fh:
+        return list(parse_lines("iverilog", fh))
+
+    def compact_records():
+      return list(parse_records("iverilog", read_lines_with_offsets(path), source=path))
+
+    before = _retained_bytes(pydantic_items)
+    after = _retained_bytes(compact_records)
+  finally:
+    os.remove(path)
+
+  scale = 1_000_000 / args.lines
+  print(f"lines: {args.lines:,}")
+  print(f"LogItem (pydantic):  {before * scale / 2**20:>8.1f} MiB per million items")
+  print(f"LogRecord (compact): {after * scale / 2**20:>8.1f} MiB per million items")
+  print(f"reduction:           {before / after:>8.2f}x")
+
+if __name__ == "__main__":
+  main()
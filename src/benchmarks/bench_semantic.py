@@ -0,0 +1,75 @@
+"""Semantic summary index: load time, single and batched query latency, and reuse rate for reworded keys.
+
+  python src/benchmarks/bench_semantic.py --entries 10000 --queries 200 --threshold 0.85
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from ai_logs.schema import Summary
+from ai_logs.semantic import SemanticIndex
+from bench_similarity import synthetic_keys
+
+def _ms(samples: list[float]) -> str:
+  return f"median {statistics.median(samples) * 1e3:.2f} ms, max {max(samples) * 1e3:.2f} ms"
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--entries", type=int, default=10_000)
+  parser.add_argument("--queries", type=int, default=200)
+  parser.add_argument("--variants", type=int, default=2, help="Templates per family: one is indexed, the others are queried")
+  parser.add_argument("--threshold", type=float, default=0.85)
+  parser.add_argument("--repeat", type=int, default=5)
+  args = parser.parse_args()
+
+  keys = synthetic_keys(args.entries * args.variants, args.variants)
+  indexed, reworded = keys[::args.variants], [k for i, k in enumerate(keys) if i % args.variants][:args.queries]
+
+  index = SemanticIndex("bench-model", "1", threshold=args.threshold, max_entries=len(indexed))
+  start = time.perf_counter()
+  for i, key in enumerate(indexed):
+    index.add(key, Summary(cluster_id=i, explanation=f"explanation {i}", suggested_fixes=["fix"]))
+  build = time.perf_counter() - start
+
+  with tempfile.TemporaryDirectory() as tmp:
+    path = Path(tmp) / "index.npz"
+    index.save(path)
+    size = path.stat().st_size
+    loads = []
+    for _ in range(args.repeat):
+      start = time.perf_counter()
+      index = SemanticIndex.load(path, "bench-model", "1", threshold=args.threshold)
+      loads.append(time.perf_counter() - start)
+
+  # The first query pays for the TF-IDF weighting; later ones are one matrix-vector product
+  start = time.perf_counter()
+  index.nearest(reworded[:1])
+  first = time.perf_counter() - start
+  singles = []
+  for key in reworded:
+    start = time.perf_counter()
+    index.nearest([key])
+    singles.append(time.perf_counter() - start)
+  batches = []
+  for _ in range(args.repeat):
+    start = time.perf_counter()
+    matches = index.lookup(reworded)
+    batches.append(time.perf_counter() - start)
+
+  reused = sum(m is not None for m in matches)
+  print(f"entries={len(index):,}  file={size / 1e6:.1f} MB  build {build:.2f}s")
+  print(f"load: {_ms(loads)}")
+  print(f"first query (weights index): {first * 1e3:.2f} ms")
+  print(f"single query: {_ms(singles)}")
+  print(f"batch of {len(reworded)} queries: {_ms(batches)}")
+  print(f"reworded keys reusing a summary at threshold {args.threshold}: {reused}/{len(reworded)}")
+
+if __name__ == "__main__":
+  main()
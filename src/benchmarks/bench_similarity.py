@@ -0,0 +1,67 @@
+"""Near-duplicate cluster merging: cluster count and MinHash/LSH merge time over many distinct templates.
+
+  python src/benchmarks/bench_similarity.py --templates 100000 --threshold 0.7
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from ai_logs.schema import Cluster
+from ai_logs.similarity import merge_similar_clusters
+
+WORDS = (
+  "signal port module net driver wire reg instance parameter width mismatch truncated implicit declaration "
+  "unused undriven constant assignment latch inferred memory block always sensitivity list missing default "
+  "case statement timescale directive ignored defined previously redeclared illegal reference hierarchical "
+  "name scope cannot resolve found expected given bits value range index out of bounds"
+).split()
+SYNONYMS = {"missing": "absent", "unused": "unreferenced", "cannot": "can't", "found": "located", "given": "supplied"}
+
+def synthetic_keys(n: int, variants: int, seed: int = 0) -> list[str]:
+  """n distinct keys in n / variants families; members of a family differ by a word edit or a name."""
+  rng = random.Random(seed)
+  keys = set()
+  while len(keys) < n:
+    base = [rng.choice(WORDS) for _ in range(rng.randrange(8, 15))]
+    for v in range(variants):
+      words = list(base)
+      edit = rng.random()
+      if edit < 0.3:
+        i = rng.randrange(len(words))
+        words[i] = SYNONYMS.get(words[i], words[i] + "s")
+      elif edit < 0.5:
+        del words[rng.randrange(len(words))]
+      words.append(f"'<SIG>' in u_{v}")
+      keys.add(" ".join(words))
+  return sorted(keys)[:n]
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--templates", type=int, default=100_000)
+  parser.add_argument("--variants", type=int, default=20, help="Distinct templates per near-duplicate family")
+  parser.add_argument("--threshold", type=float, default=0.7)
+  parser.add_argument("--num-perm", type=int, default=128)
+  args = parser.parse_args()
+
+  keys = synthetic_keys(args.templates, args.variants)
+  clusters = [
+    Cluster(id=f"cluster_{i}", key=k, count=1, items=[], level_counts={"warning": 1}, tool_counts={"iverilog": 1})
+    for i, k in enumerate(keys)
+  ]
+
+  start = time.perf_counter()
+  merged = merge_similar_clusters(clusters, args.threshold, num_perm=args.num_perm)
+  elapsed = time.perf_counter() - start
+  print(f"templates={len(clusters):,}  families~{len(clusters) // args.variants:,}  "
+        f"clusters after merge={len(merged):,}  ({len(clusters) / max(1, len(merged)):.1f}x fewer)  "
+        f"merge time {elapsed:.2f}s  threshold={args.threshold}")
+  assert sum(c.count for c in merged) == len(clusters)
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,113 @@
+"""CLI startup: wall time of fresh interpreters importing the CLI, printing --help and running on a tiny log.
+
+  python src/benchmarks/bench_startup.py --repeat 20
+  python src/benchmarks/bench_startup.py --lines 200 --top 15
+  python src/benchmarks/bench_startup.py --repeat 3 --budget-ms 500
+
+CI starts the tool once per step, so a fixed per-process cost is paid thousands of times. Each sample is a new
+interpreter; the tiny run stubs the LLM summarizer, so it needs no API key. The import profile comes from
+`python -X importtime` and lists where the remaining startup time goes, grouped by top-level package. With
+--budget-ms the script exits non-zero when the best `-X importtime` of ai_logs.main over --repeat fresh
+interpreters exceeds the budget. That absolute check depends on the machine; the test suite only checks the
+overhead relative to importing typer and pydantic.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from loggen import write_log
+
+# Modules only some stages need; none of them should be imported just to start the CLI
+HEAVY_MODULES = ("numpy", "pandas", "pyarrow", "google.genai", "tenacity", "http.server")
+# Cumulative `-X importtime` of ai_logs.main; it was ~700 ms with eager imports
+DEFAULT_IMPORT_BUDGET_MS = 500
+
+_RUN_SCRIPT = """
+import sys
+from ai_logs import gemini_ai
+from ai_logs.main import app
+from ai_logs.schema import Summary
+gemini_ai.generate_summary_with_gemini = lambda c, *a: Summary(cluster_id=int(c.id.split('_')[1]), explanation="stub", suggested_fixes=["fix"])
+app(args=sys.argv[1:], standalone_mode=False)
+"""
+
+def _time_process(argv: List[str]) -> float:
+  start = time.perf_counter()
+  subprocess.run(argv, cwd=SRC_DIR, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+  return time.perf_counter() - start
+
+def import_profile(module: str = "ai_logs.main") -> Dict[str, float]:
+  """Self import time in ms per top-level package, plus the module's cumulative time under "total"."""
+  proc = subprocess.run(
+    [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+    cwd=SRC_DIR, check=True, capture_output=True, text=True,
+  )
+  profile: Dict[str, float] = {}
+  for line in proc.stderr.splitlines():
+    if not line.startswith("import time:") or "self [us]" in line:
+      continue
+    self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+    package = name.split(".")[0]
+    profile[package] = profile.get(package, 0.0) + int(self_us) / 1e3
+    if name == module:
+      profile["total"] = int(cumulative_us) / 1e3
+  return profile
+
+def _ms(samples: List[float]) -> str:
+  return f"min {min(samples) * 1e3:.0f} ms, median {statistics.median(samples) * 1e3:.0f} ms"
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--repeat", type=int, default=10)
+  parser.add_argument("--lines", type=int, default=100, help="Lines in the log of the tiny end-to-end run")
+  parser.add_argument("--top", type=int, default=10, help="Packages listed in the import profile")
+  parser.add_argument("--budget-ms", type=float, default=None, help=f"Fail when importing ai_logs.main takes longer (e.g. {DEFAULT_IMPORT_BUDGET_MS})")
+  args = parser.parse_args()
+
+  python = [sys.executable]
+  with tempfile.TemporaryDirectory() as tmp:
+    log = write_log(Path(tmp) / "iverilog.log", "iverilog", args.lines)
+    run_args = [
+      "run", "--iverilog-log", str(log), "--yosys-log", "",
+      "--out-json", str(Path(tmp) / "results.json"), "--out-md", str(Path(tmp) / "report.md"),
+    ]
+    commands = {
+      "python -c pass (floor)": python + ["-c", "pass"],
+      "import ai_logs.main": python + ["-c", "import ai_logs.main"],
+      "--help": python + ["-m", "ai_logs.main", "--help"],
+      f"run on {args.lines} lines": python + ["-c", _RUN_SCRIPT] + run_args,
+    }
+    for label, argv in commands.items():
+      _time_process(argv)  # warm the OS file cache and bytecode
+      samples = [_time_process(argv) for _ in range(args.repeat)]
+      print(f"{label}: {_ms(samples)}")
+
+  loaded = subprocess.run(
+    python + ["-c", f"import sys, ai_logs.main; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"],
+    cwd=SRC_DIR, check=True, capture_output=True, text=True,
+  ).stdout.split()
+  print(f"heavy modules imported at startup: {', '.join(loaded) or 'none'}")
+
+  profile = import_profile()
+  total = profile.pop("total")
+  print(f"import ai_logs.main: {total:.0f} ms (-X importtime)")
+  for package, ms in sorted(profile.items(), key=lambda kv: -kv[1])[:args.top]:
+    print(f"  {package:<24} {ms:7.1f} ms")
+
+  if args.budget_ms is not None:
+    best = min([total] + [import_profile()["total"] for _ in range(max(0, args.repeat - 1))])
+    print(f"import budget: best {best:.0f} ms of {args.budget_ms:.0f} ms")
+    if best > args.budget_ms:
+      sys.exit(1)
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,235 @@
+"""Benchmark suite over generated logs: parse_lines, fingerprint, cluster_logs, make_markdown and an end-to-end run.
+
+  python src/benchmarks/bench_suite.py --lines 1e3 1e5 1e6 --templates 500 --repeat 0.5
+  python src/benchmarks/bench_suite.py --tool yosys --lines 1e7 --log-dir /tmp/benchlogs --fail-on-regression
+
+Every benchmark runs in a fresh interpreter so its peak memory is its own. Each size appends one record to the
+JSON Lines history (default: history.jsonl next to this script) and is compared with the previous record for
+the same parameters, so throughput and memory regressions show up between commits. The end-to-end run stubs
+the LLM summarizer, so it needs no API key and measures only the pipeline.
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from loggen import write_log
+
+BENCHMARKS = ("parse_lines", "fingerprint", "cluster_logs", "make_markdown", "run")
+DEFAULT_HISTORY = Path(__file__).resolve().parent / "history.jsonl"
+# Messages handed to fingerprint() per timed slice; keeps memory flat at any log size
+FINGERPRINT_CHUNK = 100_000
+
+def _bench_parse_lines(tool: str, path: str, workdir: str) -> Tuple[float, int, Dict[str, Any]]:
+  from ai_logs.parse import parse_lines
+  with open(path, encoding="utf-8", errors="ignore") as fh:
+    start = time.perf_counter()
+    items = sum(1 for _ in parse_lines(tool, fh))
+  return time.perf_counter() - start, items, {}
+
+def _bench_fingerprint(tool: str, path: str, workdir: str) -> Tuple[float, int, Dict[str, Any]]:
+  from ai_logs.normalize import fingerprint
+  from ai_logs.parse import parse_records, read_lines_with_offsets
+  msgs = (r.msg for r in parse_records(tool, read_lines_with_offsets(path), source=path))
+  elapsed, items = 0.0, 0
+  # Parsing is untimed here: messages are buffered in slices and only fingerprinting is on the clock
+  while True:
+    chunk = list(islice(msgs, FINGERPRINT_CHUNK))
+    if not chunk:
+      break
+    start = time.perf_counter()
+    for msg in chunk:
+      fingerprint(msg)
+    elapsed += time.perf_counter() - start
+    items += len(chunk)
+  return elapsed, items, {}
+
+def _bench_cluster_logs(tool: str, path: str, workdir: str) -> Tuple[float, int, Dict[str, Any]]:
+  from ai_logs.normalize import cluster_logs
+  from ai_logs.parse import parse_records, read_lines_with_offsets
+  start = time.perf_counter()
+  clusters = cluster_logs(parse_records(tool, read_lines_with_offsets(path), source=path))
+  elapsed = time.perf_counter() - start
+  return elapsed, sum(c.count for c in clusters), {"clusters": len(clusters), "includes": "parse"}
+
+def _fake_summary(cluster):
+  from ai_logs.schema import Summary
+  return Summary(
+    cluster_id=int(cluster.id.split('_')[1]),
+    explanation=f"Synthetic explanation for {cluster.key[:60]}",
+    suggested_fixes=["Check the driver", "Re-run lint"],
+  )
+
+def _bench_make_markdown(tool: str, path: str, workdir: str) -> Tuple[float, int, Dict[str, Any]]:
+  from ai_logs.normalize import cluster_logs
+  from ai_logs.parse import parse_records, read_lines_with_offsets
+  from ai_logs.report import make_markdown
+  clusters = cluster_logs(parse_records(tool, read_lines_with_offsets(path), source=path))
+  summaries = {c.id: _fake_summary(c) for c in clusters}
+  start = time.perf_counter()
+  md = make_markdown(clusters, summaries, "https://example.com/feedback")
+  return time.perf_counter() - start, len(clusters), {"markdown_bytes": len(md.encode())}
+
+def _bench_run(tool: str, path: str, workdir: str) -> Tuple[float, int, Dict[str, Any]]:
+  from ai_logs import gemini_ai
+  from ai_logs.main import app
+
+  # No network: every cluster the heuristic selects gets an instant synthetic summary
+  gemini_ai.generate_summary_with_gemini = lambda cluster, *args: _fake_summary(cluster)
+  out = Path(workdir)
+  metrics = out / "metrics.json"
+  args = [
+    "run",
+    "--iverilog-log", path if tool == "iverilog" else "",
+    "--yosys-log", path if tool == "yosys" else "",
+    "--out-json", str(out / "results.json"),
+    "--out-md", str(out / "report.md"),
+    "--metrics", str(metrics),
+  ]
+  start = time.perf_counter()
+  app(args=args, standalone_mode=False)
+  elapsed = time.perf_counter() - start
+  data = json.loads(metrics.read_text())
+  stages = {name: stats["wall_seconds"] for name, stats in data["stages"].items()}
+  return elapsed, data["counters"]["items"], {"clusters": data["counters"]["clusters"], "stages": stages}
+
+def _child(name: str, tool: str, path: str, workdir: str, conn) -> None:
+  import io
+  from contextlib import redirect_stdout
+  from ai_logs.metrics import peak_rss_mb
+  baseline = peak_rss_mb()
+  with redirect_stdout(io.StringIO()):
+    seconds, items, extra = globals()[f"_bench_{name}"](tool, path, workdir)
+  peak = peak_rss_mb()
+  conn.send({
+    "seconds": round(seconds, 6),
+    "items": items,
+    "items_per_second": round(items / seconds, 1) if seconds else None,
+    "peak_rss_mb": peak and round(peak, 1),
+    "rss_growth_mb": peak and baseline and round(peak - baseline, 1),
+    **extra,
+  })
+  conn.close()
+
+def measure(name: str, tool: str, path: Path) -> Dict[str, Any]:
+  ctx = multiprocessing.get_context("spawn")
+  parent, child = ctx.Pipe(duplex=False)
+  with tempfile.TemporaryDirectory() as workdir:
+    proc = ctx.Process(target=_child, args=(name, tool, str(path), workdir, child))
+    proc.start()
+    child.close()
+    try:
+      result = parent.recv()
+    except EOFError:
+      result = None
+    proc.join()
+  if result is None:
+    raise SystemExit(f"benchmark {name} crashed (exit code {proc.exitcode})")
+  return result
+
+def _git_commit() -> Optional[str]:
+  try:
+    out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=SRC_DIR, capture_output=True, text=True)
+  except (OSError, subprocess.CalledProcessError):
+    return None
+  return out.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+
+def load_history(path: Path) -> List[Dict[str, Any]]:
+  if not path.exists():
+    return []
+  with open(path, encoding="utf-8") as fh:
+    return [json.loads(line) for line in fh if line.strip()]
+
+def previous_record(history: List[Dict[str, Any]], params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+  for record in reversed(history):
+    if record["params"] == params:
+      return record
+  return None
+
+def regressions(current: Dict[str, Any], previous: Dict[str, Any], tolerance: float) -> List[str]:
+  """Benchmarks whose throughput fell, or whose peak memory grew, by more than `tolerance`."""
+  found = []
+  for name, result in current["results"].items():
+    before = previous["results"].get(name)
+    if not before:
+      continue
+    if before.get("items_per_second") and result.get("items_per_second"):
+      change = result["items_per_second"] / before["items_per_second"] - 1
+      if change < -tolerance:
+        found.append(f"{name}: throughput {change:+.1%}")
+    if before.get("rss_growth_mb") and result.get("rss_growth_mb"):
+      change = result["rss_growth_mb"] / before["rss_growth_mb"] - 1
+      if change > tolerance and result["rss_growth_mb"] - before["rss_growth_mb"] > 1.0:
+        found.append(f"{name}: memory {change:+.1%}")
+  return found
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--lines", type=float, nargs="+", default=[1e3, 1e5, 1e6], help="Log sizes in lines, e.g. 1e3 1e6 1e8")
+  parser.add_argument("--tool", choices=["iverilog", "yosys"], default="iverilog")
+  parser.add_argument("--templates", type=int, default=500, help="Distinct message templates in the generated logs")
+  parser.add_argument("--repeat", type=float, default=0.5, help="Share of messages repeating a recent line verbatim")
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--benchmarks", nargs="+", default=list(BENCHMARKS), choices=BENCHMARKS)
+  parser.add_argument("--log-dir", type=Path, help="Keep generated logs here and reuse them on later runs")
+  parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+  parser.add_argument("--no-record", action="store_true", help="Compare against the history without appending to it")
+  parser.add_argument("--tolerance", type=float, default=0.10, help="Relative change reported as a regression")
+  parser.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero on a regression, for CI")
+  args = parser.parse_args()
+
+  history = load_history(args.history)
+  commit = _git_commit()
+  failed = []
+  with tempfile.TemporaryDirectory() as tmp:
+    log_dir = args.log_dir or Path(tmp)
+    for lines in map(int, args.lines):
+      params = {"tool": args.tool, "lines": lines, "templates": args.templates, "repeat": args.repeat, "seed": args.seed}
+      log = log_dir / f"{args.tool}-{lines}-{args.templates}-{args.repeat}-{args.seed}.log"
+      if not log.exists():
+        start = time.perf_counter()
+        write_log(log, args.tool, lines, templates=args.templates, repeat=args.repeat, seed=args.seed)
+        print(f"generated {log.name} ({log.stat().st_size / 1e6:.1f} MB) in {time.perf_counter() - start:.1f}s")
+
+      record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "results": {},
+      }
+      for name in args.benchmarks:
+        result = record["results"][name] = measure(name, args.tool, log)
+        print(f"{lines:>12,} lines  {name:<14} {result['seconds']:>9.3f}s  "
+              f"{result['items_per_second'] or 0:>13,.0f} items/s  peak {result['peak_rss_mb'] or 0:>7.1f} MB")
+
+      previous = previous_record(history, params)
+      if previous is not None:
+        found = regressions(record, previous, args.tolerance)
+        print(f"vs {previous['commit']} ({previous['timestamp']}): " + ("; ".join(found) if found else "no regressions"))
+        failed += found
+      if not args.no_record:
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.history, "a", encoding="utf-8") as fh:
+          fh.write(json.dumps(record) + "\n")
+        history.append(record)
+
+  if args.fail_on_regression and failed:
+    raise SystemExit(f"{len(failed)} regression(s)")
+
+if __name__ == "__main__":
+  main()
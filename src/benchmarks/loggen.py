@@ -0,0 +1,139 @@
+"""Synthetic Icarus Verilog / Yosys logs with a chosen size, template cardinality and repetition ratio.
+
+  python src/benchmarks/loggen.py --tool iverilog --lines 1e6 --templates 500 --repeat 0.5 -o /tmp/iverilog.log
+  python src/benchmarks/loggen.py --tool yosys --lines 1e8 --templates 20000 -o /tmp/yosys.log
+"""
+import argparse
+import random
+from collections import deque
+from pathlib import Path
+from typing import Iterator, List
+
+IVERILOG_MESSAGES = [
+  "signal '{sig}' is not connected to any module ports.",
+  "Truncating {n}-bit constant to 16 bits for signal '{sig}'.",
+  "Undefined variable '{sig}' in module '{mod}'.",
+  "port mismatch: instance 'u{n}' expects {n} ports, but {m} given.",
+  "multiple drivers detected for net '{sig}'.",
+  "Width mismatch in assignment to signal '{sig}'[{n}].",
+  "Parser error in line {n}: syntax error, unexpected {tok}.",
+  "Module '\\{mod}' referenced in design but not found.",
+  "signal '{sig}' declared but never assigned.",
+  "hierarchical reference to 'top.{mod}.{sig}' failed.",
+]
+YOSYS_MESSAGES = [
+  "signal '{sig}' has no driver.",
+  "Parser error in line {n}: syntax error, unexpected {tok}.",
+  "Port '{sig}' is not connected.",
+  "Width mismatch in assignment to signal '{sig}'.",
+  "Multiple conflicting drivers for signal '{sig}'.",
+  "Undefined module '\\{mod}' referenced in design.",
+  "Unable to elaborate module '{mod}'.",
+  "Unused sequential element in '{mod}'.",
+  "Port '{sig}' connected to constant value {m}.",
+  "Replacing memory \\{sig} with list of registers. See '{mod}.v':{n}",
+]
+YOSYS_PASSES = ["Verilog-2005 frontend", "HIERARCHY pass", "PROC pass", "OPT pass", "MEMORY pass", "TECHMAP pass", "ABC pass"]
+TOKENS = ["END", "ENDMODULE", "BEGIN", "IDENTIFIER"]
+# Lines the parsers skip, as interleaved by the real tools
+IVERILOG_NOISE = ["VCD info: dumpfile waves.vcd opened for output.", "{mod}.v:{n}: $finish called at {n} (1s)"]
+YOSYS_NOISE = ["Parsing Verilog input from `{mod}.v' to AST representation.", "Generating RTLIL representation for module `\\{mod}'."]
+
+def make_templates(tool: str, cardinality: int) -> List[str]:
+  """
+    `cardinality` message formats that each normalize to a different cluster template. Variable parts are
+    always numbers, quoted names or single identifiers, which normalization replaces. Yosys step headers
+    add two more clusters.
+  """
+  base = IVERILOG_MESSAGES if tool == "iverilog" else YOSYS_MESSAGES
+  templates = []
+  for i in range(max(1, cardinality)):
+    msg = base[i % len(base)]
+    scope = i // len(base)
+    # Dotted hierarchy names survive normalization, so each scope makes the message a distinct template
+    templates.append(msg if scope == 0 else f"{msg} (in scope top.blk{scope}.core)")
+  return templates
+
+def generate_lines(
+  tool: str,
+  lines: int,
+  templates: int = 100,
+  repeat: float = 0.5,
+  error_ratio: float = 0.3,
+  noise: float = 0.1,
+  seed: int = 0,
+) -> Iterator[str]:
+  """
+    `lines` log lines for `tool`. A `repeat` share of the message lines repeats one of the last 1024 messages
+    verbatim (exercising the memo); the rest fill a random template with fresh names and numbers. A `noise`
+    share of lines are tool chatter the parsers skip.
+  """
+  rng = random.Random(seed)
+  formats = make_templates(tool, templates)
+  recent: deque = deque(maxlen=1024)
+  step = 1
+  for i in range(lines):
+    if tool == "yosys" and i % 64 == 0:
+      yield f"{step}. Executing {YOSYS_PASSES[step % len(YOSYS_PASSES)]}."
+      step += 1
+      continue
+    if rng.random() < noise:
+      fmt = rng.choice(IVERILOG_NOISE if tool == "iverilog" else YOSYS_NOISE)
+      yield fmt.format(mod=f"mod{rng.randrange(200)}", n=rng.randrange(100_000))
+      continue
+    if recent and rng.random() < repeat:
+      yield rng.choice(recent)
+      continue
+    msg = rng.choice(formats).format(
+      sig=f"sig_{rng.randrange(5000)}",
+      mod=f"mod{rng.randrange(200)}",
+      n=rng.randrange(4096),
+      m=rng.randrange(8),
+      tok=rng.choice(TOKENS),
+    )
+    level = "error" if rng.random() < error_ratio else "warning"
+    line = f"iverilog: {level}: {msg}" if tool == "iverilog" else f"{level.capitalize() if level == 'warning' else 'ERROR'}: {msg}"
+    recent.append(line)
+    yield line
+
+def write_log(path: Path, tool: str, lines: int, **kwargs) -> Path:
+  """Stream generated lines to `path` in large writes, so 1e8-line logs never sit in memory."""
+  path = Path(path)
+  path.parent.mkdir(parents=True, exist_ok=True)
+  with open(path, "w", encoding="utf-8", buffering=1 << 20) as fh:
+    batch = []
+    for line in generate_lines(tool, lines, **kwargs):
+      batch.append(line)
+      if len(batch) >= 65536:
+        fh.write("\n".join(batch) + "\n")
+        batch = []
+    if batch:
+      fh.write("\n".join(batch) + "\n")
+  return path
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--tool", choices=["iverilog", "yosys"], default="iverilog")
+  parser.add_argument("--lines", type=float, default=1e6, help="Line count; scientific notation such as 1e7 is accepted")
+  parser.add_argument("--templates", type=int, default=100, help="Distinct message templates")
+  parser.add_argument("--repeat", type=float, default=0.5, help="Share of messages that repeat a recent line verbatim")
+  parser.add_argument("--error-ratio", type=float, default=0.3)
+  parser.add_argument("--noise", type=float, default=0.1, help="Share of lines the parser skips")
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("-o", "--out", type=Path, required=True)
+  args = parser.parse_args()
+
+  write_log(
+    args.out,
+    args.tool,
+    int(args.lines),
+    templates=args.templates,
+    repeat=args.repeat,
+    error_ratio=args.error_ratio,
+    noise=args.noise,
+    seed=args.seed,
+  )
+  print(f"Wrote {int(args.lines):,} {args.tool} lines to {args.out} ({args.out.stat().st_size / 1e6:.1f} MB)")
+
+if __name__ == "__main__":
+  main()
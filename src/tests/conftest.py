@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from ai_logs.providers import SummaryProvider
+from ai_logs.schema import Cluster, LogItem, Summary
+
+
+class FakeClock:
+  """Manually advanced stand-in for time.monotonic/time.time; `sleep` advances it and records the delay."""
+
+  def __init__(self, now: float = 0.0):
+    self.now = now
+    self.slept: List[float] = []
+
+  def __call__(self) -> float:
+    return self.now
+
+  def sleep(self, seconds: float) -> None:
+    self.slept.append(seconds)
+    self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+  return FakeClock()
+
+
+def make_cluster(
+  i: int,
+  key: Optional[str] = None,
+  count: int = 2,
+  level: str = "error",
+  tool: str = "iverilog",
+  file_count: int = 1,
+) -> Cluster:
+  """A `cluster_{i}` of `count` identical items, as ClusterTable would report it."""
+  key = key if key is not None else f"message {i} on signal '<SIG>'"
+  item = LogItem(tool=tool, level=level, code=None, msg=key, raw=key)
+  return Cluster(
+    id=f"cluster_{i}",
+    key=key,
+    count=count,
+    items=[item] * min(count, 2),
+    fingerprint=f"fp-{i}",
+    level_counts={level: count},
+    tool_counts={tool: count},
+    first_seen=i * 10,
+    last_seen=i * 10 + count,
+    file_count=file_count,
+  )
+
+
+class RecordingProvider(SummaryProvider):
+  """Records which clusters reach the LLM stage; every prompt is priced at `tokens` per cluster."""
+
+  name = "recording"
+  model = "recording-model"
+  prompt_version = "1"
+
+  def __init__(self, tokens: int = 100):
+    self.calls: List[str] = []
+    self.tokens = tokens
+
+  def summarize(self, cluster: Cluster, rate_limiter=None) -> Optional[Summary]:
+    self.calls.append(cluster.id)
+    return Summary(cluster_id=int(cluster.id.split('_')[1]), explanation="from llm", suggested_fixes=["fix"])
+
+  def prompt_tokens(self, clusters) -> int:
+    return self.tokens * len(clusters)
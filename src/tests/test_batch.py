@@ -0,0 +1,84 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+pytest.importorskip("pandas")
+
+from ai_logs.batch import batch_ingest_range, parse_columns, vectorized_templates
+from ai_logs.ingest import ingest_files
+from ai_logs.normalize import ClusterTable, message_key, message_template
+from ai_logs.parse import _match_lines, parse_records, read_lines_with_offsets
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+
+# Fragments that exercise case-insensitive levels, Unicode text and the control characters only Python treats as whitespace
+FRAGMENTS = [
+  "iverilog: ", "warning:", "error:", "ERROR:", "12. ", "007.", " ", "\t", "\x0b", "\x1c", "\r",
+  "é", "Ω", "٣", "sig", "'a'", "\"b\"", "12", "x", ";", "signal",
+]
+
+
+def _fuzz_lines(n: int, seed: int = 0) -> list:
+  rng = random.Random(seed)
+  return ["".join(rng.choice(FRAGMENTS) for _ in range(rng.randrange(8))) for _ in range(n)]
+
+
+def _snapshot(table: ClusterTable):
+  return [
+    (c.id, c.key, c.count, c.level_counts, c.tool_counts, c.first_seen, c.last_seen, c.items)
+    for c in table.clusters()
+  ]
+
+
+@pytest.mark.parametrize("tool", ["iverilog", "yosys"])
+def test_parse_columns_matches_line_parser(tool: str):
+  lines = _fuzz_lines(5000)
+
+  rows, levels, codes, msgs = parse_columns(tool, lines)
+
+  expected = [(row, level, code, msg) for row, _, level, code, msg in _match_lines(tool, enumerate(lines))]
+  assert list(zip(rows.tolist(), levels, codes, msgs)) == expected
+
+
+def test_vectorized_templates_match_fingerprint_pipeline():
+  msgs = [line.split(":", 1)[-1] for line in _fuzz_lines(5000, seed=1)]
+  msgs += ["signal 'clk' has value 12 in top.u1", "Ω signal \"x\" 7", "port p1 is unused"] * 3
+
+  codes, keys, templates = vectorized_templates(msgs)
+
+  for i, msg in enumerate(msgs):
+    assert keys[codes[i]] == message_key(msg)
+    assert templates[codes[i]] == message_template(message_key(msg))
+
+
+@pytest.mark.parametrize("tool,log", [("iverilog", "verilog_large.log"), ("yosys", "yosys_large.log"), ("iverilog", None), ("yosys", None)])
+@pytest.mark.parametrize("batch_bytes", [4096, 1 << 20])
+def test_batch_ingest_matches_streaming_pass(tmp_path: Path, tool: str, log, batch_bytes: int):
+  if log is None:
+    path = tmp_path / "fuzz.log"
+    path.write_bytes("\n".join(_fuzz_lines(3000, seed=2)).encode() + b"\xff\n" + b"warning: tail\r\n")
+  else:
+    path = DATA_DIR / log
+  path = str(path)
+
+  streamed = ClusterTable(sample_size=3).update(parse_records(tool, read_lines_with_offsets(path), source=path))
+  batched = batch_ingest_range(ClusterTable(sample_size=3), tool, path, batch_bytes=batch_bytes)
+
+  assert batched.items_seen == streamed.items_seen
+  assert _snapshot(batched) == _snapshot(streamed)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_ingest_files_engines_agree(workers: int):
+  jobs = [("iverilog", str(DATA_DIR / "verilog_large.log")), ("yosys", str(DATA_DIR / "yosys_large.log"))]
+
+  stream = ingest_files(jobs, workers=workers, sample_size=4)
+  pandas = ingest_files(jobs, workers=workers, sample_size=4, engine="pandas")
+
+  assert _snapshot(pandas) == _snapshot(stream)
@@ -0,0 +1,108 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from ai_logs import gemini_ai, summarize
+from ai_logs.cache import SummaryCache, cache_key
+from ai_logs.schema import LogItem, Cluster, Summary
+
+
+def _summary(cluster_id: int = 0, text: str = "explained") -> Summary:
+  return Summary(cluster_id=cluster_id, explanation=text, suggested_fixes=["fix it"])
+
+
+def _cache(tmp_path: Path, **kwargs) -> SummaryCache:
+  kwargs.setdefault("model", "model-a")
+  kwargs.setdefault("prompt_version", "1")
+  return SummaryCache(tmp_path / "cache.db", **kwargs)
+
+
+def test_cache_roundtrip_and_counters(tmp_path: Path):
+  cache = _cache(tmp_path)
+
+  assert cache.get("fp-1") is None
+  cache.put("fp-1", _summary(text="from cache"))
+
+  hit = cache.get("fp-1")
+  assert hit is not None
+  assert hit.explanation == "from cache"
+  assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "entries": 1}
+
+
+def test_cache_persists_across_instances(tmp_path: Path):
+  cache = _cache(tmp_path)
+  cache.put("fp-1", _summary())
+  cache.close()
+
+  reopened = _cache(tmp_path)
+  assert reopened.get("fp-1") is not None
+
+
+def test_cache_key_depends_on_model_and_prompt_version(tmp_path: Path):
+  assert cache_key("fp", "1", "model-a") != cache_key("fp", "2", "model-a")
+  assert cache_key("fp", "1", "model-a") != cache_key("fp", "1", "model-b")
+
+  _cache(tmp_path).put("fp-1", _summary())
+  assert _cache(tmp_path, model="model-b").get("fp-1") is None
+  assert _cache(tmp_path, prompt_version="2").get("fp-1") is None
+
+
+def test_cache_ttl_expiry(tmp_path: Path, clock):
+  cache = _cache(tmp_path, ttl_seconds=60, clock=clock)
+  cache.put("fp-1", _summary())
+
+  clock.now += 30
+  assert cache.get("fp-1") is not None
+
+  clock.now += 31
+  assert cache.get("fp-1") is None
+  assert len(cache) == 0
+
+
+def test_cache_lru_eviction(tmp_path: Path, clock):
+  cache = _cache(tmp_path, max_entries=2, clock=clock)
+
+  cache.put("fp-1", _summary())
+  clock.now += 1
+  cache.put("fp-2", _summary())
+  clock.now += 1
+  assert cache.get("fp-1") is not None  # fp-2 is now least recently used
+  clock.now += 1
+  cache.put("fp-3", _summary())
+
+  assert len(cache) == 2
+  assert cache.evictions == 1
+  assert cache.get("fp-2") is None
+  assert cache.get("fp-1") is not None
+  assert cache.get("fp-3") is not None
+
+
+def test_summarize_clusters_uses_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+  calls = []
+
+  def fake_generate(cluster, *args):
+    calls.append(cluster.id)
+    return _summary(int(cluster.id.split('_')[1]), "generated")
+
+  monkeypatch.setattr(gemini_ai, "generate_summary_with_gemini", fake_generate)
+
+  items = [
+    LogItem(tool="iverilog", level="error", code=None, msg="signal 'clk' has value 1", raw="raw1"),
+    LogItem(tool="iverilog", level="error", code=None, msg="signal 'rst' has value 2", raw="raw2"),
+  ]
+  first_run = [Cluster(id="cluster_0", key="signal '<SIG>' has value <NUM>", count=2, items=items, fingerprint="fp-1")]
+  second_run = [Cluster(id="cluster_4", key="signal '<SIG>' has value <NUM>", count=2, items=items, fingerprint="fp-1")]
+
+  cache = _cache(tmp_path)
+  summarize.summarize_clusters(first_run, cache=cache)
+  summaries = summarize.summarize_clusters(second_run, cache=cache)
+
+  assert calls == ["cluster_0"]
+  assert summaries["cluster_4"].explanation == "generated"
+  assert summaries["cluster_4"].cluster_id == 4
+  assert cache.hits == 1
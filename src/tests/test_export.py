@@ -0,0 +1,94 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from ai_logs.export import ItemExporter, export_clusters, columnar_format
+from ai_logs.normalize import ClusterTable, DrainMiner
+from ai_logs.parse import parse_records, read_lines_with_offsets
+from ai_logs.schema import Summary
+
+
+def _write_log(tmp_path: Path) -> str:
+  log = tmp_path / "iverilog.log"
+  lines = [f"iverilog: warning: signal 'sig{j}' is unused." for j in range(7)]
+  lines += ["iverilog: error: syntax error near \"tok\"", "iverilog: warning: signal 'late' is unused."]
+  log.write_text("\n".join(lines) + "\n", encoding="utf-8")
+  return str(log)
+
+
+def _read(path: Path):
+  if columnar_format(path) == "parquet":
+    return pq.read_table(path)
+  return pa.ipc.open_file(path).read_all()
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_item_export_streams_every_item_with_dictionary_columns(tmp_path: Path, suffix: str):
+  log = _write_log(tmp_path)
+  out = tmp_path / f"items{suffix}"
+  exporter = ItemExporter(out, run_id="run-1", batch_rows=4)
+  table = ClusterTable(sample_size=2, item_sink=exporter)
+  table.update(parse_records("iverilog", read_lines_with_offsets(log), source=log))
+  exporter.close()
+
+  exported = _read(out)
+  assert exported.num_rows == table.items_seen == 9
+  for name in ("run_id", "tool", "level", "fingerprint", "cluster_id"):
+    assert pa.types.is_dictionary(exported.schema.field(name).type)
+
+  rows = exported.to_pylist()
+  assert [r["position"] for r in rows] == list(range(9))
+  assert [r["cluster_id"] for r in rows] == ["cluster_0"] * 7 + ["cluster_1", "cluster_0"]
+  fingerprints = {c.id: c.fingerprint for c in table.clusters()}
+  assert all(r["fingerprint"] == fingerprints[r["cluster_id"]] for r in rows)
+  assert rows[1]["source"] == log and rows[1]["offset"] > 0 and rows[1]["raw"] is None
+
+
+def test_drain_item_export_joins_clusters_on_cluster_id(tmp_path: Path):
+  log = _write_log(tmp_path)
+  miner = DrainMiner()
+  exporter = ItemExporter(tmp_path / "items.parquet", run_id="run-1", memo=miner)
+  table = ClusterTable(memo=miner, item_sink=exporter)
+  table.update(parse_records("iverilog", read_lines_with_offsets(log), source=log))
+  exporter.close()
+  clusters = table.clusters()
+  export_clusters(clusters, {}, tmp_path / "clusters.parquet", "run-1")
+
+  items = _read(tmp_path / "items.parquet").to_pylist()
+  exported = {r["cluster_id"]: r for r in _read(tmp_path / "clusters.parquet").to_pylist()}
+  # Drain templates were still generalizing while items streamed, so no stale fingerprint is written
+  assert {r["fingerprint"] for r in items} == {None}
+  assert {r["cluster_id"] for r in items} == set(exported)
+  assert all(exported[c.id]["fingerprint"] == c.fingerprint for c in clusters)
+
+
+def test_cluster_export_roundtrip(tmp_path: Path):
+  log = _write_log(tmp_path)
+  table = ClusterTable(sample_size=2)
+  table.update(parse_records("iverilog", read_lines_with_offsets(log), source=log))
+  clusters = table.clusters()
+  summaries = {"cluster_1": Summary(cluster_id=1, explanation="syntax", suggested_fixes=["check the token"])}
+
+  out = tmp_path / "clusters.parquet"
+  assert export_clusters(clusters, summaries, out, run_id="run-1") == 2
+
+  rows = pq.read_table(out).to_pylist()
+  assert [(r["cluster_id"], r["count"], r["severity"]) for r in rows] == [("cluster_0", 8, "warning"), ("cluster_1", 1, "error")]
+  assert dict(rows[0]["level_counts"]) == {"warning": 8}
+  assert rows[0]["explanation"] is None
+  assert rows[1]["suggested_fixes"] == ["check the token"]
+
+
+def test_columnar_format_from_suffix():
+  assert columnar_format("runs/a.parquet") == "parquet"
+  assert columnar_format("runs/a.feather") == "arrow"
+  with pytest.raises(ValueError):
+    columnar_format("runs/a.csv")
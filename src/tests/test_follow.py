@@ -0,0 +1,131 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from ai_logs import follow
+from ai_logs.follow import LogFollower, LogTailer
+from ai_logs.normalize import ClusterTable, DrainMiner
+from ai_logs.schema import Summary
+
+
+def _append(path: Path, text: str) -> None:
+  with path.open("a", encoding="utf-8") as fh:
+    fh.write(text)
+
+
+def test_tailer_waits_for_file_and_holds_partial_lines(tmp_path: Path):
+  log = tmp_path / "sim.log"
+  tailer = LogTailer("iverilog", str(log))
+  assert tailer.read_lines() == []
+
+  _append(log, "iverilog: error: first\niverilog: error: sec")
+  assert tailer.read_lines() == ["iverilog: error: first"]
+  _append(log, "ond\n")
+  assert tailer.read_lines() == ["iverilog: error: second"]
+  assert tailer.read_lines() == []
+
+
+def test_tailer_follows_truncation_and_rotation(tmp_path: Path):
+  log = tmp_path / "sim.log"
+  log.write_text("old 1\nold 2\n", encoding="utf-8")
+  tailer = LogTailer("iverilog", str(log))
+  assert tailer.read_lines() == ["old 1", "old 2"]
+
+  log.write_text("new\n", encoding="utf-8")
+  assert tailer.read_lines() == ["new"]
+
+  _append(log, "before rotate\n")
+  os.rename(log, tmp_path / "sim.log.1")
+  log.write_text("rotated\n", encoding="utf-8")
+  assert tailer.read_lines() == ["before rotate", "rotated"]
+  tailer.close()
+
+
+def test_tailer_from_end_skips_existing_contents(tmp_path: Path):
+  log = tmp_path / "sim.log"
+  log.write_text("existing\n", encoding="utf-8")
+  tailer = LogTailer("iverilog", str(log), from_start=False)
+  assert tailer.read_lines() == []
+  _append(log, "fresh\n")
+  assert tailer.read_lines() == ["fresh"]
+  tailer.close()
+
+
+def test_tailer_from_end_reads_files_created_after_start(tmp_path: Path):
+  log = tmp_path / "sim.log"
+  tailer = LogTailer("iverilog", str(log), from_start=False)
+  assert tailer.read_lines() == []
+  log.write_text("first\nsecond\n", encoding="utf-8")
+  assert tailer.read_lines() == ["first", "second"]
+  tailer.close()
+
+
+def test_tailer_reads_in_bounded_chunks(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+  monkeypatch.setattr(follow, "READ_CHUNK_BYTES", 4)
+  log = tmp_path / "sim.log"
+  log.write_text("alpha\nbe\ngamma delta\ntail", encoding="utf-8")
+  tailer = LogTailer("iverilog", str(log))
+  assert tailer.read_lines() == ["alpha", "be", "gamma delta"]
+  _append(log, "\n")
+  assert tailer.read_lines() == ["tail"]
+  tailer.close()
+
+
+def test_follower_summarizes_new_clusters_once_and_debounces_writes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, clock):
+  calls = []
+
+  def fake_summarize(clusters, **kwargs):
+    calls.extend(c.id for c in clusters)
+    return {c.id: Summary(cluster_id=int(c.id.split('_')[1]), explanation="live", suggested_fixes=[]) for c in clusters}
+
+  monkeypatch.setattr(follow, "summarize_clusters", fake_summarize)
+
+  log = tmp_path / "sim.log"
+  writes = []
+  follower = LogFollower(
+    [("iverilog", str(log))],
+    ClusterTable(),
+    lambda clusters, summaries: writes.append((len(clusters), sorted(summaries))),
+    debounce_seconds=5.0,
+    clock=clock,
+  )
+
+  # A single warning with no placeholders does not cross the heuristic yet
+  _append(log, "warning: missing timescale\n")
+  assert follower.poll() == 1
+  assert follower.flush()
+  assert calls == []
+
+  _append(log, "warning: missing timescale\n")
+  follower.poll()
+  _append(log, "warning: missing timescale\n")
+  follower.poll()
+  assert not follower.flush()  # within the debounce interval
+
+  clock.now += 5.0
+  follower.close()
+  assert calls == ["cluster_0"]
+  assert writes == [(1, []), (1, ["cluster_0"])]
+
+
+def test_follower_fingerprints_drain_clusters_by_template(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+  requested = []
+  monkeypatch.setattr(follow, "summarize_clusters", lambda clusters, **kwargs: requested.extend(clusters) or {})
+
+  for name, message in (("a.log", "error: port 1 width mismatch"), ("b.log", "error: net 7 has no driver")):
+    log = tmp_path / name
+    log.write_text(f"{message}\n{message}\n{message}\n", encoding="utf-8")
+    follower = LogFollower([("iverilog", str(log))], ClusterTable(memo=DrainMiner()), lambda clusters, summaries: None)
+    follower.poll()
+    follower.close()
+
+  assert len(requested) == 2
+  # Each table numbers its first template drain:0, so the fingerprint must come from the template text instead
+  assert [c.key for c in requested] == ["port <NUM> width mismatch", "net <NUM> has no driver"]
+  assert requested[0].fingerprint != requested[1].fingerprint
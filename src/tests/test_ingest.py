@@ -0,0 +1,86 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from ai_logs.ingest import expand_log_paths, ingest_files
+from ai_logs.normalize import ClusterTable
+from ai_logs.parse import parse_records, read_lines_with_offsets
+
+
+def _write_regression(root: Path, n: int) -> list:
+  paths = []
+  for i in range(n):
+    tc = root / f"tc_{i:03d}"
+    tc.mkdir(parents=True)
+    log = tc / "iverilog.log"
+    lines = [f"iverilog: warning: signal 'sig{j}' is unused." for j in range(i + 3)]
+    lines += [f"iverilog: error: syntax error near \"tok{i}\"", f"iverilog: error: case {i} unique to testcase {i}_x"]
+    log.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    paths.append(str(log))
+  return paths
+
+
+def _snapshot(table: ClusterTable):
+  return [(c.id, c.key, c.count, c.level_counts, c.first_seen, c.last_seen, c.items) for c in table.clusters()]
+
+
+def test_expand_log_paths_file_dir_and_glob(tmp_path: Path):
+  paths = _write_regression(tmp_path, 3)
+
+  assert expand_log_paths(paths[0]) == [paths[0]]
+  assert expand_log_paths(str(tmp_path)) == paths
+  assert expand_log_paths(str(tmp_path / "**" / "iverilog.log")) == paths
+  assert expand_log_paths(str(tmp_path / "missing.log")) == []
+  assert expand_log_paths("") == []
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_ingest_files_matches_sequential_pass(tmp_path: Path, workers: int):
+  paths = _write_regression(tmp_path, 6)
+  jobs = [("iverilog", p) for p in paths]
+
+  sequential = ClusterTable(sample_size=4)
+  for _, p in jobs:
+    sequential.update(parse_records("iverilog", read_lines_with_offsets(p), source=p))
+
+  merged = ingest_files(jobs, workers=workers, sample_size=4)
+
+  assert merged.items_seen == sequential.items_seen
+  assert _snapshot(merged) == _snapshot(sequential)
+
+
+def test_cluster_ids_follow_job_order(tmp_path: Path):
+  paths = _write_regression(tmp_path, 4)
+
+  forward = ingest_files([("iverilog", p) for p in paths], workers=2)
+  again = ingest_files([("iverilog", p) for p in paths], workers=2)
+
+  assert _snapshot(forward) == _snapshot(again)
+  assert forward.clusters()[0].key == "signal '<SIG>' is unused."
+  assert forward.clusters()[0].count == sum(i + 3 for i in range(4))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_chunked_single_file_matches_sequential_pass(tmp_path: Path, workers: int):
+  log = tmp_path / "yosys.log"
+  lines = []
+  for i in range(400):
+    lines.append(f"{i}. Executing pass {i % 7}.")
+    lines.append(f"Warning: Wire top.u{i % 13}.w{i} is used but has no driver.")
+    if i % 50 == 0:
+      lines.append(f"ERROR: Module '\\m{i}' referenced in design but not found.")
+  log.write_text("\n".join(lines) + "\n", encoding="utf-8")
+  path = str(log)
+
+  sequential = ClusterTable(sample_size=5)
+  sequential.update(parse_records("yosys", read_lines_with_offsets(path), source=path))
+
+  chunked = ingest_files([("yosys", path)], workers=workers, sample_size=5, chunk_bytes=512)
+
+  assert chunked.items_seen == sequential.items_seen
+  assert _snapshot(chunked) == _snapshot(sequential)
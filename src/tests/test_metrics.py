@@ -0,0 +1,108 @@
+import json
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from ai_logs.ingest import ingest_ranges
+from ai_logs.metrics import PipelineMetrics, stage
+
+
+def test_stage_records_wall_time_and_items(clock):
+  metrics = PipelineMetrics(clock=clock)
+
+  with metrics.stage("write_json") as stats:
+    clock.now += 2.0
+    stats.items += 10
+  with metrics.stage("write_json"):
+    clock.now += 1.0
+
+  data = metrics.to_dict()["stages"]["write_json"]
+  assert data["wall_seconds"] == 3.0
+  assert data["max_seconds"] == 2.0
+  assert (data["items"], data["calls"]) == (10, 2)
+  assert data["cpu_seconds"] >= 0.0
+
+
+def test_interleaved_stages_get_exclusive_time(clock):
+  metrics = PipelineMetrics(clock=clock)
+
+  def read():
+    for line in ["a", "b", "c"]:
+      clock.now += 1.0
+      yield line
+
+  def parse(lines):
+    for line in lines:
+      clock.now += 2.0
+      yield line.upper()
+
+  def lookup(msg):
+    clock.now += 4.0
+    return msg
+
+  timed_lookup = metrics.timed_call(lookup, "fingerprint")
+  with metrics.attribute("cluster"):
+    for record in metrics.timed_iter(parse(metrics.timed_iter(read(), "read")), "parse"):
+      timed_lookup(record)
+      clock.now += 8.0
+
+  stages = metrics.to_dict()["stages"]
+  assert [stages[name]["wall_seconds"] for name in ("read", "parse", "fingerprint", "cluster")] == [3.0, 6.0, 12.0, 24.0]
+  assert stages["read"]["items"] == stages["parse"]["items"] == stages["fingerprint"]["items"] == 3
+  # Per-line stages are wall-time only; CPU time is reported for the enclosing stage() blocks
+  assert not any("cpu_seconds" in stages[name] for name in ("read", "parse", "fingerprint", "cluster"))
+
+
+def test_queued_task_splits_wait_and_run_time(clock):
+  metrics = PipelineMetrics(clock=clock)
+
+  def call(x):
+    clock.now += 3.0
+    return x * 2
+
+  task = metrics.queued_task(call, "queue_wait", "llm")
+  clock.now += 5.0  # waiting for a free worker
+  assert task(21) == 42
+
+  stages = metrics.to_dict()["stages"]
+  assert stages["queue_wait"]["wall_seconds"] == 5.0
+  assert stages["llm"]["wall_seconds"] == 3.0
+
+
+def test_stage_helper_is_a_no_op_without_metrics():
+  with stage(None, "anything") as stats:
+    assert stats is None
+
+
+def test_ingest_breakdown_matches_plain_ingest(tmp_path: Path):
+  log = tmp_path / "iverilog.log"
+  log.write_text("".join(f"iverilog: error: signal 's{i % 3}' has no driver {i}\n" for i in range(30)))
+  ranges = [("iverilog", str(log), 0, None)]
+
+  plain = ingest_ranges(ranges)
+  metrics = PipelineMetrics()
+  timed = ingest_ranges(ranges, metrics=metrics)
+
+  assert [c.model_dump() for c in timed.clusters()] == [c.model_dump() for c in plain.clusters()]
+  # The memo's own lookup is restored once ingestion finishes
+  assert "lookup" not in vars(timed.memo)
+  stages = metrics.to_dict()["stages"]
+  assert list(stages) == ["read", "parse", "fingerprint", "cluster"]
+  assert all(stages[name]["items"] == 30 for name in stages)
+
+
+def test_write_is_machine_readable(tmp_path: Path):
+  metrics = PipelineMetrics()
+  with metrics.stage("ingest"):
+    pass
+  metrics.counters["clusters"] = 4
+  path = tmp_path / "metrics" / "run.json"
+  metrics.write(path)
+
+  data = json.loads(path.read_text())
+  assert data["version"] == 1
+  assert data["counters"] == {"clusters": 4}
+  assert "ingest" in data["stages"]
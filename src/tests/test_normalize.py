@@ -1,4 +1,8 @@
+import hashlib
 import io
+import json
+import random
+import re
 import sys
 from pathlib import Path
 
@@ -8,7 +12,20 @@ SRC_DIR = Path(__file__).resolve().parents[1]
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from ai_logs.normalize import fingerprint, cluster_logs
+from ai_logs.normalize import (
+    fingerprint,
+    cluster_logs,
+    FingerprintMemo,
+    DrainMiner,
+    DRAIN_WILDCARD,
+    make_clusterer,
+    ClusterTable,
+    message_key,
+    template_hash,
+    NUM_PATTERN,
+    IDENTIFIER_PATTERN,
+    QUOTED_STRING_PATTERN,
+)
 from ai_logs.schema import LogItem, Cluster
 
 
@@ -227,3 +244,246 @@ class TestClusterLogs:
         
         cluster_ids = [cluster.id for cluster in clusters]
         assert len(set(cluster_ids)) == len(cluster_ids)
+
+    def test_cluster_logs_accepts_generator(self):
+        """Test that cluster_logs consumes a streaming iterator"""
+        def item_stream():
+            for i in range(5):
+                yield LogItem(tool="iverilog", level="warning", code=None,
+                              msg=f"signal 'sig{i}' has value {i}", raw=f"raw{i}")
+
+        clusters = cluster_logs(item_stream())
+
+        assert len(clusters) == 1
+        assert clusters[0].count == 5
+
+
+def _reference_fingerprint(msg):
+    """The original per-word regex implementation, kept as the equivalence oracle."""
+    template = NUM_PATTERN.sub('<NUM>', msg)
+    template = QUOTED_STRING_PATTERN.sub("'<SIG>'", template)
+    keywords = {'signal', 'port', 'module', 'net', 'driver', 'assignment', 'reference', 'instance', 'variable'}
+    normalized_words = []
+    for word in template.split():
+        clean_word = re.sub(r'[^\w]', '', word)
+        if clean_word and clean_word not in keywords and IDENTIFIER_PATTERN.match(clean_word):
+            normalized_words.append(re.sub(r'\b' + re.escape(clean_word) + r'\b', '<ID>', word))
+        else:
+            normalized_words.append(word)
+    return hashlib.md5(' '.join(normalized_words).encode()).hexdigest()
+
+
+class TestFingerprintEquivalence:
+    ALPHABET = "ab_Z09 '\"().;:,-<>\\[]\t\u00e9\u0663"
+
+    def test_matches_reference_on_sample_logs(self):
+        data_dir = Path(__file__).resolve().parents[2] / "data"
+        for log in data_dir.glob("*.log"):
+            for line in log.read_text(encoding="utf-8").splitlines():
+                assert fingerprint(line) == _reference_fingerprint(line), line
+
+    def test_matches_reference_on_random_messages(self):
+        rng = random.Random(1234)
+        words = ["signal", "module", "net", "top.clk", "'clk'", "\"x y\"", "u_1", "(a);", "42", "it's"]
+        for _ in range(20000):
+            if rng.random() < 0.5:
+                msg = "".join(rng.choice(self.ALPHABET) for _ in range(rng.randint(0, 30)))
+            else:
+                msg = " ".join(rng.choice(words) for _ in range(rng.randint(0, 8)))
+            assert fingerprint(msg) == _reference_fingerprint(msg), repr(msg)
+
+    def test_message_key_matches_original_substitution_order(self):
+        rng = random.Random(99)
+        for _ in range(20000):
+            msg = "".join(rng.choice(self.ALPHABET) for _ in range(rng.randint(0, 30)))
+            expected = QUOTED_STRING_PATTERN.sub("'<SIG>'", NUM_PATTERN.sub('<NUM>', msg))
+            assert message_key(msg) == expected, repr(msg)
+
+
+class TestFingerprintMemo:
+    def test_unhashed_fingerprint_is_template(self):
+        assert fingerprint("signal 'clk' has value 1", hashed=False) == "signal '<<ID>>' <ID> <ID> <<ID>>"
+        assert fingerprint("signal 'clk' has value 1") == hashlib.md5(b"signal '<<ID>>' <ID> <ID> <<ID>>").hexdigest()
+
+    def test_memo_counts_hits_for_exact_duplicates(self):
+        memo = FingerprintMemo(capacity=10)
+        for _ in range(4):
+            memo.lookup("signal 'clk' is not connected")
+        memo.lookup("signal 'rst' is not connected")
+
+        assert memo.hits == 3
+        assert memo.misses == 2
+        assert memo.hit_rate == pytest.approx(0.6)
+        assert memo.stats()["entries"] == 2
+
+    def test_memo_is_bounded_lru(self):
+        memo = FingerprintMemo(capacity=2)
+        memo.lookup("a 1")
+        memo.lookup("b 2")
+        memo.lookup("a 1")  # refresh "a 1"
+        memo.lookup("c 3")  # evicts "b 2"
+
+        assert len(memo) == 2
+        memo.lookup("a 1")
+        assert memo.hits == 2
+        memo.lookup("b 2")
+        assert memo.misses == 4
+
+    def test_zero_capacity_disables_memo(self):
+        memo = FingerprintMemo(capacity=0)
+        memo.lookup("a 1")
+        memo.lookup("a 1")
+
+        assert memo.hits == 0
+        assert len(memo) == 0
+
+    def test_cluster_logs_with_memo_matches_fingerprint(self):
+        items = [
+            LogItem(tool="iverilog", level="warning", code=None, msg="signal 'clk' has value 1", raw="raw1")
+            for _ in range(5)
+        ]
+        memo = FingerprintMemo()
+        clusters = cluster_logs(items, memo=memo)
+
+        assert memo.hits == 4
+        assert clusters[0].fingerprint == fingerprint(items[0].msg)
+
+
+def _warning(i, level="warning", tool="iverilog"):
+    return LogItem(tool=tool, level=level, code=None, msg=f"signal 'sig{i}' has value {i}", raw=f"raw{i}")
+
+
+class TestClusterAccumulator:
+    def test_sample_is_bounded_but_counts_are_exact(self):
+        items = [_warning(i, level="error" if i == 500 else "warning") for i in range(1000)]
+
+        clusters = cluster_logs(items, sample_size=10)
+
+        assert len(clusters) == 1
+        cluster = clusters[0]
+        assert cluster.count == 1000
+        assert len(cluster.items) == 10
+        assert cluster.level_counts == {"warning": 999, "error": 1}
+        assert cluster.tool_counts == {"iverilog": 1000}
+        assert cluster.first_seen == 0
+        assert cluster.last_seen == 999
+
+    def test_sample_is_deterministic_and_in_stream_order(self):
+        items = [_warning(i) for i in range(500)]
+
+        first = cluster_logs(items, sample_size=8)[0].items
+        second = cluster_logs(items, sample_size=8)[0].items
+
+        assert first == second
+        raws = [int(item.raw[3:]) for item in first]
+        assert raws == sorted(raws)
+
+    def test_small_clusters_keep_every_member(self):
+        items = [_warning(i) for i in range(3)]
+
+        assert cluster_logs(items, sample_size=5)[0].items == items
+
+    def test_first_and_last_seen_span_interleaved_clusters(self):
+        items = [
+            _warning(0),
+            LogItem(tool="yosys", level="error", code=None, msg="syntax error near 'end'", raw="r"),
+            _warning(1),
+        ]
+
+        warning_cluster, error_cluster = cluster_logs(items)
+
+        assert (warning_cluster.first_seen, warning_cluster.last_seen) == (0, 2)
+        assert (error_cluster.first_seen, error_cluster.last_seen) == (1, 1)
+
+    def test_table_accumulates_across_updates(self):
+        table = ClusterTable(sample_size=2)
+        table.update(_warning(i) for i in range(3))
+        table.update(_warning(i) for i in range(3, 5))
+
+        clusters = table.clusters()
+        assert len(table) == 1
+        assert clusters[0].count == 5
+        assert table.items_seen == 5
+
+    def test_spill_lists_every_member(self, tmp_path):
+        spill = tmp_path / "members.jsonl"
+        items = [_warning(i) for i in range(50)] + [
+            LogItem(tool="yosys", level="error", code=None, msg="syntax error near 'end'", raw="r")
+        ]
+
+        clusters = cluster_logs(items, sample_size=3, spill_path=spill)
+
+        members = [json.loads(line) for line in spill.read_text(encoding="utf-8").splitlines()]
+        assert len(members) == 51
+        assert sum(1 for m in members if m["cluster_id"] == "cluster_0") == 50
+        assert members[-1]["cluster_id"] == "cluster_1"
+        assert members[0]["raw"] == "raw0"
+        assert clusters[0].members_path == str(spill)
+
+
+class TestDrainMiner:
+    def _items(self, msgs):
+        return [LogItem(tool="iverilog", level="error", code=None, msg=m, raw=m) for m in msgs]
+
+    def test_learns_variable_positions(self):
+        miner = DrainMiner()
+        _, first = miner.lookup("Width mismatch in assignment to signal top.a")
+        _, second = miner.lookup("Width mismatch in assignment to signal core.b")
+        _, other = miner.lookup("multiple drivers detected for net 'x'.")
+
+        assert first == second
+        assert other != first
+        key, template = miner.describe("unused", first)
+        assert key == template == f"Width mismatch in assignment to signal {DRAIN_WILDCARD}"
+        assert (miner.hits, miner.misses, len(miner)) == (1, 2, 2)
+
+    def test_different_lengths_never_share_a_template(self):
+        miner = DrainMiner()
+        _, a = miner.lookup("Parser error in line 3: syntax error")
+        _, b = miner.lookup("Parser error in line 3: syntax error, unexpected END")
+        assert a != b
+
+    def test_template_count_is_bounded(self):
+        miner = DrainMiner(max_templates=4)
+        groups = [miner.lookup(f"{word} failed")[1] for word in ["alpha", "beta", "gamma", "delta", "epsilon", "zeta"]]
+
+        assert len(set(groups)) == 6
+        assert len(miner) == 4
+        # Evicted templates are still described by their final text
+        assert miner.describe("unused", groups[0]) == ("alpha failed", "alpha failed")
+
+    def test_evictions_keep_tree_and_retired_text_bounded(self):
+        miner = DrainMiner(max_templates=8)
+        groups = [miner.lookup(f"{'w ' * (i % 50)}op{i} failed")[1] for i in range(2000)]
+
+        def nodes(node):
+            return sum(1 + (nodes(child) if isinstance(child, dict) else 0) for child in node.values())
+
+        assert len(miner) == 8
+        assert len(miner._retired) <= 8
+        # Only the routes of the live templates remain
+        assert nodes(miner._root) <= 8 * miner.depth
+        # Forgotten templates fall back to the cluster's own key
+        assert miner.describe("op0 failed", groups[0]) == ("op0 failed", "op0 failed")
+        assert miner.lookup("op0 failed")[1] != groups[0]
+
+    def test_cluster_table_reports_generalized_templates(self):
+        table = ClusterTable(memo=DrainMiner())
+        table.update(self._items([
+            "Width mismatch in assignment to signal top.a",
+            "Width mismatch in assignment to signal core.b",
+            "Width mismatch in assignment to signal mid.c",
+        ]))
+
+        (cluster,) = table.clusters()
+        assert cluster.count == 3
+        assert cluster.key == "Width mismatch in assignment to signal <*>"
+        assert cluster.fingerprint == template_hash(cluster.key)
+
+    def test_make_clusterer(self):
+        assert isinstance(make_clusterer("fingerprint"), FingerprintMemo)
+        miner = make_clusterer("drain", drain_depth=5, drain_similarity=0.6)
+        assert isinstance(miner, DrainMiner)
+        assert (miner.depth, miner.similarity) == (5, 0.6)
+        with pytest.raises(ValueError):
+            make_clusterer("kmeans")
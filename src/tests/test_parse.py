@@ -8,7 +8,14 @@ SRC_DIR = Path(__file__).resolve().parents[1]
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from ai_logs.parse import parse_lines
+from ai_logs.parse import (
+    parse_lines,
+    parse_records,
+    read_lines_with_offsets,
+    mmap_lines_with_offsets,
+    split_byte_ranges,
+    materialize,
+)
 
 DATA_DIR = Path(__file__).resolve().parents[2] / "data"
 
@@ -18,7 +25,7 @@ def read_lines(filename: str):
 
 def test_parse_iverilog_small_log():
     lines = read_lines("verilog_small.log")
-    items = parse_lines("iverilog", lines)
+    items = list(parse_lines("iverilog", lines))
 
     assert len(items) == 3
 
@@ -42,7 +49,7 @@ def test_parse_iverilog_small_log():
 
 def test_parse_yosys_small_log():
     lines = read_lines("yosys_small.log")
-    items = parse_lines("yosys", lines)
+    items = list(parse_lines("yosys", lines))
 
     assert len(items) == 3
   
@@ -67,7 +74,7 @@ def test_parse_yosys_small_log():
 
 def test_parse_yosys_large_log_counts_and_order():
     lines = read_lines("yosys_large.log")
-    items = parse_lines("yosys", lines)
+    items = list(parse_lines("yosys", lines))
 
     assert len(items) == 11
 
@@ -80,3 +87,80 @@ def test_parse_yosys_large_log_counts_and_order():
     assert levels.count("error") == 4
 
 
+def test_parse_lines_is_lazy():
+    consumed = []
+
+    def line_source():
+        for line in ["iverilog: warning: signal 'a' is unused.\n", "iverilog: error: syntax error\n"]:
+            consumed.append(line)
+            yield line
+
+    items = parse_lines("iverilog", line_source())
+    assert consumed == []
+
+    first = next(items)
+    assert first.level == "warning"
+    assert len(consumed) == 1
+
+    assert [it.level for it in items] == ["error"]
+
+
+def test_parse_records_from_file_keep_offsets_not_raw_text():
+    path = DATA_DIR / "yosys_large.log"
+    records = list(parse_records("yosys", read_lines_with_offsets(str(path)), source=str(path)))
+    expected = list(parse_lines("yosys", read_lines("yosys_large.log")))
+
+    assert len(records) == len(expected)
+    assert all(rec.raw_text is None for rec in records)
+    assert records[1].offset == path.read_bytes().index(b"\n") + 1
+
+    assert materialize(records) == expected
+
+
+def test_parse_records_intern_repeated_fields():
+    lines = ["Warning: a.\n", "Warning: b.\n"]
+    records = list(parse_records("yosys", lines))
+
+    assert records[0].level is records[1].level
+    assert records[0].tool is records[1].tool
+    assert not hasattr(records[0], "__dict__")
+
+
+def test_parse_records_in_memory_lines_keep_raw_text():
+    lines = read_lines("verilog_small.log")
+    records = list(parse_records("iverilog", lines))
+
+    assert [rec.offset for rec in records] == [0, 1, 2]
+    assert materialize(records) == list(parse_lines("iverilog", lines))
+
+
+def test_read_lines_with_offsets_respects_byte_range(tmp_path: Path):
+    log = tmp_path / "range.log"
+    log.write_bytes(b"first\r\nsecond\nthird\n")
+
+    assert list(read_lines_with_offsets(str(log))) == [(0, "first"), (7, "second"), (14, "third")]
+    assert list(read_lines_with_offsets(str(log), start=7, end=14)) == [(7, "second")]
+
+
+def test_split_byte_ranges_are_newline_aligned_and_cover_file(tmp_path: Path):
+    log = tmp_path / "big.log"
+    data = b"".join(b"Warning: line %d\n" % i for i in range(500)) + b"ERROR: no trailing newline"
+    log.write_bytes(data)
+
+    ranges = split_byte_ranges(str(log), 100)
+
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert data[end - 1:end] == b"\n"
+    assert split_byte_ranges(str(log), len(data)) == [(0, len(data))]
+
+
+def test_mmap_lines_match_buffered_reader(tmp_path: Path):
+    log = tmp_path / "big.log"
+    log.write_bytes(b"".join(b"Warning: line %d\r\n" % i for i in range(200)) + b"tail")
+
+    assert list(mmap_lines_with_offsets(str(log))) == list(read_lines_with_offsets(str(log)))
+    chunked = [line for start, end in split_byte_ranges(str(log), 256) for line in mmap_lines_with_offsets(str(log), start, end)]
+    assert chunked == list(read_lines_with_offsets(str(log)))
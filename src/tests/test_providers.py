@@ -0,0 +1,126 @@
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from ai_logs import gemini_ai
+from ai_logs.cache import SummaryCache
+from ai_logs.knowledge import KnowledgeBase
+from ai_logs.providers import HTTPProvider, KnowledgeBaseProvider, SummaryProvider, make_provider
+from ai_logs.summarize import summarize_clusters
+from conftest import RecordingProvider, make_cluster
+
+
+def test_knowledge_base_matches_known_messages():
+  kb = KnowledgeBase()
+
+  assert "syntax error" in kb.lookup(make_cluster(0, "Parser error in line <NUM>: syntax error, unexpected END.", tool="yosys")).pattern
+  assert "drivers" in kb.lookup(make_cluster(1, "multiple drivers detected for net '<SIG>'.")).pattern
+  assert "not found" in kb.lookup(make_cluster(2, "Module '<SIG>' referenced in design but not found.", tool="yosys")).pattern
+  assert kb.lookup(make_cluster(3, "Executing Verilog-<NUM> frontend.", tool="yosys")) is None
+  # Latch inference is a Yosys-only entry
+  assert kb.lookup(make_cluster(4, "Latch inferred for signal '<SIG>'", tool="yosys")) is not None
+  assert kb.lookup(make_cluster(5, "Latch inferred for signal '<SIG>'", tool="iverilog")) is None
+  assert kb.stats() == {"hits": 4, "misses": 2, "entries": len(kb.entries)}
+
+
+def test_l_value_error_is_not_an_undeclared_name():
+  entry = KnowledgeBase().lookup(make_cluster(0, "'<SIG>' is not a valid l-value in <ID>."))
+  assert "procedural" in entry.explanation.lower()
+  assert any("reg" in fix for fix in entry.fixes)
+  with pytest.raises(TypeError):
+    SummaryProvider()
+
+
+def test_knowledge_base_provider_answers_offline():
+  provider = KnowledgeBaseProvider(fallback=True)
+
+  known = provider.summarize(make_cluster(7, "Width mismatch in assignment to signal '<SIG>'.", tool="yosys"))
+  unknown = provider.summarize(make_cluster(8, "frobnicator exploded"))
+
+  assert known.cluster_id == 7
+  assert "bit widths" in known.explanation
+  assert len(known.suggested_fixes) == 3
+  assert unknown == gemini_ai.create_fallback_summary(make_cluster(8, "frobnicator exploded"))
+  assert KnowledgeBaseProvider().summarize(make_cluster(8, "frobnicator exploded")) is None
+
+
+def test_known_messages_skip_the_llm(tmp_path: Path):
+  llm = RecordingProvider()
+  cache = SummaryCache(tmp_path / "cache.db", model=llm.model, prompt_version=llm.prompt_version)
+  clusters = [
+    make_cluster(0, "syntax error near '<SIG>'"),
+    make_cluster(1, "frobnicator '<SIG>' exploded"),
+  ]
+
+  summaries = summarize_clusters(clusters, cache=cache, provider=llm, knowledge=KnowledgeBaseProvider())
+
+  assert llm.calls == ["cluster_1"]
+  assert summaries["cluster_1"].explanation == "from llm"
+  assert "parser" in summaries["cluster_0"].explanation
+  # Only the LLM answer is worth caching
+  assert len(cache) == 1
+
+
+def test_local_provider_answers_every_cluster_inline():
+  clusters = [make_cluster(0, "syntax error near '<SIG>'"), make_cluster(1, "frobnicator '<SIG>' exploded")]
+
+  summaries = summarize_clusters(clusters, provider=make_provider("kb"))
+
+  assert list(summaries) == ["cluster_0", "cluster_1"]
+  assert summaries["cluster_1"].explanation.startswith("This cluster contains 2 error(s)")
+
+
+class CompletionHandler(BaseHTTPRequestHandler):
+  """Answers like Ollama's /api/generate and records each request body."""
+  requests: List[Dict] = []
+
+  def do_POST(self):
+    body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+    CompletionHandler.requests.append(body)
+    payload = json.dumps({"response": "EXPLANATION: Served locally.\nFIXES:\n- Local fix", "done": True}).encode()
+    self.send_response(200)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", str(len(payload)))
+    self.end_headers()
+    self.wfile.write(payload)
+
+  def log_message(self, *args):
+    pass
+
+
+@pytest.fixture
+def completion_url():
+  CompletionHandler.requests = []
+  server = HTTPServer(("127.0.0.1", 0), CompletionHandler)
+  thread = threading.Thread(target=server.serve_forever, daemon=True)
+  thread.start()
+  yield f"http://127.0.0.1:{server.server_address[1]}/api/generate"
+  server.shutdown()
+  server.server_close()
+
+
+def test_http_provider_posts_prompt_to_local_endpoint(completion_url: str):
+  provider = HTTPProvider(completion_url, model="tiny-model")
+
+  summaries = summarize_clusters([make_cluster(3, "frobnicator '<SIG>' exploded")], provider=provider)
+
+  assert summaries["cluster_3"].explanation == "Served locally."
+  assert summaries["cluster_3"].suggested_fixes == ["Local fix"]
+  request = CompletionHandler.requests[0]
+  assert request["model"] == "tiny-model"
+  assert "frobnicator '<SIG>' exploded" in request["prompt"]
+  assert provider.model == "http:tiny-model"
+
+
+def test_make_provider_rejects_unknown_names():
+  with pytest.raises(ValueError):
+    make_provider("carrier-pigeon")
@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from ai_logs.ratelimit import TokenBucket
+
+
+def test_bucket_allows_burst_then_throttles(clock):
+  bucket = TokenBucket(rate=2.0, capacity=3, clock=clock, sleep=clock.sleep)
+
+  for _ in range(3):
+    bucket.acquire()
+  assert clock.slept == []
+
+  bucket.acquire()
+  assert clock.slept == [pytest.approx(0.5)]
+
+
+def test_bucket_refills_over_time(clock):
+  bucket = TokenBucket(rate=10.0, capacity=1, clock=clock, sleep=clock.sleep)
+
+  assert bucket.try_acquire()
+  assert not bucket.try_acquire()
+
+  clock.now += 0.1
+  assert bucket.try_acquire()
+
+
+def test_bucket_rejects_non_positive_rate():
+  with pytest.raises(ValueError):
+    TokenBucket(rate=0)
@@ -1,3 +1,4 @@
+import json
 import types
 from pathlib import Path
 import sys
@@ -8,7 +9,7 @@ SRC_DIR = Path(__file__).resolve().parents[1]
 if str(SRC_DIR) not in sys.path:
   sys.path.insert(0, str(SRC_DIR))
 
-from ai_logs.report import make_markdown, write_report
+from ai_logs.report import make_markdown, write_report, write_results, iter_results
 from ai_logs.schema import LogItem, Cluster, Summary
 
 
@@ -78,3 +79,53 @@ def test_preview_markdown_stdout():
   print(md)
   print("\n===== END MARKDOWN PREVIEW =====\n")
   assert "# Engineering Log Analysis Report" in md
+
+
+def test_make_markdown_uses_exact_counters_over_sample():
+  sample = [LogItem(tool="yosys", level="warning", code=None, msg="Port 'a' is not connected.", raw="raw-1")]
+  cluster = Cluster(
+    id="cluster_0",
+    key="Port '<SIG>' is not connected.",
+    count=40,
+    items=sample,
+    level_counts={"warning": 39, "error": 1},
+    tool_counts={"yosys": 40},
+  )
+
+  md = make_markdown([cluster], {}, "https://feedback.example")
+
+  assert "Count: **40**" in md
+  assert "Tool: `yosys`" in md
+  assert "Severity: `error`" in md
+
+
+@pytest.mark.parametrize("indent", [2, None])
+@pytest.mark.parametrize("n_clusters", [0, 1, 3])
+def test_write_results_json_matches_json_dumps(tmp_path: Path, indent, n_clusters: int):
+  cluster, summaries = _sample_cluster_and_summaries()
+  clusters = [cluster.model_copy(update={"id": f"cluster_{i}"}) for i in range(n_clusters)]
+  summaries = summaries if n_clusters else {}
+  expected = {
+    "clusters": [c.model_dump() for c in clusters],
+    "summaries": {k: v.model_dump() for k, v in summaries.items()},
+  }
+
+  out = tmp_path / "results.json"
+  write_results(clusters, summaries, out, indent=indent)
+
+  if indent is None:
+    assert out.read_text(encoding="utf-8") == json.dumps(expected, separators=(",", ":"))
+  else:
+    assert out.read_text(encoding="utf-8") == json.dumps(expected, indent=indent)
+
+
+def test_write_results_jsonl_streams_back(tmp_path: Path):
+  cluster, summaries = _sample_cluster_and_summaries()
+  other = cluster.model_copy(update={"id": "cluster_1"})
+
+  out = tmp_path / "results.jsonl"
+  write_results([cluster, other], summaries, out, fmt="jsonl")
+
+  assert len(out.read_text(encoding="utf-8").splitlines()) == 2
+  rows = list(iter_results(out))
+  assert rows == [(cluster, summaries["cluster_0"]), (other, None)]
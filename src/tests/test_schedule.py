@@ -0,0 +1,94 @@
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from ai_logs.normalize import ClusterTable
+from ai_logs.parse import parse_records, read_lines_with_offsets
+from ai_logs.schedule import SummaryBudget, prioritize
+from ai_logs.summarize import summarize_clusters
+from conftest import RecordingProvider, make_cluster
+
+
+def test_prioritize_orders_by_severity_then_impact():
+  clusters = [
+    make_cluster(0, level="warning", count=500, file_count=20),
+    make_cluster(1, level="error", count=1),
+    make_cluster(2, level="error", count=50),
+    make_cluster(3, level="error", count=50, file_count=8),
+    make_cluster(4, level="info", count=1000),
+  ]
+
+  assert [c.id for c in prioritize(clusters)] == ["cluster_3", "cluster_2", "cluster_1", "cluster_0", "cluster_4"]
+  # A near-duplicate of an already summarized cluster drops behind an equally large novel one
+  twins = [make_cluster(5, count=50), make_cluster(6, count=50)]
+  assert [c.id for c in prioritize(twins, {"cluster_5": 0.0})] == ["cluster_6", "cluster_5"]
+
+
+def test_call_budget_explains_errors_first_and_falls_back():
+  provider = RecordingProvider()
+  clusters = [make_cluster(0, level="warning", count=100), make_cluster(1, level="error"), make_cluster(2, level="warning"), make_cluster(3, level="error", count=9)]
+
+  summaries = summarize_clusters(clusters, provider=provider, max_calls=2, max_concurrency=1)
+
+  assert provider.calls == ["cluster_3", "cluster_1"]
+  assert set(summaries) == {"cluster_0", "cluster_1", "cluster_2", "cluster_3"}
+  assert summaries["cluster_3"].explanation == "from llm"
+  assert summaries["cluster_0"].explanation.startswith("This cluster contains 100 warning(s)")
+
+
+def test_token_budget_and_deadline_refuse_requests(clock):
+  budget = SummaryBudget(max_tokens=250)
+  assert budget.try_spend(100) and budget.try_spend(100)
+  assert not budget.try_spend(100)
+  # Exhaustion is sticky: a smaller request that would still fit is refused too
+  assert not budget.try_spend(50)
+
+  budget = SummaryBudget(deadline_seconds=5, clock=clock)
+  assert budget.try_spend(1000)
+  clock.now = 5.0
+  assert budget.expired()
+  assert not budget.try_spend(1)
+  assert budget.stats() == {"calls": 1, "tokens": 1000, "refused": 1, "elapsed_seconds": 5.0}
+
+  provider = RecordingProvider(tokens=100)
+  summaries = summarize_clusters([make_cluster(i) for i in range(4)], provider=provider, max_tokens=250, max_concurrency=1)
+  assert len(provider.calls) == 2
+  assert sum(s.explanation == "from llm" for s in summaries.values()) == 2
+
+
+def test_oversized_error_prompt_stops_lower_priority_requests():
+  class SizedProvider(RecordingProvider):
+    def prompt_tokens(self, clusters) -> int:
+      return sum(200 if c.id == "cluster_1" else 40 for c in clusters)
+
+  provider = SizedProvider()
+  clusters = [make_cluster(0, level="error", count=50), make_cluster(1, level="error", count=9), make_cluster(2, level="warning")]
+
+  summaries = summarize_clusters(clusters, provider=provider, max_tokens=200, max_concurrency=1)
+
+  # cluster_1's prompt no longer fits after cluster_0, and the warning must not jump ahead of it
+  assert provider.calls == ["cluster_0"]
+  assert summaries["cluster_2"].explanation.startswith("This cluster contains")
+
+
+def test_cluster_table_counts_distinct_files(tmp_path: Path):
+  logs = {}
+  for name in ("a", "b", "c"):
+    logs[name] = tmp_path / f"{name}.log"
+    logs[name].write_text(f"iverilog: error: undeclared signal '{name}'\n", encoding="utf-8")
+
+  table = ClusterTable()
+  table.update(parse_records("iverilog", read_lines_with_offsets(str(logs["a"])), source=str(logs["a"])))
+  table.update(parse_records("iverilog", read_lines_with_offsets(str(logs["b"])), source=str(logs["b"])))
+  table.update(parse_records("iverilog", read_lines_with_offsets(str(logs["a"])), source=str(logs["a"])))
+  other = ClusterTable()
+  other.update(parse_records("iverilog", read_lines_with_offsets(str(logs["c"])), source=str(logs["c"])))
+  table.merge(other)
+
+  [cluster] = table.clusters()
+  assert cluster.count == 4
+  assert cluster.file_count == 3
+  assert ClusterTable.from_dict(table.to_dict()).clusters()[0].file_count == 3
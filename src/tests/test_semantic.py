@@ -0,0 +1,120 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from ai_logs import gemini_ai, summarize
+from ai_logs.schema import Summary
+from ai_logs.semantic import SemanticIndex, key_features
+from conftest import make_cluster
+
+
+def _summary(cluster_id: int = 0, text: str = "explained") -> Summary:
+  return Summary(cluster_id=cluster_id, explanation=text, suggested_fixes=["fix it"])
+
+
+def _index(**kwargs) -> SemanticIndex:
+  kwargs.setdefault("threshold", 0.6)
+  return SemanticIndex("model-a", "1", **kwargs)
+
+
+def test_key_features_are_sparse_and_stable():
+  features, counts = key_features("Implicit wire 'a' declared implicit")
+  again, _ = key_features("implicit WIRE 'a' declared implicit")
+  assert list(features) == list(again)
+  assert list(features) == sorted(features)
+  assert counts.max() == 2  # "implicit" appears twice
+
+
+def test_reworded_key_reuses_summary():
+  index = _index()
+  index.add("Identifier '<SIG>' is implicitly declared as a wire", _summary(text="implicit wire"))
+  index.add("Port '<SIG>' is not connected to any module ports", _summary(text="unconnected port"))
+
+  reused, unrelated = index.lookup([
+    "identifier '<SIG>' implicitly declared as wire",
+    "Truncating <NUM>-bit constant to <NUM> bits",
+  ])
+
+  assert reused is not None
+  summary, matched, score = reused
+  assert summary.explanation == "implicit wire"
+  assert matched.startswith("Identifier")
+  assert 0.6 <= score <= 1.0 + 1e-6
+  assert unrelated is None
+  assert index.stats() == {"hits": 1, "misses": 1, "entries": 2}
+
+
+def test_empty_index_never_matches():
+  assert _index().lookup(["anything"]) == [None]
+  assert _index().nearest(["anything"]) == [(-1, 0.0)]
+
+
+def test_keys_without_word_tokens_never_match(tmp_path: Path):
+  index = _index()
+  index.add("Port '<SIG>' is not connected to any module ports", _summary(text="unconnected port"))
+  index.add("---", _summary(text="punctuation only"))
+
+  assert index.nearest(["", "---"]) == [(-1, 0.0), (-1, 0.0)]
+  assert index.lookup([""]) == [None]
+  index.save(tmp_path / "index.npz")
+  assert SemanticIndex.load(tmp_path / "index.npz", "model-a", "1").nearest(["port not connected"])[0][0] == 0
+
+
+def test_save_load_roundtrip(tmp_path: Path):
+  path = tmp_path / "index.npz"
+  index = _index()
+  for i in range(5):
+    index.add(f"warning number {i} about module m{i}", _summary(i, f"summary {i}"))
+  index.save(path)
+
+  loaded = SemanticIndex.load(path, "model-a", "1", threshold=0.6)
+  assert loaded.keys == index.keys
+  assert loaded.nearest(["warning number 3 about module m3"]) == [(3, pytest.approx(1.0))]
+  (match,) = loaded.lookup(["warning number 3 about module m3"])
+  assert match[0].explanation == "summary 3"
+
+  # Another model or prompt revision starts from an empty index
+  assert len(SemanticIndex.load(path, "model-b", "1")) == 0
+  assert len(SemanticIndex.load(path, "model-a", "2")) == 0
+
+
+def test_oldest_entries_are_evicted(tmp_path: Path):
+  index = _index(max_entries=3)
+  for i in range(5):
+    index.add(f"distinct message {i} alpha{i} beta{i}", _summary(i))
+
+  assert index.nearest(["distinct message 4 alpha4 beta4"])[0][0] == 2
+  assert index.keys == [f"distinct message {i} alpha{i} beta{i}" for i in (2, 3, 4)]
+
+  path = tmp_path / "index.npz"
+  index.save(path)
+  loaded = SemanticIndex.load(path, "model-a", "1", max_entries=2)
+  assert loaded.keys == index.keys[1:]
+  assert loaded.nearest(["distinct message 3 alpha3 beta3"])[0] == (0, pytest.approx(1.0))
+
+
+def test_summarize_clusters_reuses_similar_summary(monkeypatch: pytest.MonkeyPatch):
+  calls = []
+
+  def fake_generate(cluster, *args):
+    calls.append(cluster.id)
+    return _summary(int(cluster.id.split('_')[1]), f"generated for {cluster.id}")
+
+  monkeypatch.setattr(gemini_ai, "generate_summary_with_gemini", fake_generate)
+  index = _index()
+
+  summarize.summarize_clusters([make_cluster(0, "Identifier '<SIG>' is implicitly declared as a wire")], index=index)
+  summaries = summarize.summarize_clusters([
+    make_cluster(3, "identifier '<SIG>' implicitly declared as wire"),
+    make_cluster(4, "Port '<SIG>' is not connected to any module ports"),
+  ], index=index)
+
+  assert calls == ["cluster_0", "cluster_4"]
+  assert summaries["cluster_3"].explanation == "generated for cluster_0"
+  assert summaries["cluster_3"].cluster_id == 3
+  assert len(index) == 2
@@ -0,0 +1,184 @@
+import http.client
+import json
+import queue
+import socket
+import sys
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from ai_logs import gemini_ai
+from ai_logs.cache import SummaryCache
+from ai_logs.schema import Summary
+from ai_logs.server import AnalysisRequest, AnalysisService, LogSource, make_server
+
+IVERILOG_LOG = "\n".join([
+  "iverilog: error: signal 'clk' has value 1",
+  "iverilog: error: signal 'rst' has value 2",
+  "iverilog: warning: Truncating 32-bit constant to 16 bits for signal 'addr'.",
+]) + "\n"
+
+
+@pytest.fixture
+def calls(monkeypatch: pytest.MonkeyPatch):
+  calls = []
+
+  def fake_generate(cluster, *args):
+    calls.append(cluster.key)
+    return Summary(cluster_id=int(cluster.id.split('_')[1]), explanation="generated", suggested_fixes=["fix it"])
+
+  monkeypatch.setattr(gemini_ai, "generate_summary_with_gemini", fake_generate)
+  return calls
+
+
+@pytest.fixture
+def server(tmp_path: Path):
+  service = AnalysisService(workers=2, cache=SummaryCache(Path(":memory:"), model="m", prompt_version="1"), log_roots=[str(tmp_path)])
+  httpd = make_server(service, port=0)
+  service.start()
+  thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+  thread.start()
+  yield service, f"http://127.0.0.1:{httpd.server_address[1]}"
+  httpd.shutdown()
+  httpd.server_close()
+  service.stop()
+
+
+def _post(url: str, body: bytes, content_type: str = "application/json"):
+  req = urllib.request.Request(url, data=body, method="POST", headers={"Content-Type": content_type})
+  try:
+    with urllib.request.urlopen(req, timeout=10) as resp:
+      return resp.status, json.loads(resp.read())
+  except urllib.error.HTTPError as e:
+    return e.code, json.loads(e.read())
+
+
+def _get(url: str):
+  with urllib.request.urlopen(url, timeout=10) as resp:
+    return resp.status, json.loads(resp.read())
+
+
+def test_analyze_file_and_reuse_warm_cache(server, calls, tmp_path: Path):
+  service, base = server
+  log = tmp_path / "iverilog.log"
+  log.write_text(IVERILOG_LOG)
+  request = json.dumps({"logs": [{"tool": "iverilog", "path": str(log)}]}).encode()
+
+  status, first = _post(f"{base}/analyze", request)
+  assert status == 200
+  assert first["status"] == "done"
+  result = first["result"]
+  assert [c["count"] for c in result["clusters"]] == [2, 1]
+  assert result["summaries"]["cluster_0"]["explanation"] == "generated"
+
+  # Same templates again: summaries come from the warm cache
+  assert len(calls) == 2
+  status, second = _post(f"{base}/analyze", request)
+  assert second["result"] == result
+  assert len(calls) == 2
+  _, health = _get(f"{base}/health")
+  assert health["completed"] == 2
+  assert health["summary_cache"]["hits"] == 2
+  assert health["memo"]["hits"] + health["memo"]["misses"] == 6
+
+
+def test_plain_text_body_and_job_polling(server, calls):
+  _, base = server
+  status, job = _post(f"{base}/jobs?tool=iverilog&summarize=0", IVERILOG_LOG.encode(), "text/plain")
+  assert status == 202
+  assert "result" not in job
+
+  status, done = _get(f"{base}/jobs/{job['id']}?wait=10")
+  assert done["status"] == "done"
+  assert len(done["result"]["clusters"]) == 2
+  assert done["result"]["summaries"] == {}
+  assert calls == []
+
+
+def test_bad_requests(server, tmp_path: Path):
+  _, base = server
+  assert _post(f"{base}/jobs", b'{"logs": [{"tool": "vcs", "text": "x"}]}')[0] == 400
+  assert _post(f"{base}/jobs", b'{"logs": [{"tool": "yosys"}]}')[0] == 400
+  with pytest.raises(urllib.error.HTTPError) as e:
+    _get(f"{base}/jobs/unknown")
+  assert e.value.code == 404
+
+  status, job = _post(f"{base}/analyze", json.dumps({"logs": [{"tool": "yosys", "path": str(tmp_path / "no-such.log")}]}).encode())
+  assert status == 200
+  assert job["status"] == "failed"
+  assert "no log files match" in job["error"]
+
+
+def test_log_paths_are_confined_to_log_roots(server, tmp_path: Path):
+  _, base = server
+  outside = tmp_path.parent / f"{tmp_path.name}-outside.log"
+  outside.write_text(IVERILOG_LOG, encoding="utf-8")
+  (tmp_path / "link.log").symlink_to(outside)
+
+  for path in ["/etc/passwd", str(outside), str(tmp_path / "link.log"), f"{tmp_path}/../{outside.name}", f"{tmp_path.parent}/*-outside.log"]:
+    status, reply = _post(f"{base}/jobs", json.dumps({"logs": [{"tool": "iverilog", "path": path}]}).encode())
+    assert status == 400
+    assert "outside the server's log roots" in reply["error"]
+
+  # A glob inside a root that matches a symlink out of it is caught once the glob is expanded
+  status, job = _post(f"{base}/analyze", json.dumps({"logs": [{"tool": "iverilog", "path": f"{tmp_path}/*.log"}]}).encode())
+  assert job["status"] == "failed"
+  assert "PermissionError" in job["error"]
+
+  no_roots = AnalysisService(workers=1)
+  with pytest.raises(ValueError):
+    no_roots.submit(AnalysisRequest(logs=[LogSource(tool="iverilog", path=str(tmp_path))]))
+
+
+def test_full_queue_rejects_new_jobs():
+  service = AnalysisService(workers=1, queue_size=1)  # not started, so nothing drains the queue
+  request = AnalysisRequest(logs=[LogSource(tool="iverilog", text=IVERILOG_LOG)], summarize=False)
+  service.submit(request)
+  with pytest.raises(queue.Full):
+    service.submit(request)
+
+
+def test_unix_socket(tmp_path: Path):
+  service = AnalysisService(workers=1)
+  path = str(tmp_path / "analysis.sock")
+  httpd = make_server(service, socket_path=path)
+  service.start()
+  threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+  class UnixConnection(http.client.HTTPConnection):
+    def connect(self):
+      self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+      self.sock.connect(path)
+
+  try:
+    conn = UnixConnection("localhost")
+    body = json.dumps({"logs": [{"tool": "iverilog", "text": IVERILOG_LOG}], "summarize": False})
+    conn.request("POST", "/analyze", body, {"Content-Type": "application/json"})
+    resp = conn.getresponse()
+    assert resp.status == 200
+    assert json.loads(resp.read())["result"]["clusters"][0]["count"] == 2
+  finally:
+    httpd.shutdown()
+    httpd.server_close()
+    service.stop()
+
+
+def test_unix_socket_path_only_replaces_stale_sockets(tmp_path: Path):
+  service = AnalysisService(workers=1)
+  stale = tmp_path / "stale.sock"
+  make_server(service, socket_path=str(stale)).server_close()
+  assert stale.exists()
+  make_server(service, socket_path=str(stale)).server_close()
+
+  config = tmp_path / "config.toml"
+  config.write_text("keep me", encoding="utf-8")
+  with pytest.raises(FileExistsError, match="not a Unix socket"):
+    make_server(service, socket_path=str(config))
+  assert config.read_text(encoding="utf-8") == "keep me"
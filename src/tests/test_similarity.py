@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from ai_logs.similarity import jaccard, lsh_params, merge_similar_clusters, shingles, similar_groups
+from conftest import make_cluster
+
+
+def test_shingles_ignore_case_and_punctuation():
+  assert shingles("Port '<SIG>' is not connected.") == shingles("port <SIG> is NOT connected")
+  assert shingles("unused") == frozenset(["unused"])
+  assert jaccard(shingles("a b c d"), shingles("a b c e")) == 0.5
+
+
+def test_lsh_params_fit_in_num_perm():
+  for threshold in (0.5, 0.7, 0.9):
+    bands, rows = lsh_params(threshold, 128)
+    assert bands * rows <= 128
+    assert abs((1 / bands) ** (1 / rows) - threshold) < 0.1
+
+
+def test_similar_groups_fold_near_duplicates_only():
+  keys = [
+    "implicit declaration of wire '<SIG>' in module '<SIG>' at line <NUM>",
+    "Port '<SIG>' is not connected to any module ports.",
+    "implicit declaration of net '<SIG>' in module '<SIG>' at line <NUM>",
+    "Port '<SIG>' is not connected to any of the module ports.",
+    "Truncating <NUM>-bit constant to <NUM> bits",
+  ]
+
+  assert similar_groups(keys, 0.5) == [0, 1, 0, 1, 4]
+  assert similar_groups(keys, 1.0) == [0, 1, 2, 3, 4]
+
+
+def test_merge_similar_clusters_sums_counters_and_keeps_earliest_id():
+  clusters = [
+    make_cluster(0, "implicit declaration of wire '<SIG>' in module '<SIG>' at line <NUM>", 3, level="warning"),
+    make_cluster(1, "Truncating <NUM>-bit constant to <NUM> bits", 2, level="warning"),
+    make_cluster(2, "implicit declaration of net '<SIG>' in module '<SIG>' at line <NUM>", 4, level="error", tool="yosys"),
+  ]
+
+  merged = merge_similar_clusters(clusters, 0.5)
+
+  assert [c.id for c in merged] == ["cluster_0", "cluster_1"]
+  head = merged[0]
+  assert head.count == 7
+  assert head.fingerprint == "fp-0"
+  assert head.level_counts == {"warning": 3, "error": 4}
+  assert head.tool_counts == {"iverilog": 3, "yosys": 4}
+  assert (head.first_seen, head.last_seen) == (0, 24)
+  assert head.merged_keys == [clusters[2].key]
+  assert merged[1] == clusters[1]
+
+
+def test_merge_disabled_by_zero_threshold():
+  clusters = [make_cluster(0, "a b c", 1), make_cluster(1, "a b c", 1)]
+  assert merge_similar_clusters(clusters, 0) == clusters
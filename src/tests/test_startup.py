@@ -0,0 +1,62 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from ai_logs.lazy import LazyModule, lazy_import
+
+# Only the stages that use them may import these; the CLI itself must start without them. The absolute
+# import budget is checked by benchmarks/bench_startup.py --budget-ms, since runner load skews wall time
+HEAVY_MODULES = ("numpy", "pandas", "pyarrow", "google.genai", "tenacity", "dotenv", "http.server")
+# What ai_logs.main may add on top of `import typer, pydantic`, as a multiple of that baseline. Measured
+# in the same interpreter, so a slow runner scales both; it is ~1.5x now and was ~5x with eager imports
+IMPORT_OVERHEAD_RATIO = 3.0
+
+
+def _python(code: str, *flags: str) -> subprocess.CompletedProcess:
+  return subprocess.run([sys.executable, *flags, "-c", code], cwd=SRC_DIR, check=True, capture_output=True, text=True)
+
+
+def test_cli_import_skips_heavy_dependencies():
+  code = f"import json, sys, ai_logs.main; print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+  assert json.loads(_python(code).stdout) == []
+
+
+def test_cli_import_overhead_relative_to_its_dependencies():
+  code = (
+    "import time; t0 = time.perf_counter(); import typer, pydantic; t1 = time.perf_counter(); "
+    "import ai_logs.main; t2 = time.perf_counter(); print(t1 - t0, t2 - t1)"
+  )
+  # Best of a few fresh interpreters, so one descheduled run does not fail the suite
+  samples = [tuple(map(float, _python(code).stdout.split())) for _ in range(3)]
+  baseline = min(s[0] for s in samples)
+  overhead = min(s[1] for s in samples)
+  assert overhead <= IMPORT_OVERHEAD_RATIO * baseline, f"ai_logs.main adds {overhead * 1e3:.0f} ms over {baseline * 1e3:.0f} ms"
+
+
+def test_lazy_import_defers_until_first_attribute():
+  code = (
+    "import sys; from ai_logs.lazy import lazy_import; mod = lazy_import('colorsys'); "
+    "before = 'colorsys' in sys.modules; mod.rgb_to_hsv(0, 0, 0); print(before, 'colorsys' in sys.modules)"
+  )
+  assert _python(code).stdout.split() == ["False", "True"]
+
+
+def test_lazy_import_behaves_like_the_module():
+  mod = lazy_import("json")
+  assert isinstance(mod, LazyModule)
+  assert mod.loads("[1]") == [1]
+  assert mod.dumps is json.dumps
+  with pytest.raises(AttributeError):
+    mod.no_such_attribute
+
+
+def test_lazy_import_raises_for_missing_package():
+  with pytest.raises(ImportError):
+    lazy_import("no_such_package_for_ai_logs.sub")
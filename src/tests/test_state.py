@@ -0,0 +1,146 @@
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+  sys.path.insert(0, str(SRC_DIR))
+
+from typer.testing import CliRunner
+
+from ai_logs import main
+from ai_logs.ingest import ingest_files, ingest_ranges
+from ai_logs.schema import Cluster, LogItem, Summary
+from ai_logs.state import AnalysisState
+from conftest import RecordingProvider
+
+
+def _snapshot(state: AnalysisState):
+  return [(c.id, c.key, c.count, c.level_counts, c.first_seen, c.last_seen) for c in state.table.clusters()]
+
+
+def _run(state_path: Path, jobs) -> AnalysisState:
+  state = AnalysisState.load(state_path, sample_size=4)
+  planned = state.plan(jobs)
+  if planned is None:
+    state = AnalysisState.fresh(sample_size=4)
+    planned = state.plan(jobs)
+  ranges, cursors = planned
+  ingest_ranges(ranges, table=state.table, sample_size=4)
+  state.cursors.update(cursors)
+  state.save(state_path)
+  return state
+
+
+def test_incremental_runs_only_parse_appended_lines(tmp_path: Path):
+  log = tmp_path / "iverilog.log"
+  state_path = tmp_path / "state.json"
+  jobs = [("iverilog", str(log))]
+  log.write_text("iverilog: warning: signal 'a' is unused.\niverilog: error: syntax error\n", encoding="utf-8")
+
+  first = _run(state_path, jobs)
+  assert first.table.items_seen == 2
+
+  with log.open("a", encoding="utf-8") as fh:
+    fh.write("iverilog: warning: signal 'b' is unused.\n")
+  second = _run(state_path, jobs)
+
+  assert second.plan(jobs) == ([], second.cursors)
+  full = ingest_files(jobs, sample_size=4)
+  assert second.table.items_seen == full.items_seen == 3
+  assert _snapshot(second) == [(c.id, c.key, c.count, c.level_counts, c.first_seen, c.last_seen) for c in full.clusters()]
+
+
+def test_partial_last_line_is_deferred(tmp_path: Path):
+  log = tmp_path / "iverilog.log"
+  jobs = [("iverilog", str(log))]
+  log.write_text("iverilog: error: syntax error\niverilog: warning: signal 'a' is", encoding="utf-8")
+
+  state = AnalysisState.fresh()
+  ranges, cursors = state.plan(jobs)
+  complete = len("iverilog: error: syntax error\n")
+  assert ranges == [("iverilog", str(log), 0, complete)]
+  assert cursors[str(log)].offset == complete
+
+
+def test_truncated_or_rewritten_log_forces_rebuild(tmp_path: Path):
+  log = tmp_path / "iverilog.log"
+  state_path = tmp_path / "state.json"
+  jobs = [("iverilog", str(log))]
+  log.write_text("iverilog: error: syntax error\niverilog: error: syntax error\n", encoding="utf-8")
+  _run(state_path, jobs)
+
+  log.write_text("iverilog: error: syntax error\n", encoding="utf-8")
+  assert AnalysisState.load(state_path).plan(jobs) is None
+
+  log.write_text("iverilog: warning: other error\niverilog: warning: other error\n", encoding="utf-8")
+  assert AnalysisState.load(state_path).plan(jobs) is None
+
+  rebuilt = _run(state_path, jobs)
+  assert [c.key for c in rebuilt.table.clusters()] == ["other error"]
+
+
+def test_deleted_or_dropped_log_forces_rebuild(tmp_path: Path):
+  a, b = tmp_path / "a.log", tmp_path / "b.log"
+  state_path = tmp_path / "state.json"
+  a.write_text("iverilog: error: syntax error\n", encoding="utf-8")
+  b.write_text("iverilog: warning: signal 'b' is unused.\n", encoding="utf-8")
+  _run(state_path, [("iverilog", str(a)), ("iverilog", str(b))])
+
+  assert AnalysisState.load(state_path).plan([("iverilog", str(a))]) is None
+  b.unlink()
+  assert AnalysisState.load(state_path).plan([("iverilog", str(a)), ("iverilog", str(b))]) is None
+
+  # Rebuilt from the remaining log only, so no sample record points at the deleted one
+  rebuilt = _run(state_path, [("iverilog", str(a))])
+  assert [c.key for c in rebuilt.table.clusters()] == ["syntax error"]
+
+
+def test_unreadable_state_starts_fresh(tmp_path: Path):
+  state_path = tmp_path / "state.json"
+  state_path.write_text("{not json", encoding="utf-8")
+
+  state = AnalysisState.load(state_path)
+  assert len(state.table) == 0 and state.cursors == {}
+
+
+def test_summaries_reused_until_cluster_materially_changes():
+  item = LogItem(tool="iverilog", level="warning", code=None, msg="signal 'a' is unused.", raw="raw")
+  cluster = Cluster(id="cluster_0", key="k", count=3, items=[item], fingerprint="fp-1", level_counts={"warning": 3})
+  state = AnalysisState.fresh()
+  state.record_summaries([cluster], {"cluster_0": Summary(cluster_id=0, explanation="cached", suggested_fixes=[])})
+
+  grown = cluster.model_copy(update={"id": "cluster_5", "count": 5, "level_counts": {"warning": 5}})
+  reused = state.reusable_summary(grown)
+  assert reused is not None and reused.explanation == "cached" and reused.cluster_id == 5
+
+  assert state.reusable_summary(cluster.model_copy(update={"count": 6, "level_counts": {"warning": 6}})) is None
+  assert state.reusable_summary(cluster.model_copy(update={"count": 4, "level_counts": {"warning": 3, "error": 1}})) is None
+  assert state.reusable_summary(cluster.model_copy(update={"fingerprint": "fp-2"})) is None
+
+
+def test_budget_fallbacks_are_not_reused_by_the_next_run(tmp_path: Path, monkeypatch):
+  provider = RecordingProvider()
+  monkeypatch.setattr(main, "_make_provider", lambda *args: provider)
+  log = tmp_path / "sim.log"
+  log.write_text(
+    "iverilog: error: signal 'clk' has value 1\n"
+    "iverilog: error: signal 'rst' has value 2\n"
+    "iverilog: warning: Truncating 32-bit constant to 16 bits for signal 'addr'.\n",
+    encoding="utf-8",
+  )
+
+  def run(*extra: str):
+    args = [
+      "run", "--iverilog-log", str(log), "--yosys-log", "", "--no-knowledge-base", "--max-concurrency", "1",
+      "--state", str(tmp_path / "state.json"),
+      "--out-json", str(tmp_path / "results.json"), "--out-md", str(tmp_path / "report.md"), *extra,
+    ]
+    result = CliRunner().invoke(main.app, args)
+    assert result.exit_code == 0, result.output
+
+  run("--max-llm-calls", "1")
+  assert provider.calls == ["cluster_0"]
+
+  # The error summary is reused; the warning only had a fallback, so it goes to the LLM this time
+  run()
+  assert provider.calls == ["cluster_0", "cluster_1"]
@@ -12,6 +12,13 @@ SRC_DIR = Path(__file__).resolve().parents[1]
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from ai_logs import gemini_ai
+from ai_logs.ratelimit import TokenBucket
 from ai_logs.summarize import has_no_key_heuristic, summarize_clusters
 from ai_logs.schema import LogItem, Cluster
 
@@ -169,4 +176,243 @@ class TestSummarizeClusters:
         summary = next(iter(summaries.values()))
         assert summary.cluster_id == 0
         assert len(summary.explanation) > 0
-        assert len(summary.suggested_fixes) > 0
\ No newline at end of file
+        assert len(summary.suggested_fixes) > 0
+
+
+FAKE_RESPONSE = """EXPLANATION: The signal is undriven.
+FIXES:
+- Drive the signal
+- Remove the signal
+"""
+
+class FakeClient:
+  """Local stand-in for genai.Client that records concurrency and can fail on demand."""
+
+  def __init__(self, latency: float = 0.0, failures: int = 0, error: Exception = ConnectionError("transient failure")):
+    self.latency = latency
+    self.failures = failures
+    self.error = error
+    self.calls = 0
+    self.in_flight = 0
+    self.max_in_flight = 0
+    self._lock = threading.Lock()
+    self.models = SimpleNamespace(generate_content=self.generate_content)
+
+  def generate_content(self, model, contents):
+    with self._lock:
+      self.calls += 1
+      self.in_flight += 1
+      self.max_in_flight = max(self.max_in_flight, self.in_flight)
+      fail = self.failures > 0
+      if fail:
+        self.failures -= 1
+    try:
+      time.sleep(self.latency)
+      if fail:
+        raise self.error
+      return SimpleNamespace(text=FAKE_RESPONSE)
+    finally:
+      with self._lock:
+        self.in_flight -= 1
+
+
+def _eligible_clusters(n: int):
+  item = LogItem(tool="iverilog", level="error", code=None, msg="signal 'clk' has value 1", raw="raw1")
+  return [
+    Cluster(id=f"cluster_{i}", key="signal '<SIG>' has value <NUM>", count=1, items=[item])
+    for i in range(n)
+  ]
+
+
+class TestConcurrentSummarize:
+  def test_summaries_overlap_up_to_concurrency_limit(self):
+    client = FakeClient(latency=0.05)
+    clusters = _eligible_clusters(40)
+
+    start = time.perf_counter()
+    summaries = summarize_clusters(clusters, client=client, max_concurrency=40)
+    elapsed = time.perf_counter() - start
+
+    assert len(summaries) == 40
+    assert list(summaries) == [c.id for c in clusters]
+    assert summaries["cluster_7"].cluster_id == 7
+    # Serial execution would take 40 * 50ms = 2s
+    assert elapsed < 1.0
+    assert client.max_in_flight > 1
+
+  def test_concurrency_limit_is_respected(self):
+    client = FakeClient(latency=0.02)
+    summarize_clusters(_eligible_clusters(12), client=client, max_concurrency=3)
+
+    assert client.max_in_flight <= 3
+
+  def test_transient_failures_are_retried(self, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(gemini_ai, "RETRY_BACKOFF_BASE", 0)
+    client = FakeClient(failures=2)
+
+    summaries = summarize_clusters(_eligible_clusters(1), client=client)
+
+    assert client.calls == 3
+    assert summaries["cluster_0"].explanation == "The signal is undriven."
+
+  def test_permanent_errors_are_not_retried(self, monkeypatch: pytest.MonkeyPatch):
+    import urllib.error
+
+    monkeypatch.setattr(gemini_ai, "RETRY_BACKOFF_BASE", 0)
+    for error in [ValueError("bad request"), urllib.error.HTTPError("http://x", 401, "Unauthorized", {}, None)]:
+      client = FakeClient(failures=100, error=error)
+      summarize_clusters(_eligible_clusters(1), client=client)
+      assert client.calls == 1
+
+    client = FakeClient(failures=1, error=urllib.error.HTTPError("http://x", 503, "Unavailable", {}, None))
+    summaries = summarize_clusters(_eligible_clusters(1), client=client)
+    assert client.calls == 2
+    assert "cluster_0" in summaries
+
+  def test_persistent_failures_give_up(self, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(gemini_ai, "RETRY_BACKOFF_BASE", 0)
+    client = FakeClient(failures=100)
+
+    summaries = summarize_clusters(_eligible_clusters(1), client=client)
+
+    assert client.calls == gemini_ai.RETRY_ATTEMPTS
+    assert summaries == {}
+
+  def test_rate_limiter_is_applied_per_request(self):
+    client = FakeClient()
+    limiter = TokenBucket(rate=1000, capacity=1)
+    acquired = []
+    original = limiter.acquire
+    limiter.acquire = lambda tokens=1.0: (acquired.append(tokens), original(tokens))
+
+    summarize_clusters(_eligible_clusters(5), client=client, rate_limiter=limiter)
+
+    assert len(acquired) == 5
+
+
+class FakeBatchClient:
+  """Answers batched prompts block by block, optionally dropping some clusters."""
+
+  def __init__(self, drop=()):
+    self.drop = set(drop)
+    self.prompts = []
+    self._lock = threading.Lock()
+    self.models = SimpleNamespace(generate_content=self.generate_content)
+
+  def generate_content(self, model, contents):
+    with self._lock:
+      self.prompts.append(contents)
+    ids = re.findall(r"^=== CLUSTER (\S+) ===$", contents, re.M)
+    if not ids:
+      return SimpleNamespace(text="EXPLANATION: single\nFIXES:\n- single fix")
+    blocks = [
+      f"=== CLUSTER {cid} ===\nEXPLANATION: batched {cid}\nFIXES:\n- fix {cid}\n=== END ==="
+      for cid in ids if cid not in self.drop
+    ]
+    return SimpleNamespace(text="\n\n".join(blocks))
+
+
+class TestBatchedSummarize:
+  def test_parse_multi_summary_response_maps_by_cluster_id(self):
+    text = """=== CLUSTER cluster_2 ===
+EXPLANATION: second
+FIXES:
+- fix b
+=== END ===
+=== CLUSTER cluster_1 ===
+EXPLANATION: first
+FIXES:
+- fix a
+=== END ===
+=== CLUSTER cluster_9 ===
+EXPLANATION: not requested
+=== END ==="""
+    parsed = gemini_ai.parse_multi_summary_response(text, ["cluster_1", "cluster_2", "cluster_3"])
+
+    assert set(parsed) == {"cluster_1", "cluster_2"}
+    assert parsed["cluster_1"].explanation == "first"
+    assert parsed["cluster_1"].cluster_id == 1
+    assert parsed["cluster_2"].suggested_fixes == ["fix b"]
+
+  def test_pack_batches_respects_token_budget(self):
+    clusters = _eligible_clusters(10)
+    block_tokens = gemini_ai.estimate_tokens(gemini_ai._cluster_block(clusters[0])) + 1
+    budget = gemini_ai.estimate_tokens(gemini_ai.BATCH_PREAMBLE) + 3 * block_tokens
+
+    batches = gemini_ai.pack_batches(clusters, budget)
+
+    assert [len(b) for b in batches] == [3, 3, 3, 1]
+    assert [c.id for b in batches for c in b] == [c.id for c in clusters]
+    assert gemini_ai.pack_batches(clusters, 1) == [[c] for c in clusters]
+
+  def test_batched_mode_cuts_round_trips(self):
+    client = FakeBatchClient()
+    summaries = summarize_clusters(_eligible_clusters(6), client=client, batch_token_budget=100_000)
+
+    assert len(client.prompts) == 1
+    assert client.prompts[0].count(gemini_ai.BATCH_PREAMBLE) == 1
+    assert summaries["cluster_4"].explanation == "batched cluster_4"
+    assert list(summaries) == [f"cluster_{i}" for i in range(6)]
+
+  def test_dropped_clusters_fall_back_to_single_requests(self):
+    client = FakeBatchClient(drop={"cluster_1"})
+    summaries = summarize_clusters(_eligible_clusters(3), client=client, batch_token_budget=100_000)
+
+    assert len(client.prompts) == 2
+    assert summaries["cluster_0"].explanation == "batched cluster_0"
+    assert summaries["cluster_1"].explanation == "single"
+    assert summaries["cluster_1"].cluster_id == 1
+
+
+def _cluster_of(msgs, key="port mismatch: instance '<SIG>' expects <NUM> ports, but <NUM> given."):
+  items = [LogItem(tool="iverilog", level="error", code=None, msg=m, raw=m) for m in msgs]
+  return Cluster(id="cluster_0", key=key, count=len(items), items=items)
+
+
+class TestPromptCompaction:
+  def test_samples_skip_duplicates_and_prefer_new_values(self):
+    cluster = _cluster_of([
+      "port mismatch: instance 'u1' expects 3 ports, but 1 given.",
+      "port mismatch: instance 'u1' expects 3 ports, but 1 given.",
+      "port mismatch: instance 'u1' expects 3 ports, but 2 given.",
+      "port mismatch: instance 'u7' expects 4 ports, but 0 given.",
+      "port mismatch: instance 'u8' expects 5 ports, but 2 given.",
+    ])
+
+    # Once every variable position has shown two values, further near-identical samples add nothing
+    assert gemini_ai.select_samples(cluster) == [
+      "port mismatch: instance 'u1' expects 3 ports, but 1 given.",
+      "port mismatch: instance 'u7' expects 4 ports, but 0 given.",
+    ]
+
+  def test_samples_cover_every_template_within_budget(self):
+    msgs = ["multiple drivers detected for net 'clk'.", "multiple conflicting drivers for net 'rst'."]
+    msgs += [f"multiple drivers detected for net 'n{i}' {'x' * 200}." for i in range(3)]
+    cluster = _cluster_of(msgs, key="multiple <*> drivers for net '<SIG>'.")
+
+    samples = gemini_ai.select_samples(cluster, token_budget=40)
+    assert samples[:2] == msgs[:2]
+    assert sum(gemini_ai.estimate_tokens(s) + 1 for s in samples) <= 40
+    # A single message over the budget is still shown
+    assert gemini_ai.select_samples(_cluster_of(msgs[2:3]), token_budget=1) == msgs[2:3]
+
+  def test_prompt_carries_the_shared_instruction_block_once(self):
+    cluster = _cluster_of(["port mismatch: instance 'u1' expects 3 ports, but 1 given."] * 3)
+    prompt = gemini_ai.create_summary_prompt(cluster)
+
+    assert prompt.count(gemini_ai.RESPONSE_FORMAT) == 1
+    assert gemini_ai.BATCH_PREAMBLE.count(gemini_ai.RESPONSE_FORMAT) == 1
+    assert prompt.count("- port mismatch") == 1
+    assert not any(line.startswith(" ") for line in prompt.splitlines())
+
+  def test_prompt_tokens_are_reported(self, capsys: pytest.CaptureFixture):
+    from ai_logs.metrics import PipelineMetrics
+
+    metrics = PipelineMetrics()
+    clusters = _eligible_clusters(2)
+    summarize_clusters(clusters, client=FakeClient(), metrics=metrics)
+
+    tokens = gemini_ai.estimate_tokens(gemini_ai.create_summary_prompt(clusters[0]))
+    assert f"Generating summary for cluster cluster_0 (~{tokens} prompt tokens)..." in capsys.readouterr().out
+    assert metrics.counters["llm_prompts"]["calls"] == 2
+    assert metrics.counters["llm_prompts"]["tokens_per_prompt"] == tokens